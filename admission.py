@@ -0,0 +1,164 @@
+"""Zulassungssteuerung für teure Endpunkte (PDF-Download).
+
+Je Endpunkt arbeiten höchstens `limit` Anfragen gleichzeitig, bis zu `queue` weitere warten
+auf einen freien Platz. Alle darüber hinaus werden sofort mit 503 und Retry-After abgewiesen,
+damit die Worker für die günstigen Quiz-Seiten frei bleiben.
+
+Plätze sind Dateisperren (flock) und gelten damit für alle gunicorn-Worker zusammen; stirbt
+ein Worker, gibt das Betriebssystem seine Plätze frei. Ohne fcntl (Windows-Desktopbuild, ein
+Prozess) zählen Semaphoren innerhalb des Prozesses.
+"""
+import os
+import threading
+import time
+
+from flask import g, request
+from werkzeug.exceptions import ServiceUnavailable
+
+import metrics
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+
+class FileSlots:
+    """count Plätze als Sperrdateien; ein Platz gehört dem, der die Sperre hält."""
+
+    def __init__(self, directory, name, count):
+        os.makedirs(directory, exist_ok=True)
+        self.paths = [os.path.join(directory, f'{name}.{i}.lock') for i in range(count)]
+
+    def try_acquire(self):
+        for path in self.paths:
+            fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                return fd
+            except BlockingIOError:
+                os.close(fd)
+        return None
+
+    def release(self, fd):
+        os.close(fd)  # gibt die Sperre frei
+
+    def acquire(self, poll_interval=0.05):
+        # Blockierend: wartet, bis ein Platz frei wird
+        while True:
+            fd = self.try_acquire()
+            if fd is not None:
+                return fd
+            time.sleep(poll_interval)
+
+
+def run_with_slot(directory, name, count, fn, *args):
+    """Führt fn(*args) aus, sobald einer von count hostweiten Plätzen frei ist.
+
+    Für Hintergrund-Jobs: die Pools liegen in jedem gunicorn-Worker, die Plätze begrenzen die
+    Arbeit über alle Worker zusammen. Ohne fcntl begrenzt nur die Poolgröße.
+    """
+    if fcntl is None or not count:
+        return fn(*args)
+    slots = FileSlots(directory, name, count)
+    fd = slots.acquire()
+    try:
+        return fn(*args)
+    finally:
+        slots.release(fd)
+
+
+class LocalSlots:
+    """count Plätze innerhalb eines Prozesses."""
+
+    def __init__(self, count):
+        self._semaphore = threading.BoundedSemaphore(count) if count else None
+
+    def try_acquire(self):
+        return True if self._semaphore is not None and self._semaphore.acquire(False) else None
+
+    def release(self, token):
+        self._semaphore.release()
+
+
+class AdmissionLimiter:
+    def __init__(self, name, limit, queue, timeout, directory=None, poll_interval=0.02):
+        self.name = name
+        self.timeout = timeout
+        self.poll_interval = poll_interval
+        if directory and fcntl is not None:
+            self._running = FileSlots(directory, f'{name}.run', limit)
+            self._waiting = FileSlots(directory, f'{name}.wait', queue)
+        else:
+            self._running = LocalSlots(limit)
+            self._waiting = LocalSlots(queue)
+
+    def acquire(self):
+        """Gibt ein Ticket für release() zurück oder None, wenn die Anfrage abgewiesen wird."""
+        ticket = self._running.try_acquire()
+        if ticket is not None:
+            metrics.admission_requests.inc(endpoint=self.name, result='admitted')
+            return ticket
+        waiting = self._waiting.try_acquire()
+        if waiting is None:
+            metrics.admission_requests.inc(endpoint=self.name, result='rejected')
+            return None
+
+        metrics.admission_requests.inc(endpoint=self.name, result='queued')
+        start = time.monotonic()
+        try:
+            while time.monotonic() - start < self.timeout:
+                time.sleep(self.poll_interval)
+                ticket = self._running.try_acquire()
+                if ticket is not None:
+                    metrics.admission_wait_seconds.observe(time.monotonic() - start, endpoint=self.name)
+                    metrics.admission_requests.inc(endpoint=self.name, result='admitted')
+                    return ticket
+        finally:
+            self._waiting.release(waiting)
+        metrics.admission_requests.inc(endpoint=self.name, result='timeout')
+        return None
+
+    def release(self, ticket):
+        self._running.release(ticket)
+
+
+def lock_directory(app):
+    return app.config['ADMISSION_LOCK_DIR'] or os.path.join(app.instance_path, 'admission')
+
+
+def init_app(app):
+    """Begrenzt die Endpunkte aus ADMISSION_LIMITS ({Endpunkt: [gleichzeitig, wartend]})."""
+    app.config.setdefault('ADMISSION_LIMITS', {})
+    app.config.setdefault('ADMISSION_TIMEOUT', 10)
+    app.config.setdefault('ADMISSION_RETRY_AFTER', 5)
+    app.config.setdefault('ADMISSION_LOCK_DIR', None)
+    directory = lock_directory(app)
+    limiters = {
+        endpoint: AdmissionLimiter(endpoint, limit, queue, app.config['ADMISSION_TIMEOUT'], directory)
+        for endpoint, (limit, queue) in app.config['ADMISSION_LIMITS'].items()
+    }
+    app.extensions['admission'] = limiters
+    if not limiters:
+        return
+
+    @app.before_request
+    def admit_request():
+        limiter = limiters.get(request.endpoint)
+        if limiter is None:
+            return
+        ticket = limiter.acquire()
+        if ticket is None:
+            raise ServiceUnavailable(
+                description="Zu viele gleichzeitige Anfragen, bitte gleich noch einmal versuchen",
+                retry_after=app.config['ADMISSION_RETRY_AFTER'],
+            )
+        g.admission = (limiter, ticket)
+
+    @app.teardown_request
+    def release_admission(exc):
+        # Läuft vor dem Senden des Antwortinhalts: langsame Clients halten keinen Platz fest
+        admitted = g.pop('admission', None)
+        if admitted is not None:
+            limiter, ticket = admitted
+            limiter.release(ticket)
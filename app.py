@@ -1,20 +1,224 @@
-from flask import Flask, render_template, request, redirect, url_for, session, make_response
+from flask import (
+    Blueprint, Flask, abort, current_app, jsonify, make_response, redirect, render_template, request,
+    send_file, send_from_directory, session, url_for,
+)
 from flask_sqlalchemy import SQLAlchemy
-from PIL import Image
+from jinja2 import FileSystemBytecodeCache
+from markupsafe import Markup
+from sqlalchemy import bindparam, func, inspect, select
+from sqlalchemy.orm import Session, selectinload
+from werkzeug.exceptions import BadRequest, ServiceUnavailable
+from werkzeug.utils import secure_filename
+from io import BytesIO
+import click
+import hashlib
+import json
 import os
+import secrets
+import shutil
+import tempfile
+import threading
+import time
 import uuid
-import webbrowser
-from reportlab.lib.pagesizes import letter
-from reportlab.lib import colors
-from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
-from reportlab.lib.styles import getSampleStyleSheet
-from io import BytesIO
-import pdfkit
 
-app = Flask(__name__)
-app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///quiz.db'
-app.config['SECRET_KEY'] = os.urandom(24)  # Sicherer Zufallsschlüssel
-db = SQLAlchemy(app)
+import admission
+import metrics
+from assets import MIMETYPES as ASSET_MIMETYPES, build_bundles, load_manifest as load_asset_manifest, negotiate
+from assessments import (
+    SCORED_MODULES, ScoreDistribution, assessment_row, expand_answers, iter_csv, score_bounds, write_columns
+)
+from catalog import BAND_TABLES, Catalog
+from images import MANIFEST_NAME, UPLOAD_FORMATS, build_image_variants, load_manifest, process_upload, render_picture, sniff_image
+from jobs import JobQueue, QueueFull
+from report_cache import ReportCache, report_fingerprint
+from session_store import ServerSideSessionInterface, create_session_store
+from sqlite_profile import CONCURRENT_PRAGMAS, database_path, install_pragmas, read_only_uri
+
+db = SQLAlchemy()
+bp = Blueprint('main', __name__, cli_group=None)
+CATALOG_BIND = 'catalog'  # Nur-Lese-Bind auf dieselbe Datei
+
+
+def create_app(config=None):
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///quiz.db'
+    # SQLite für mehrere Worker: WAL, synchronous=NORMAL, mmap, busy_timeout (gilt auch für sessions.db)
+    app.config['SQLITE_PRAGMAS'] = dict(CONCURRENT_PRAGMAS)  # {} = SQLite-Standard
+    # Verbindungen je Prozess; gunicorn-Sync-Worker brauchen eine, der Thread-Server mehrere
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = {'pool_size': 4, 'max_overflow': 4, 'pool_timeout': 10}
+    app.config['CATALOG_READ_ONLY'] = True  # Katalog über eigene Nur-Lese-Verbindung laden
+    app.config['CATALOG_FILE'] = os.path.join(app.root_path, 'data', 'catalog.json')
+    # Sekunden zwischen zwei Prüfungen, ob ein anderer Prozess (flask init-db) den Katalog neu
+    # eingespielt hat; None = nie prüfen
+    app.config['CATALOG_CHECK_INTERVAL'] = 5
+    app.config['MIGRATIONS_DIR'] = os.path.join(app.root_path, 'migrations')
+    # Antworten liegen serverseitig, im Cookie steht nur die Sitzungs-ID
+    app.config['SESSION_STORE'] = 'sqlite'  # 'sqlite' oder 'memory'
+    app.config['SESSION_STORE_PATH'] = None  # Standard: instance/sessions.db
+    app.config['SESSION_TTL'] = 6 * 60 * 60  # Sekunden
+    app.config['SESSION_SWEEP_INTERVAL'] = 10 * 60  # Sekunden
+    # Cache für fertige PDF-Berichte
+    app.config['REPORT_CACHE_DIR'] = None  # Standard: instance/report_cache
+    app.config['REPORT_CACHE_MEMORY_BYTES'] = 32 * 1024 * 1024
+    app.config['REPORT_CACHE_DISK_BYTES'] = 512 * 1024 * 1024
+    # Größere Berichte nur als Datei halten und in Blöcken ausliefern statt im Speicher
+    app.config['REPORT_SPOOL_BYTES'] = 1024 * 1024
+    # Hintergrund-Erzeugung der PDF-Berichte. Jeder gunicorn-Worker hat einen eigenen Pool mit
+    # REPORT_WORKERS Prozessen; gleichzeitig rendern aber höchstens REPORT_HOST_WORKERS auf dem
+    # ganzen Host (Dateisperren), unabhängig von WEB_CONCURRENCY
+    cpus = os.cpu_count() or 1
+    app.config['REPORT_EXECUTOR'] = 'process'  # 'process' oder 'thread'
+    app.config['REPORT_WORKERS'] = 1
+    app.config['REPORT_HOST_WORKERS'] = max(1, cpus // 2)
+    app.config['REPORT_JOB_TIMEOUT'] = 60  # Sekunden, die download_pdf auf einen Job wartet
+    app.config['REPORT_POLL_INTERVAL'] = 0.1  # Sekunden, Warten auf Berichte anderer Worker
+    app.config['JOB_HISTORY'] = 1000  # fertige Jobs je Warteschlange, die per Status-URL abfragbar bleiben
+    app.config['JOB_STATUS_DIR'] = None  # Standard: instance/jobs; Job-Status für alle Worker
+    app.config['JOB_STATUS_TTL'] = 24 * 60 * 60  # Sekunden, danach werden Statusdateien gelöscht
+    # Vorberechnete Bildvarianten (verschiedene Größen, WebP/AVIF) mit Hash im Dateinamen
+    app.config['IMAGE_SOURCE_DIR'] = os.path.join(app.static_folder, 'images')
+    app.config['IMAGE_VARIANT_DIR'] = os.path.join(app.static_folder, 'dist', 'images')
+    app.config['IMMUTABLE_MAX_AGE'] = 365 * 24 * 60 * 60  # Sekunden
+    # Bootstrap/jQuery als je ein CSS- und JS-Bundle, vorkomprimiert mit Brotli und zopfli
+    app.config['ASSET_SOURCE_DIR'] = os.path.join(app.root_path, 'assets')
+    app.config['ASSET_BUNDLE_DIR'] = os.path.join(app.static_folder, 'dist', 'assets')
+    # Bild-Uploads: Verkleinern im Hintergrund. Eigenes Verzeichnis außerhalb von static/, damit
+    # Uploads nie die Bilder des Fragenkatalogs ersetzen; ausgeliefert über /uploads/<Job-ID>.<Endung>
+    app.config['UPLOAD_FOLDER'] = None  # Standard: instance/uploads
+    app.config['UPLOAD_IMAGE_SIZE'] = (300, 300)
+    app.config['UPLOAD_MAX_PIXELS'] = 50_000_000
+    app.config['MAX_CONTENT_LENGTH'] = 20 * 1024 * 1024  # Bytes
+    app.config['IMAGE_EXECUTOR'] = 'process'  # 'process' oder 'thread'
+    app.config['IMAGE_WORKERS'] = 2
+    # Unerledigte Verkleinerungen je Worker-Prozess, darüber antwortet upload_image mit 503
+    app.config['IMAGE_MAX_PENDING'] = 4
+
+    # Vorlagen: übersetzter Jinja-Bytecode überdauert Neustarts, Fragenblöcke werden wiederverwendet
+    app.config['JINJA_CACHE_DIR'] = None  # Standard: instance/jinja_cache, False = aus
+    app.config['FRAGMENT_CACHE'] = True
+
+    # Zulassungssteuerung: {Endpunkt: [gleichzeitig, wartend]}, darüber sofort 503 + Retry-After.
+    # Gilt für alle gunicorn-Worker zusammen; PDF-Downloads belegen so höchstens etwa CPU der
+    # 2 x CPU + 1 Worker, der Rest bleibt für die Quiz-Seiten. upload_image antwortet sofort mit
+    # 202, begrenzt wird dort die Bild-Warteschlange (IMAGE_MAX_PENDING)
+    app.config['ADMISSION_LIMITS'] = {
+        'main.download_pdf': [max(1, cpus // 2), max(1, cpus // 2)],
+    }
+    app.config['ADMISSION_TIMEOUT'] = 10  # Sekunden in der Warteschlange, danach 503
+    app.config['ADMISSION_RETRY_AFTER'] = 5  # Sekunden
+    app.config['ADMISSION_LOCK_DIR'] = None  # Standard: instance/admission
+
+    app.config['METRICS_ENABLED'] = True
+    app.config['METRICS_ALLOW_REMOTE'] = False  # /metrics nur von localhost
+    app.config['SERVER_TIMING'] = False  # Server-Timing-Header für die Browser-Devtools
+    # tracemalloc: Allokationsspitze und ORM-Objekte je Anfrage (X-Alloc-Peak, X-ORM-Objects,
+    # /metrics/memory); nur zum Messen, z.B. FLASK_MEMORY_PROFILE=true
+    app.config['MEMORY_PROFILE'] = False
+    app.config['MEMORY_PROFILE_FRAMES'] = 1  # Stack-Tiefe je Allokation
+    # Überschreiben per Umgebung (z.B. FLASK_SECRET_KEY, FLASK_REPORT_WORKERS=4) oder per Argument
+    app.config.from_prefixed_env()
+    app.config.from_mapping(config or {})
+    if not app.config.get('SECRET_KEY'):
+        app.config['SECRET_KEY'] = load_secret_key(app.instance_path)
+
+    path = database_path(app.config['SQLALCHEMY_DATABASE_URI'], app.instance_path)
+    if path and app.config['CATALOG_READ_ONLY']:
+        app.config.setdefault('SQLALCHEMY_BINDS', {})[CATALOG_BIND] = {
+            'url': read_only_uri(path), 'pool_size': 1, 'max_overflow': 1,
+        }
+    jinja_cache = app.config['JINJA_CACHE_DIR']
+    if jinja_cache is not False:
+        jinja_cache = jinja_cache or os.path.join(app.instance_path, 'jinja_cache')
+        os.makedirs(jinja_cache, exist_ok=True)
+        # Muss vor dem ersten Zugriff auf app.jinja_env gesetzt sein
+        app.jinja_options = {**app.jinja_options, 'bytecode_cache': FileSystemBytecodeCache(jinja_cache)}
+
+    db.init_app(app)
+    if path:
+        with app.app_context():
+            for key, engine in db.engines.items():
+                install_pragmas(engine, app.config['SQLITE_PRAGMAS'], read_only=key == CATALOG_BIND)
+    metrics.init_app(app)
+    admission.init_app(app)
+    app.session_interface = ServerSideSessionInterface(
+        create_session_store(app),
+        ttl=app.config['SESSION_TTL'],
+        sweep_interval=app.config['SESSION_SWEEP_INTERVAL'],
+    )
+    app.extensions['report_cache'] = ReportCache(
+        app.config['REPORT_CACHE_DIR'] or os.path.join(app.instance_path, 'report_cache'),
+        max_memory_bytes=app.config['REPORT_CACHE_MEMORY_BYTES'],
+        max_disk_bytes=app.config['REPORT_CACHE_DISK_BYTES'],
+        spool_bytes=app.config['REPORT_SPOOL_BYTES'],
+    )
+    job_status_dir = app.config['JOB_STATUS_DIR'] or os.path.join(app.instance_path, 'jobs')
+    app.extensions['report_jobs'] = JobQueue(
+        'report',
+        max_workers=app.config['REPORT_WORKERS'],
+        kind=app.config['REPORT_EXECUTOR'],
+        max_finished=app.config['JOB_HISTORY'],
+        status_dir=os.path.join(job_status_dir, 'report'),
+        status_ttl=app.config['JOB_STATUS_TTL'],
+    )
+    app.extensions['image_jobs'] = JobQueue(
+        'image',
+        max_workers=app.config['IMAGE_WORKERS'],
+        kind=app.config['IMAGE_EXECUTOR'],
+        max_finished=app.config['JOB_HISTORY'],
+        status_dir=os.path.join(job_status_dir, 'image'),
+        status_ttl=app.config['JOB_STATUS_TTL'],
+        max_pending=app.config['IMAGE_MAX_PENDING'],
+    )
+    app.cli.add_command(LazyMigrateGroup(app, 'db', help='Datenbank-Migrationen (Flask-Migrate/Alembic).'))
+    app.register_blueprint(bp)
+    return app
+
+
+def load_secret_key(instance_path):
+    # Ein Schlüssel für alle Worker und über Neustarts hinweg: beim ersten Start erzeugt und in instance/ abgelegt
+    path = os.path.join(instance_path, 'secret_key')
+    if not os.path.exists(path):
+        os.makedirs(instance_path, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=instance_path)  # Rechte 0600
+        with os.fdopen(fd, 'wb') as f:
+            f.write(secrets.token_bytes(32))
+        try:
+            os.link(tmp_path, path)  # scheitert, wenn ein anderer Prozess schneller war
+        except FileExistsError:
+            pass
+        finally:
+            os.remove(tmp_path)
+    with open(path, 'rb') as f:
+        return f.read()
+
+
+def warm_up(app):
+    """Im Master-Prozess vor dem Fork aufrufen (gunicorn preload_app): die Worker teilen sich
+    Katalog, Bild-Manifest und ReportLab per Copy-on-Write, statt sie einzeln zu laden."""
+    with app.app_context():
+        # Schema migrieren und Fragenkatalog einspielen (wie flask init-db), bevor Worker starten
+        upgrade_database()
+        populate_database()
+        get_scoring()
+        # static/dist ist nicht versioniert: Bundles und Bildvarianten hier erzeugen bzw. (unverändert)
+        # nur das Manifest laden
+        build_assets()
+        build_images()
+        # Keine offenen SQLite-Verbindungen an die Worker vererben (auch nicht die der catalog-Bind)
+        for engine in db.engines.values():
+            engine.dispose()
+    import report  # noqa: F401 - Schriften, Stile und Tabellenlayout des PDF-Berichts
+
+
+def get_report_cache():
+    return current_app.extensions['report_cache']
+
+def get_report_jobs():
+    return current_app.extensions['report_jobs']
+
+def get_image_jobs():
+    return current_app.extensions['image_jobs']
+
 
 # Bildzuordnung
 IMAGE_TERMS = {
@@ -26,69 +230,317 @@ IMAGE_TERMS = {
 
 class Question(db.Model):
     id = db.Column(db.Integer, primary_key=True)
-    module = db.Column(db.String(20), nullable=False)
+    module = db.Column(db.String(20), nullable=False, index=True)
     text = db.Column(db.String(200), nullable=False)
     subtitle = db.Column(db.String(200), nullable=True)
-    answers = db.relationship('Answer', backref='question', lazy=True)
+    # Antworten in einer zweiten Abfrage für alle geladenen Fragen zusammen, in fester Reihenfolge
+    answers = db.relationship('Answer', backref='question', lazy='selectin', order_by='Answer.position')
     image = db.Column(db.String(200), nullable=True)
     info_popup = db.Column(db.String(500), nullable=True)  # Popup-Text
 
 
 class Answer(db.Model):
     id = db.Column(db.Integer, primary_key=True)
-    question_id = db.Column(db.Integer, db.ForeignKey('question.id'), nullable=False)
+    question_id = db.Column(db.Integer, db.ForeignKey('question.id'), nullable=False, index=True)
+    position = db.Column(db.Integer, nullable=False, default=0, server_default='0')  # Reihenfolge innerhalb der Frage
     text = db.Column(db.String(200), nullable=True)
     score = db.Column(db.Integer, nullable=True)
     info_popup = db.Column(db.String(500), nullable=True)
 
+
+class EvaluationBand(db.Model):
+    # Einstufung eines Modul-Scores: Punktebereich -> Eignung und Empfehlung
+    id = db.Column(db.Integer, primary_key=True)
+    module = db.Column(db.String(20), nullable=False, index=True)
+    label = db.Column(db.String(50), nullable=False)
+    min_score = db.Column(db.Integer, nullable=False)
+    max_score = db.Column(db.Integer, nullable=False)
+    recommendation = db.Column(db.String(500), nullable=False)
+
+
+class CatalogMeta(db.Model):
+    # Schlüssel/Wert-Paare zum Fragenkatalog, z.B. der Hash der zuletzt eingespielten Datei
+    key = db.Column(db.String(50), primary_key=True)
+    value = db.Column(db.String(200), nullable=False)
+
+
+class Assessment(db.Model):
+    # Abgeschlossener Durchlauf, gespeichert beim Aufruf der Zusammenfassung
+    id = db.Column(db.Integer, primary_key=True)
+    created = db.Column(db.DateTime, nullable=False)
+    catalog_version = db.Column(db.String(12), nullable=False)
+    project_name = db.Column(db.String(200), nullable=True)
+    location = db.Column(db.String(200), nullable=True)
+    express_score = db.Column(db.Integer, nullable=True)  # NULL = Modul nicht bearbeitet
+    advanced_score = db.Column(db.Integer, nullable=True)
+    answers = db.Column(db.Text, nullable=False)  # kompaktes JSON, siehe assessments.compact_answers
+
+
+# Schema-Migrationen (Flask-Migrate/Alembic). Alembic wird erst geladen, wenn migriert wird,
+# damit der normale Start nicht langsamer wird.
+BASELINE_REVISION = '3f1d2b9c6a10'  # Schema vor Einführung der Migrationen
+
+def init_migrate(app):
+    from flask_migrate import Migrate
+    if 'migrate' not in app.extensions:
+        Migrate(app, db, directory=current_app.config['MIGRATIONS_DIR'], render_as_batch=True)
+
+class LazyMigrateGroup(click.Group):
+    # Stellt "flask db ..." bereit, ohne Flask-Migrate beim Import von app.py zu laden
+    def __init__(self, app, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.app = app
+
+    def make_context(self, info_name, args, parent=None, **extra):
+        init_migrate(self.app)
+        from flask_migrate.cli import db as group
+        return group.make_context(info_name, args, parent=parent, **extra)
+
+def upgrade_database():
+    from flask_migrate import stamp, upgrade
+    init_migrate(current_app._get_current_object())
+    tables = inspect(db.engine).get_table_names()
+    if 'question' in tables and 'alembic_version' not in tables:
+        # Mit create_all angelegte Datenbank: als Basis-Revision markieren, dann weiter migrieren
+        stamp(revision=BASELINE_REVISION)
+    upgrade()
+
+
+# Fragenkatalog: einmal pro Worker aus der Datenbank geladen, danach nur aus dem Speicher
+_catalog = None
+_catalog_lock = threading.Lock()
+# Hash der eingespielten Katalogdatei (CatalogMeta) zum geladenen Katalog und Zeit der letzten Prüfung
+_catalog_hash = None
+_catalog_checked = 0.0
+
+def _stored_catalog_hash(session):
+    return session.scalar(select(CatalogMeta.value).where(CatalogMeta.key == 'content_hash'))
+
+def get_catalog():
+    global _catalog, _catalog_hash, _catalog_checked
+    catalog = _catalog
+    interval = current_app.config['CATALOG_CHECK_INTERVAL']
+    if catalog is not None and interval is not None and time.monotonic() - _catalog_checked >= interval:
+        # populate_database in einem anderen Prozess leert nur dessen Cache: hier am Hash erkennen
+        _catalog_checked = time.monotonic()
+        with Session(db.engines.get(CATALOG_BIND, db.engine)) as session:
+            if _stored_catalog_hash(session) != _catalog_hash:
+                invalidate_catalog()
+                catalog = None
+    if catalog is None:
+        with _catalog_lock:
+            if _catalog is None:
+                engine = db.engines.get(CATALOG_BIND, db.engine)
+                with metrics.phase('catalog_load'), Session(engine) as session:
+                    questions = session.scalars(
+                        select(Question).options(selectinload(Question.answers)).order_by(Question.id)
+                    ).all()
+                    bands = session.scalars(select(EvaluationBand)).all()
+                    _catalog_hash = _stored_catalog_hash(session)
+                    _catalog = Catalog.from_models(questions, bands)
+                _catalog_checked = time.monotonic()
+            catalog = _catalog
+    return catalog
+
+_scoring = None
+
+def get_scoring():
+    # Punktematrizen zum aktuellen Katalogstand; numpy wird erst hier geladen
+    global _scoring
+    catalog = get_catalog()
+    scoring = _scoring
+    if scoring is None or scoring.version != catalog.version:
+        from scoring import ScoringEngine
+        scoring = _scoring = ScoringEngine(catalog)
+    return scoring
+
+def catalog_bands(catalog):
+    # Bewertungsstufen je Modul für den PDF-Bericht (wird an den Worker-Prozess übergeben)
+    return {module: catalog.bands(module) for module in SCORED_MODULES}
+
+def invalidate_catalog():
+    # Nach jedem Neubefüllen der Datenbank aufrufen; andere Prozesse merken es über CATALOG_CHECK_INTERVAL
+    global _catalog
+    with _catalog_lock:
+        _catalog = None
+    _fragments.clear()
+
 def get_questions(module):
-    questions = Question.query.filter_by(module=module).all()
+    questions = get_catalog().questions(module)
     if not questions:
         abort(404, description="Keine Fragen für dieses Modul gefunden")
     return questions
 
-def calculate_module_score(answers, module):
-    if module == 'Basic':
-        return 0  # Basic-Modul gibt immer 0 Punkte
-    if not answers:  # Falls answers leer/undefined
-        return 0
-    module_score = 0
-    for question_id, answer in answers.items():
-        if isinstance(answer, dict) and answer.get('score') is not None:
-            module_score += answer['score']
-    return module_score
+def resolve_answer(question, answer_id):
+    # Antwort aus dem Katalog statt aus der Datenbank; fremde IDs ablehnen
+    answer = get_catalog().answer(answer_id)
+    if answer is None or answer.question_id != question.id:
+        abort(400, description="Ungültige Antwort für diese Frage")
+    return answer
+
+def answer_score(answer):
+    if isinstance(answer, dict) and answer.get('score') is not None:
+        return answer['score']
+    return 0
+
+def start_module(module):
+    # Session-Initialisierung
+    session.setdefault('question_index', 0)
+    session.setdefault('answers', {})
+    session.setdefault('running_score', 0)
+    session.setdefault('score_version', get_catalog().version)
+
+    if session.get('module') != module:
+        session['module'] = module
+        session['question_index'] = 0
+        session['answers'] = {}
+        session['running_score'] = 0
+        session['score_version'] = get_catalog().version
+
+def record_answer(module, question, answer_id, free_text):
+    if answer_id:
+        answer = resolve_answer(question, answer_id)
+        entry = {'text': answer.text, 'score': answer.score}
+    elif free_text:
+        entry = {'text': free_text, 'score': None}
+    else:
+        return
+
+    key = str(question.id)
+    previous = session['answers'].get(key)
+    session['answers'][key] = entry
+    # Punktestand nur um die Differenz anpassen (auch nach "Zurück" und neuer Antwort)
+    if module != 'Basic':
+        session['running_score'] += answer_score(entry) - answer_score(previous)
+        if session.get('score_version') != get_catalog().version:
+            # Punkte aus zwei Katalogständen gemischt: die Zusammenfassung bewertet das Modul neu
+            session['score_version'] = None
+
+def complete_module(module):
+    # Antworten und Punktestand des abgeschlossenen Moduls festhalten
+    session[f'{module.lower()}_answers'] = session['answers']
+    session['module_scores'] = {
+        **session.get('module_scores', {}),
+        module: session['running_score'] if module != 'Basic' else 0
+    }
+    # Katalogstand, zu dem der Punktestand gehört (None = gemischt)
+    session['score_versions'] = {**session.get('score_versions', {}), module: session.get('score_version')}
+
+_image_manifest = None
+
+def build_images():
+    global _image_manifest
+    _image_manifest = build_image_variants(
+        current_app.config['IMAGE_SOURCE_DIR'], current_app.config['IMAGE_VARIANT_DIR']
+    )
+    _fragments.clear()  # Bildfragen verweisen auf die Varianten
+    return _image_manifest
+
+@bp.app_template_global()
+def responsive_image(filename, alt='', sizes='250px'):
+    global _image_manifest
+    if _image_manifest is None:
+        _image_manifest = load_manifest(current_app.config['IMAGE_VARIANT_DIR'])
+    return render_picture(
+        _image_manifest['images'].get(filename),
+        lambda name: url_for('static', filename='dist/images/' + name),
+        url_for('static', filename='images/' + filename),
+        alt,
+        sizes,
+    )
+
+_fragments = {}
+
+@bp.app_template_global()
+def question_fragment(template, question):
+    # Der Fragen- und Antwortblock hängt nur von Vorlage, Frage und Katalogversion ab;
+    # die gewählte Antwort setzt quiz.js im Browser
+    render = lambda: Markup(current_app.jinja_env.get_template(template).render(question=question))
+    if not current_app.config['FRAGMENT_CACHE']:
+        return render()
+    key = (template, question.id, get_catalog().version)
+    fragment = _fragments.get(key)
+    if fragment is None:
+        metrics.fragment_cache.inc(result='miss')
+        fragment = _fragments[key] = render()
+    else:
+        metrics.fragment_cache.inc(result='hit')
+    return fragment
+
+_asset_manifest = None
+
+def build_assets():
+    global _asset_manifest
+    _asset_manifest = build_bundles(current_app.config['ASSET_SOURCE_DIR'], current_app.config['ASSET_BUNDLE_DIR'])
+    return _asset_manifest
+
+@bp.app_template_global()
+def asset_url(kind):
+    global _asset_manifest
+    if _asset_manifest is None:
+        _asset_manifest = load_asset_manifest(current_app.config['ASSET_BUNDLE_DIR']) or build_assets()
+    return url_for('.asset', filename=_asset_manifest[kind])
+
+@bp.route('/assets/<filename>')
+def asset(filename):
+    # Vorkomprimierte Variante passend zu Accept-Encoding, sonst das unkomprimierte Bundle
+    kind = filename.rsplit('.', 1)[-1]
+    if not filename.startswith('bundle.') or kind not in ASSET_MIMETYPES:
+        abort(404)
+    directory = current_app.config['ASSET_BUNDLE_DIR']
+    name, encoding = negotiate(filename, request.accept_encodings, directory)
+    response = send_from_directory(directory, name, mimetype=ASSET_MIMETYPES[kind])
+    if encoding:
+        response.content_encoding = encoding
+    response.vary.add('Accept-Encoding')
+    return cache_immutable(response)
+
+def cache_immutable(response):
+    # Inhalts-Hash im Dateinamen: die Datei ändert sich nie
+    response.cache_control.public = True
+    response.cache_control.max_age = current_app.config['IMMUTABLE_MAX_AGE']
+    response.cache_control.immutable = True
+    response.cache_control.no_cache = None
+    return response
 
+@bp.after_app_request
+def cache_fingerprinted_assets(response):
+    # Dateien unter static/dist/ tragen ihren Inhalts-Hash im Namen und ändern sich nie;
+    # die Manifeste heißen immer gleich und werden bei jedem Build überschrieben
+    filename = request.view_args.get('filename', '') if request.endpoint == 'static' else ''
+    if (response.status_code == 200 and filename.startswith('dist/')
+            and os.path.basename(filename) != MANIFEST_NAME):
+        cache_immutable(response)
+    return response
+
+@bp.cli.command('build-images')
+def build_images_command():
+    manifest = build_images()
+    print(f"{len(manifest['images'])} Bilder aufbereitet: {current_app.config['IMAGE_VARIANT_DIR']}")
 
-def resize_image(image_path, size=(300, 300)):
-    with Image.open(image_path) as img:
-        img.thumbnail(size, Image.LANCZOS)
-        img.save(image_path, quality=95, optimize=True)
+@bp.cli.command('build-assets')
+def build_assets_command():
+    manifest = build_assets()
+    print(f"{', '.join(sorted(manifest.values()))} erzeugt: {current_app.config['ASSET_BUNDLE_DIR']}")
 
-@app.route('/')
+@bp.route('/')
 def index():
-    return redirect(url_for('info'))
+    return redirect(url_for('.info'))
 
-@app.route('/info', methods=['GET', 'POST'])
+@bp.route('/info', methods=['GET', 'POST'])
 def info():
     session.clear()
     if request.method == 'POST':
-        return redirect(url_for('basic_quiz'))
+        return redirect(url_for('.basic_quiz'))
     return render_template('info.html')
 
-@app.route('/basic_quiz/', methods=['GET', 'POST'])
+@bp.route('/basic_quiz/', methods=['GET', 'POST'])
 def basic_quiz():
     module = 'Basic'
     questions = get_questions(module)
     total_questions = len(questions)
 
-    # Session-Initialisierung
-    session.setdefault('question_index', 0)
-    session.setdefault('answers', {})
-
-    if session.get('module') != module:
-        session['module'] = module
-        session['question_index'] = 0
-        session['answers'] = {}
+    start_module(module)
 
     question_index = session['question_index']
 
@@ -97,40 +549,30 @@ def basic_quiz():
         if 'back' in request.form:
             if question_index > 0:
                 session['question_index'] -= 1
-            return redirect(url_for('basic_quiz'))
+            return redirect(url_for('.basic_quiz'))
 
         # "Weiter"-Button wurde geklickt
         if 'next' in request.form:
             question = questions[question_index]
-            answer_id = request.form.get('answer')
-            free_text = request.form.get('free_text')
-
-            if answer_id:
-                answer = Answer.query.get(answer_id)
-                session['answers'][str(question.id)] = {
-                    'text': answer.text,
-                    'score': answer.score
-                }
-            elif free_text:
-                session['answers'][str(question.id)] = {
-                    'text': free_text,
-                    'score': None
-                }
+            record_answer(
+                module, question,
+                request.form.get('answer'), request.form.get('free_text')
+            )
 
             session['question_index'] += 1
 
             # Weiterleitung zur Zusammenfassung nach der letzten Frage
             if session['question_index'] >= total_questions:
-                session['basic_answers'] = session['answers']
-                return redirect(url_for('choose_module'))
+                complete_module(module)
+                return redirect(url_for('.choose_module'))
 
-        return redirect(url_for('basic_quiz'))
+        return redirect(url_for('.basic_quiz'))
 
     # GET-Request Handling
     try:
         question = questions[question_index]
     except IndexError:
-        return redirect(url_for('choose_module'))
+        return redirect(url_for('.choose_module'))
 
     return render_template(
         'basic_quiz.html',
@@ -138,33 +580,29 @@ def basic_quiz():
         question=question,
         question_index=question_index,
         total_questions=total_questions,
-        answers=session['answers']
+        answers=session['answers'],
+        running_score=session['running_score']
     )
 
-@app.route('/choose_module/', methods=['GET', 'POST'])
+@bp.route('/choose_module/', methods=['GET', 'POST'])
 def choose_module():
     if request.method == 'POST':
         selected_module = request.form.get('module')
         # Session für neues Modul zurücksetzen
         session.pop('answers', None)
         session.pop('question_index', None)
+        session.pop('running_score', None)
+        session.pop('score_version', None)
         session['module'] = selected_module
-        return redirect(url_for('quiz', module=selected_module))
+        return redirect(url_for('.quiz', module=selected_module))
     return render_template('choose_module.html')
 
-@app.route('/quiz/<module>', methods=['GET', 'POST'])
+@bp.route('/quiz/<module>', methods=['GET', 'POST'])
 def quiz(module):
     questions = get_questions(module)
     total_questions = len(questions)
 
-    # Session-Initialisierung
-    session.setdefault('question_index', 0)
-    session.setdefault('answers', {})
-
-    if session.get('module') != module:
-        session['module'] = module
-        session['question_index'] = 0
-        session['answers'] = {}
+    start_module(module)
 
     question_index = session['question_index']
 
@@ -173,524 +611,596 @@ def quiz(module):
         if 'back' in request.form:
             if question_index > 0:
                 session['question_index'] -= 1
-            return redirect(url_for('quiz', module=module))
+            return redirect(url_for('.quiz', module=module))
 
         # "Weiter"-Button Logik
         if 'next' in request.form:
             question = questions[question_index]
-            answer_id = request.form.get('answer')
-            free_text = request.form.get('free_text')
-
-            if answer_id:
-                answer = Answer.query.get(answer_id)
-                session['answers'][str(question.id)] = {
-                    'text': answer.text,
-                    'score': answer.score
-                }
-            elif free_text:
-                session['answers'][str(question.id)] = {
-                    'text': free_text,
-                    'score': None
-                }
+            record_answer(
+                module, question,
+                request.form.get('answer'), request.form.get('free_text')
+            )
 
             session['question_index'] += 1
 
             # Weiterleitung zur Zusammenfassung nach der letzten Frage
             if session['question_index'] >= total_questions:
-                session[f'{module.lower()}_answers'] = session['answers']
-                return redirect(url_for('summary'))
+                complete_module(module)
+                return redirect(url_for('.summary'))
 
-        return redirect(url_for('quiz', module=module))
+        return redirect(url_for('.quiz', module=module))
 
     # GET-Request Handling
     try:
         question = questions[question_index]
     except IndexError:
-        return redirect(url_for('summary'))
+        return redirect(url_for('.summary'))
 
     return render_template(
         f'{module.lower()}_quiz.html',
+        module=module,
         question=question,
         question_index=question_index,
         total_questions=total_questions,
-        answers=session['answers']
+        answers=session['answers'],
+        running_score=session['running_score']
+    )
+
+
+# JSON-API: Katalog einmal laden, Antworten gesammelt übertragen
+@bp.route('/api/catalog/<module>')
+def api_catalog(module):
+    catalog = get_catalog()
+    questions = get_questions(module)
+    response = jsonify(
+        version=catalog.version,
+        module=module,
+        questions=[
+            {
+                'id': q.id,
+                'text': q.text,
+                'subtitle': q.subtitle,
+                'image': q.image,
+                'info_popup': q.info_popup,
+                'answers': [
+                    {
+                        'id': a.id,
+                        'text': a.text,
+                        'score': a.score,
+                        'info_popup': a.info_popup,
+                        # Bildantworten: fertiges <picture> mit allen Varianten
+                        'picture': str(responsive_image(a.text.split()[-1] + '.jpg', alt=a.text))
+                        if q.image else None,
+                    }
+                    for a in q.answers
+                ],
+            }
+            for q in questions
+        ],
+    )
+    # Der Katalog ist für alle Nutzer gleich und ändert sich nur mit seiner Version
+    response.set_etag(catalog.version)
+    response.cache_control.public = True
+    response.cache_control.no_cache = True
+    return response.make_conditional(request)
+
+
+@bp.route('/api/answers/<module>', methods=['POST'])
+def api_answers(module):
+    questions = get_questions(module)
+    total_questions = len(questions)
+    payload = request.get_json(silent=True)
+    if not isinstance(payload, dict) or not isinstance(payload.get('answers'), list):
+        return jsonify(error="Erwartet: {\"answers\": [...]}"), 400
+
+    start_module(module)
+    catalog = get_catalog()
+    for item in payload['answers']:
+        question = catalog.question(item.get('question_id')) if isinstance(item, dict) else None
+        if question is None or question.module != module:
+            return jsonify(error="Unbekannte Frage für dieses Modul"), 400
+        try:
+            record_answer(module, question, item.get('answer_id'), item.get('free_text'))
+        except BadRequest as exc:
+            return jsonify(error=exc.description, question_id=question.id), 400
+
+    question_index = payload.get('question_index', session['question_index'])
+    if not isinstance(question_index, int):
+        return jsonify(error="question_index muss eine Zahl sein"), 400
+    session['question_index'] = max(0, min(question_index, total_questions))
+
+    next_url = None
+    if session['question_index'] >= total_questions:
+        complete_module(module)
+        next_url = url_for('.choose_module') if module == 'Basic' else url_for('.summary')
+
+    return jsonify(
+        module=module,
+        running_score=session['running_score'],
+        answered=len(session['answers']),
+        question_index=session['question_index'],
+        total_questions=total_questions,
+        complete=next_url is not None,
+        next_url=next_url,
     )
 
 
-@app.route('/upload_image', methods=['POST'])
+def image_queue_full():
+    # Die teure Arbeit (Pillow) liegt in der Bild-Warteschlange: dort begrenzen, nicht am Endpunkt
+    metrics.admission_requests.inc(endpoint='image_jobs', result='rejected')
+    return ServiceUnavailable(
+        description="Zu viele Bilder in Bearbeitung, bitte gleich noch einmal versuchen",
+        retry_after=current_app.config['ADMISSION_RETRY_AFTER'],
+    )
+
+@bp.route('/upload_image', methods=['POST'])
 def upload_image():
-    if 'image' in request.files:
-        image = request.files['image']
-        if image.filename != '':
-            image_path = os.path.join(app.config['static/images'], image.filename)
-            image.save(image_path)
-            resize_image(image_path)
-            return 'Image uploaded and resized successfully'
-    return 'No image uploaded', 400
-
-@app.route('/summary/')
+    if get_image_jobs().full():
+        raise image_queue_full()
+    image = request.files.get('image')
+    filename = secure_filename(image.filename) if image else ''
+    if not filename:
+        return 'No image uploaded', 400
+
+    # Upload in Blöcken in eine Temp-Datei schreiben, nicht im Speicher halten
+    upload_folder = get_upload_folder()
+    fd, tmp_path = tempfile.mkstemp(dir=upload_folder, suffix='.upload')
+    with os.fdopen(fd, 'wb') as tmp:
+        shutil.copyfileobj(image.stream, tmp, 64 * 1024)
+
+    image_format = sniff_image(tmp_path, current_app.config['UPLOAD_MAX_PIXELS'])
+    if image_format is None:
+        os.remove(tmp_path)
+        return 'Unsupported image', 400
+
+    # Zieldatei nach der Job-ID benennen: gleiche Dateinamen verschiedener Nutzer überschreiben sich nicht
+    job_id = uuid.uuid4().hex
+    dest_path = os.path.join(upload_folder, job_id + UPLOAD_FORMATS[image_format])
+    try:
+        job = get_image_jobs().submit(
+            job_id, process_upload, tmp_path, dest_path, current_app.config['UPLOAD_IMAGE_SIZE']
+        )
+    except QueueFull:
+        os.remove(tmp_path)
+        raise image_queue_full()
+    status_url = url_for('.upload_status', job_id=job.id)
+    response = jsonify(id=job.id, status=job.status, status_url=status_url)
+    response.status_code = 202
+    response.headers['Location'] = status_url
+    return response
+
+@bp.route('/upload_status/<job_id>')
+def upload_status(job_id):
+    # Auch Jobs anderer Worker: der Stand kommt notfalls aus der gemeinsamen Statusdatei
+    status = get_image_jobs().status(job_id)
+    if status is None:
+        return jsonify(id=job_id, status='unknown'), 404
+    result = status.pop('result')
+    if status['status'] == 'done':
+        status['url'] = url_for('.uploaded_image', filename=result)
+    return jsonify(status)
+
+def get_upload_folder():
+    folder = current_app.config['UPLOAD_FOLDER'] or os.path.join(current_app.instance_path, 'uploads')
+    os.makedirs(folder, exist_ok=True)
+    return folder
+
+@bp.route('/uploads/<filename>')
+def uploaded_image(filename):
+    # Nur fertige Bilder (<Job-ID>.<Endung>); Temp-Dateien laufender Jobs bleiben unerreichbar
+    job_id, _, extension = filename.partition('.')
+    if not (len(job_id) == 32 and job_id.isalnum() and job_id.isascii()) \
+            or '.' + extension not in UPLOAD_FORMATS.values():
+        abort(404)
+    return send_from_directory(get_upload_folder(), filename)
+
+@bp.route('/summary/')
 def summary():
     basic_answers = session.get('basic_answers', {})
     express_answers = session.get('express_answers', {})
     advanced_answers = session.get('advanced_answers', {})  # Key: 'Advanced'
 
-    # Korrekte Schlüsselverwendung
-    module_scores = {
-        'Basic': calculate_module_score(basic_answers, 'Basic'),
-        'Express': calculate_module_score(express_answers, 'Express'),
-        'Advanced': calculate_module_score(advanced_answers, 'Advanced')  # Key angepasst
-    }
-
-    total_score = module_scores['Express'] + module_scores['Advanced']
-
     # Schlüssel konsistent halten
     session['all_answers'] = {
         'Basic': basic_answers,
         'Express': express_answers,
         'Advanced': advanced_answers  # Key: 'Advanced'
     }
+    catalog = get_catalog()
+
+    # Punktestände werden beim Beantworten fortgeschrieben (running_score) und hier nur gelesen.
+    # Neu bewertet wird nur, wenn der Katalog seitdem neu eingespielt wurde
+    scoring = get_scoring()
+    stored_scores = session.get('module_scores', {})
+    score_versions = session.get('score_versions', {})
+    module_scores = {'Basic': 0}
+    for module in SCORED_MODULES:
+        if module in stored_scores and score_versions.get(module) == catalog.version:
+            module_scores[module] = stored_scores[module]
+        else:
+            module_scores[module] = scoring.score(module, session['all_answers'][module])
+    total_score = module_scores['Express'] + module_scores['Advanced']
     session['module_scores'] = module_scores  # Wichtig für die PDF
-    questions = {str(q.id): q for q in Question.query.all()}
+    session['score_versions'] = {module: catalog.version for module in SCORED_MODULES}
+
+    # Einstufung und "Was wäre, wenn": Wirkung jeder einzelnen Antwortänderung (zum selben Katalogstand)
+    evaluations = {
+        module: scoring.analyse(module, session['all_answers'][module]) for module in SCORED_MODULES
+    }
+
+    # PDF schon jetzt im Hintergrund erzeugen, bis der Download geklickt wird
+    report_job = report_fingerprint(session['all_answers'], module_scores, catalog.version)
+    enqueue_report(report_job, session['all_answers'], module_scores, catalog)
+
+    # Jeden Durchlauf einmal speichern; erneutes Laden der Seite legt keinen zweiten Eintrag an.
+    # Ohne abgeschlossenes bewertetes Modul (Crawler, direkter Aufruf) nichts speichern
+    completed = any(session['all_answers'][module] for module in SCORED_MODULES)
+    if completed and session.get('assessment_fingerprint') != report_job:
+        save_assessment(session['all_answers'], module_scores, catalog)
+        session['assessment_fingerprint'] = report_job
 
     return render_template(
         'summary.html',
         all_answers=session['all_answers'],
         module_scores=module_scores,
         total_score=total_score,
-        questions=questions
+        questions=catalog.question_map,
+        bands=catalog_bands(catalog),
+        band_tables=BAND_TABLES,
+        evaluations=evaluations,
+        report_job=report_job
     )
 
 
-@app.route('/download_pdf', methods=['GET'])
+def save_assessment(all_answers, module_scores, catalog):
+    db.session.execute(Assessment.__table__.insert(), [assessment_row(all_answers, module_scores, catalog)])
+    db.session.commit()
+
+
+def report_questions(all_answers, catalog):
+    # Nur die benötigten Fragen an den Worker-Prozess übergeben
+    return {
+        qid: catalog.question_map[qid]
+        for answers in all_answers.values()
+        for qid in answers
+        if qid in catalog.question_map
+    }
+
+
+def rendering_elsewhere(fingerprint):
+    # Läuft der Job (hier oder in einem anderen Worker) noch? Einträge älter als REPORT_JOB_TIMEOUT
+    # stammen von abgestürzten Workern und zählen nicht
+    status = get_report_jobs().status(fingerprint)
+    return (status is not None and status['status'] in ('pending', 'running')
+            and status['seconds'] < current_app.config['REPORT_JOB_TIMEOUT'])
+
+
+def wait_for_report(fingerprint, timeout):
+    """False, wenn der Bericht nach timeout Sekunden noch erzeugt wird, sonst True."""
+    job = get_report_jobs().get(fingerprint)
+    if job is not None:
+        return job.wait(timeout)
+    # Job eines anderen Workers: auf die Datei im gemeinsamen Cache warten
+    cache = get_report_cache()
+    deadline = time.monotonic() + timeout
+    while cache.get_path(fingerprint) is None and rendering_elsewhere(fingerprint):
+        if time.monotonic() >= deadline:
+            return False
+        time.sleep(current_app.config['REPORT_POLL_INTERVAL'])
+    return True
+
+
+def enqueue_report(fingerprint, all_answers, module_scores, catalog):
+    cache = get_report_cache()
+    # Rendert ein anderer Worker denselben Bericht schon, nicht noch einmal starten
+    if cache.get_path(fingerprint) is None and not rendering_elsewhere(fingerprint):
+        from report import write_report_pdf  # ReportLab erst bei Bedarf laden
+        get_report_jobs().submit(
+            fingerprint,
+            admission.run_with_slot,
+            admission.lock_directory(current_app),
+            'report.render',
+            current_app.config['REPORT_HOST_WORKERS'],
+            metrics.timed_call,
+            write_report_pdf,
+            cache.directory,
+            all_answers,
+            module_scores,
+            report_questions(all_answers, catalog),
+            catalog_bands(catalog),
+            # Läuft im Callback-Thread des Pools ohne App-Kontext: Cache direkt übergeben
+            on_success=lambda result: store_report(cache, fingerprint, *result),
+        )
+
+
+def store_report(cache, fingerprint, seconds, written, where='worker'):
+    # written: (temporäre Datei, Größe) aus report.write_report_pdf
+    metrics.pdf_render_seconds.observe(seconds, where=where)
+    return cache.put_file(fingerprint, *written)
+
+
+@bp.route('/report_status/<job_id>')
+def report_status(job_id):
+    if get_report_cache().get_path(job_id) is not None:
+        return jsonify(id=job_id, status='done', download_url=url_for('.download_pdf'))
+    status = get_report_jobs().status(job_id)
+    if status is None:
+        return jsonify(id=job_id, status='unknown'), 404
+    del status['result']
+    if status['status'] == 'done':
+        status['download_url'] = url_for('.download_pdf')
+    return jsonify(status)
+
+
+@bp.route('/download_pdf', methods=['GET'])
 def download_pdf():
     # Daten aus der Session abrufen
     all_answers = session.get('all_answers', {})
     module_scores = session.get('module_scores', {})
-    questions = {str(q.id): q for q in Question.query.all()}  # Fragen aus der Datenbank
-
-    # PDF-Konfiguration
-    pdf_buffer = BytesIO()
-    pdf = SimpleDocTemplate(pdf_buffer, pagesize=letter)
-    elements = []
-    styles = getSampleStyleSheet()
-
-    # Titel hinzufügen
-    elements.append(Paragraph("Sanierungsbewertung - Zusammenfassung", styles['Title']))
-    elements.append(Spacer(1, 20))
-
-    # Module verarbeiten
-    for module in ['Basic', 'Express', 'Advanced']:
-        if module in all_answers and all_answers[module]:
-            # Modul-Titel
-            elements.append(Paragraph(f"{module} Modul", styles['Heading2']))
-
-            # Modul-Score hervorheben (außer Basic)
-            if module != 'Basic':
-                score = module_scores.get(module, 0)  # Korrekte Modul-Scores aus der Session abrufen
-                score_paragraph = Paragraph(f"<b>Modul-Score: {score} Punkte</b>", styles['Normal'])
-                elements.append(score_paragraph)
-                elements.append(Spacer(1, 12))
-
-                # Bewertungstabelle hinzufügen
-                if module == 'Express':
-                    eval_data = [
-                        ["Eignung", "Punkte", "Empfehlung"],
-                        ["Gering", "-50 – 18", "Wirtschaftlich nicht darstellbar\nIndividuallösung erforderlich"],
-                        ["Mittel", "19 – 35", "Eingeschränkt möglich\n(Bitte suchen Sie einen Experten auf)"],
-                        ["Hoch", "36 – 60", "Gute Voraussetzungen für eine serielle Sanierung"]
-                    ]
-                elif module == 'Advanced':
-                    eval_data = [
-                        ["Kategorie", "Punktebereich", "Bewertung"],
-                        ["Niedrig", "-100 – 50", "Wirtschaftlich nicht darstellbar\nIndividuallösung erforderlich"],
-                        ["Mittel", "51 – 120", "Eingeschränkt möglich\n(Bitte suchen Sie einen Experten auf)"],
-                        ["Hoch", "121 – 180", "Sehr gute Voraussetzungen für eine serielle Sanierung"]
-                    ]
-
-                eval_table = Table(eval_data, colWidths=[150, 100, 250])  # Einheitliche Spaltenbreiten
-                eval_table.setStyle(TableStyle([
-                    ('BACKGROUND', (0,0), (-1,0), colors.lightgrey),
-                    ('TEXTCOLOR', (0,0), (-1,-1), colors.black),
-                    ('ALIGN', (0,0), (-1,-1), 'CENTER'),
-                    ('FONTNAME', (0,0), (-1,-1), 'Helvetica'),
-                    ('FONTSIZE', (0,0), (-1,-1), 10),
-                    ('BOTTOMPADDING', (0,0), (-1,-1), 8),
-                    ('GRID', (0,0), (-1,-1), 1, colors.black)
-                ]))
-                elements.append(eval_table)
-                elements.append(Spacer(1, 20))
-
-            # Fragen/Antworten-Tabelle hinzufügen
-            data = [["Frage", "Antwort"]] if module == 'Basic' else [["Frage", "Antwort", "Punkte"]]
-            for qid, answer in all_answers[module].items():
-                question_text = questions.get(qid).text if qid in questions else "Unbekannte Frage"
-                answer_text = answer.get('text', '')
-                score_text = str(answer.get('score', '-')) if module != 'Basic' else ""
-
-                if module == 'Basic':
-                    data.append([Paragraph(question_text, styles['Normal']), Paragraph(answer_text, styles['Normal'])])
-                else:
-                    data.append([Paragraph(question_text, styles['Normal']), Paragraph(answer_text, styles['Normal']), score_text])
-
-            # Einheitliche Tabellenbreite für alle Module
-            table_col_widths = [250, 250] if module == 'Basic' else [200, 200, 100]
-            table = Table(data, colWidths=table_col_widths)
-            table.setStyle(TableStyle([
-                ('BACKGROUND', (0,0), (-1,0), colors.lightgrey),
-                ('TEXTCOLOR', (0,0), (-1,-1), colors.black),
-                ('ALIGN', (0,0), (-1,-1), 'LEFT'),
-                ('FONTNAME', (0,0), (-1,-1), 'Helvetica'),
-                ('FONTSIZE', (0,0), (-1,-1), 10),
-                ('BOTTOMPADDING', (0,0), (-1,-1), 8),
-                ('GRID', (0,0), (-1,-1), 1, colors.black)
-            ]))
-            elements.append(table)
-            elements.append(Spacer(1, 36))
-
-    # PDF generieren
-    pdf.build(elements)
-    pdf_buffer.seek(0)
-
-    response = make_response(pdf_buffer.getvalue())
-    response.headers['Content-Type'] = 'application/pdf'
-    response.headers['Content-Disposition'] = 'attachment; filename=Leitfaden_Steckbrief.pdf'
-
+    catalog = get_catalog()
+
+    # Gleiche Antworten + gleicher Katalog = gleiche PDF
+    fingerprint = report_fingerprint(all_answers, module_scores, catalog.version)
+    if request.if_none_match.contains(fingerprint):
+        response = make_response('', 304)
+        response.set_etag(fingerprint)
+        response.headers['Cache-Control'] = 'private, no-cache'
+        return response
+    enqueue_report(fingerprint, all_answers, module_scores, catalog)
+
+    report_cache = get_report_cache()
+    pdf_bytes = report_cache.get_memory(fingerprint)
+    if pdf_bytes is not None:
+        pdf_file = BytesIO(pdf_bytes)
+    else:
+        with metrics.phase('pdf_wait'):
+            finished = wait_for_report(fingerprint, current_app.config['REPORT_JOB_TIMEOUT'])
+        if not finished:
+            abort(503, description="PDF wird noch erstellt")
+        pdf_file = report_cache.get_path(fingerprint)
+        if pdf_file is None:
+            # Hintergrund-Job fehlgeschlagen: im Request erzeugen
+            from report import write_report_pdf
+            with metrics.phase('pdf'):
+                seconds, written = metrics.timed_call(
+                    write_report_pdf, report_cache.directory, all_answers, module_scores, catalog.question_map,
+                    catalog_bands(catalog),
+                )
+            store_report(report_cache, fingerprint, seconds, written, where='inline')
+            pdf_file = report_cache.get_path(fingerprint)
+
+    # send_file setzt Content-Length und liefert Dateien in Blöcken aus (bzw. per sendfile unter gunicorn)
+    response = send_file(
+        pdf_file,
+        mimetype='application/pdf',
+        as_attachment=True,
+        download_name='Leitfaden_Steckbrief.pdf',
+        etag=fingerprint,
+    )
+    response.headers['Cache-Control'] = 'private, no-cache'
     return response
 
-def populate_database():
-    db.session.execute(Answer.__table__.delete())
-    db.session.execute(Question.__table__.delete())
-    db.session.commit()
-    
-    # Basic Modul
-    q1 = Question(module="Basic", text="Projektname")
-    q2 = Question(module="Basic", text="Standort")
-    q3 = Question(module="Basic", text="Wer ist Eigentümer des Gebäudes?")
-    a3_1 = Answer(question=q3, text="Privatperson", score=3)
-    a3_2 = Answer(question=q3, text="Unternehmen", score=4)
-    a3_3 = Answer(question=q3, text="Öffentliche Hand", score=2)
-    a3_4 = Answer(question=q3, text="Gesellschaft", score=4)
-    a3_5 = Answer(question=q3, text="Sonstiges", score=5)
-
-    q4 = Question(module="Basic", text="Baujahr")
-    a4_1 = Answer(question=q4, text="Vor 1950", score=6)
-    a4_2 = Answer(question=q4, text="1950-1970", score=6)
-    a4_3 = Answer(question=q4, text="1970-1990", score=8)
-    a4_4 = Answer(question=q4, text="Nach 1990", score=9)
-
-    q5 = Question(module="Basic", text="Gebäudetyp")
-    a5_1 = Answer(question=q5, text="Wohngebäude", score=2)
-    a5_2 = Answer(question=q5, text="Gewerbegebäude", score=3)
-    a5_3 = Answer(question=q5, text="Gemischt genutztes Gebäude", score=4)
-    a5_4 = Answer(question=q5, text="Sonstiges", score=6)
-
-    q6 = Question(module="Basic", text="Zweck der Sanierung?")
-    a6_1 = Answer(question=q6, text="Energetische Verbesserung", score=7)
-    a6_2 = Answer(question=q6, text="Ästhetische Aufwertung", score=7)
-    a6_3 = Answer(question=q6, text="Umnutzung", score=5)
-
-   # Express Modul
-
-    # Frage 7: Welche Form gleicht dem Gebäude?
-    q7 = Question(module="Express", text="Welcher Form oder Kontur gleicht dein Gebäude am ehesten?", image="question_7.jpg")
-    a7_1 = Answer(question=q7, text="Plattenbau", score=5, info_popup="Quelle Bild:https://pixabay.com/de/photos/mehrfamilienhaus-block-geb%C3%A4ude-haus-835817/")
-    a7_2 = Answer(question=q7, text="Industrie oder Sporthallen", score=4, info_popup="Quelle Bild:https://www.holzbau-kappler.de/referenzen/fassadensanierung-turnhalle-wachtberg/ ")
-    a7_3 = Answer(question=q7, text="Mehrfamilienhaus", score=4, info_popup="Quelle Bild:https://www.holzbau-kappler.de/referenzen/serielle-sanierung-in-idstein/")
-    a7_4 = Answer(question=q7, text="Einfamilienhaus", score=0, info_popup="Quelle Bild:https://pixabay.com/de/photos/haus-neubau-eigenheim-wohung-66627/")
-
-    # Frage 8: Stammt das Gebäude aus dem Zeitraum zwischen 1950 und 1979?
-    q8 = Question(module="Express", text="Stammt das Gebäude aus dem Zeitraum zwischen 1950 und 1979?")
-    a8_1 = Answer(question=q8, text="Ja", score=6)
-    a8_2 = Answer(question=q8, text="Nein, aber zwischen 1980–1999", score=3)
-    a8_3 = Answer(question=q8, text="Nein, vor 1950", score=0)
-    a8_4 = Answer(question=q8, text="Nein, nach 2000", score=-20)
-
-    # Frage 9: Ist die vorhandene Gebäudetechnik (Sanitär/Elektro) sanierungsbedürftig?
-    q9 = Question(module="Express", text="Ist die vorhandene Gebäudetechnik (Sanitär/Elektro) sanierungsbedürftig?")
-    a9_1 = Answer(question=q9, text="Ja", score=8)
-    a9_2 = Answer(question=q9, text="Teilweise", score=4)
-    a9_3 = Answer(question=q9, text="Nein", score=0)
-
-    # Frage 10: Fällt das Gebäude unter den Denkmalschutz?
-    q10 = Question(module="Express", text="Fällt das Gebäude unter den Denkmalschutz?")
-    a10_1 = Answer(question=q10, text="Ja", score=-25)
-    a10_2 = Answer(question=q10, text="Nein", score=12)
-
-    # Frage 11: Verfolgt der Eigentümer langfristige Ziele mit dem Objekt?
-    q11 = Question(module="Express", text="Verfolgt der Eigentümer langfristige Ziele mit dem Objekt?")
-    a11_1 = Answer(question=q11, text="Ja, langfristige Nutzung", score=15, )
-    a11_2 = Answer(question=q11, text="Unklar, keine klare Strategie erkennbar", score=2)
-    a11_3 = Answer(question=q11, text="Kurzfristige Renditeorientierung", score=-15, info_popup="Ausrichtung auf finanzielle Gewinne oder Erträge.")
-
-    # Frage 12: Gibt es Möglichkeiten/Potential für Aufstockungen oder Wohnraumerweiterungen?
-    q12 = Question(module="Express", text="Gibt es Möglichkeiten/Potential für Aufstockungen oder Wohnraumerweiterungen?")
-    a12_1 = Answer(question=q12, text="Ja", score=5)
-    a12_2 = Answer(question=q12, text="Prüffähig", score=2)
-    a12_3 = Answer(question=q12, text="Nein", score=0)
-
-    # Frage 13: Gibt es Wiederholungsfaktoren im Gebäude oder den Gebäuden?
-    q13 = Question(module="Express", text="Gibt es Wiederholungsfaktoren im Gebäude oder den Gebäuden?", info_popup="Wiederholung von Bauteilen wie Fenstern, Fassadenmodulen oder Grundrissen")
-    a13_1 = Answer(question=q13, text="Ja", score=15, info_popup="(gleiche Gebäude)")
-    a13_2 = Answer(question=q13, text="Teilweise", score=8, info_popup="(ähnliche Wohneinheiten oder Raumunterteilungen)")
-    a13_3 = Answer(question=q13, text="Nein", score=0)
-
-    # Frage 14: Welche Gebäudehöhe hat das Objekt?
-    q14 = Question(module="Express", text="Welche Gebäudehöhe hat das Objekt?")
-    a14_1 = Answer(question=q14, text="<13m", score=3)
-    a14_2 = Answer(question=q14, text="13–22m", score=2)
-    a14_3 = Answer(question=q14, text=">22m", score=-15)
-
-    # Advanced Modul
-    # Gebäudestruktur und Kubatur
-    q15 = Question(module="Advanced", text="Ist die Gebäudeform klar und strukturiert?",subtitle="Gebäudestruktur und Kubatur")
-    a15_1 = Answer(question=q15, text="Ja", score=4)
-    a15_2 = Answer(question=q15, text="Teilweise", score=2)
-    a15_3 = Answer(question=q15, text="Nein", score=0)
-
-    q16 = Question(module="Advanced", text="Welche Gebäudehöhe hat das Objekt?",subtitle="Gebäudestruktur und Kubatur")
-    a16_1 = Answer(question=q16, text="<13m", score=3)
-    a16_2 = Answer(question=q16, text="13–22m", score=2)
-    a16_3 = Answer(question=q16, text=">22m", score=-25)
-
-    q17 = Question(module="Advanced", text="Anzahl der Vor-/Rücksprüngen?",subtitle="Gebäudestruktur und Kubatur", info_popup="Vorsprünge: Erker, Balkone oder auskragende Obergeschosse Rücksprünge: Loggien, zurückversetzte Eingänge und innenliegende Balkone")
-    a17_1 = Answer(question=q17, text="Wenig", score=4, info_popup="(1-2)")
-    a17_2 = Answer(question=q17, text="Mittel", score=2, info_popup="(2-5)")
-    a17_3 = Answer(question=q17, text="Viel", score=0, info_popup="(5>10)")
-
-    q18 = Question(module="Advanced", text="Vorhandene Balkone?",subtitle="Gebäudestruktur und Kubatur")
-    a18_1 = Answer(question=q18, text="Keine", score=5)
-    a18_2 = Answer(question=q18, text="Wenige, evtl. entfernbar", score=3)
-    a18_3 = Answer(question=q18, text="Viele, evtl. entfernbar", score=2)
-    a18_4 = Answer(question=q18, text="Viele, jedoch nicht entfernbar", score=0)
-
-    q19 = Question(module="Advanced", text="Sind Dachüberstände vorhanden?",subtitle="Gebäudestruktur und Kubatur")
-    a19_1 = Answer(question=q19, text="Keine", score=3)
-    a19_2 = Answer(question=q19, text="Klein (<50cm)", score=2)
-    a19_3 = Answer(question=q19, text="Groß (>50cm)", score=0)
-
-    q20 = Question(module="Advanced", text="Wie sind die Grenzabstände des Gebäudes auf dem Grundstück?",subtitle="Gebäudestruktur und Kubatur")
-    a20_1 = Answer(question=q20, text="Gut, großzügige Abstände", score=3)
-    a20_2 = Answer(question=q20, text="Schwierig zu beurteilen", score=1)
-    a20_3 = Answer(question=q20, text="Geringe Abstände", score=0)
-
-    # Gebäudetyp und Nutzung
-    q21 = Question(module="Advanced", text="Um welchen Gebäudetyp handelt es sich?",subtitle="Gebäudetyp und Nutzung")
-    a21_1 = Answer(question=q21, text="Wohngebäude", score=6)
-    a21_2 = Answer(question=q21, text="Öffentliches Gebäude (Schule/Sporthallen usw.)", score=4)
-    a21_3 = Answer(question=q21, text="Gewerbe mit Umnutzungspotenzial", score=4, info_popup="Die Möglichkeit, bestehende Gebäude für neue Zwecke zu nutzen, z. B. die Umwandlung von Gewerbeimmobilien in Wohnraum.")
-    a21_4 = Answer(question=q21, text="Gewerbe ohne Umnutzungspotential", score=-20)
-    a21_5 = Answer(question=q21, text="Mischgebäude ohne Potenzial zur Umnutzung", score=-20)
-    a21_6 = Answer(question=q21, text="Sonstige nicht aufgeführte Gebäudetypen", score=-10)
-
-    q22 = Question(module="Advanced", text="Wie viele Wohneinheiten hat das Objekt?",subtitle="Gebäudetyp und Nutzung")
-    a22_1 = Answer(question=q22, text=">5", score=8)
-    a22_2 = Answer(question=q22, text="2–5", score=4)
-    a22_3 = Answer(question=q22, text="<2", score=0)
-
-    # Gebäudealter und Bauweise
-    q23 = Question(module="Advanced", text="Baujahr des Gebäudes?",subtitle="Gebäudealter und Bauweise")
-    a23_1 = Answer(question=q23, text="Vor 1950", score=0)
-    a23_2 = Answer(question=q23, text="1950–1970", score=3)
-    a23_3 = Answer(question=q23, text="1970–1990", score=1)
-    a23_4 = Answer(question=q23, text="Nach 1990", score=-25)
-
-    q24 = Question(module="Advanced", text="Sind Bestandsunterlagen vorhanden?",subtitle="Gebäudealter und Bauweise", info_popup="Sind z.B. Dokumente, die den baulichen Zustand, die Konstruktion und technische Details des Gebäudes festhalten.")
-    a24_1 = Answer(question=q24, text="Ja", score=3)
-    a24_2 = Answer(question=q24, text="Teilweise", score=1)
-    a24_3 = Answer(question=q24, text="Nein", score=0)
-
-    q25 = Question(module="Advanced", text="Gibt es Schadstoffbelastungen?",subtitle="Gebäudealter und Bauweise", info_popup="Schadstoffbelastungen bei alten Gebäuden beziehen sich auf gefährliche Materialien wie Asbest, PCB oder Schwermetalle, die gesundheitliche Risiken darstellen.")
-    a25_1 = Answer(question=q25, text="Nein", score=4)
-    a25_2 = Answer(question=q25, text="Ja", score=-5)
-    a25_3 = Answer(question=q25, text="Keine Angabe möglich", score=0)
-
-    q26 = Question(module="Advanced", text="Wurden bereits Teilsanierungen durchgeführt?",subtitle="Gebäudealter und Bauweise")
-    a26_1 = Answer(question=q26, text="Nein", score=4)
-    a26_2 = Answer(question=q26, text="Ja, dokumentiert", score=2)
-    a26_3 = Answer(question=q26, text="Ja, undokumentiert", score=-2)
-
-    # Statik und Tragfähigkeit
-    q27 = Question(module="Advanced",
-                text="Tragstruktur in gutem Zustand und geeignet für weitere Lastaufnahme?",subtitle="Statik und Tragfähigkeit")
-    a27_1 = Answer(question=q27, text="Geeignet", score=8)
-    a27_2 = Answer(question=q27, text="Ungeeignet/unbekannt", score=0)
-
-    q28 = Question(module="Advanced", text="Liegt die Kellerdecke über Geländeoberkante?",subtitle="Statik und Tragfähigkeit" ,info_popup="Ist die Decke vom Keller höher als der Boden draußen")
-    a28_1 = Answer(question=q28, text="Ja >50cm", score=4)
-    a28_2 = Answer(question=q28, text="Knapp <50cm", score=2)
-    a28_3 = Answer(question=q28, text="Ebenerdig/tiefer", score=0)
-
-    q29 = Question(module="Advanced",
-                text="Gibt es bei Ihrem Gebäude eine vorgehängte Fassade?",subtitle="Statik und Tragfähigkeit" ,info_popup="Eine vorgehängte Fassade ist eine Außenwandverkleidung, die mit Abstand zur tragenden Wand montiert wird, z. B. aus Glas oder Faserpaneelen, oft hinterlüftet.")
-    a29_1 = Answer(question=q29, text="Nein", score=5)
-    a29_2 = Answer(question=q29, text="Ja", score=0)
-    a29_3 = Answer(question=q29, text=("Unbekannt (Kann ich nicht beurteilen)"), 
-                score=2)
-    # Technische Gebäudeausrüstung (TGA)
-    q30 = Question(module="Advanced", text="Wie ist der Zustand bestehender Heizung/Wasserleitungen/Rohre?",subtitle="Technische Gebäudeausrüstung (TGA)")
-    a30_1 = Answer(question=q30, text="Komplett erneuerungsbedürftig", score=6)
-    a30_2 = Answer(question=q30, text="Sanierungsbedürftig", score=3)
-    a30_3 = Answer(question=q30, text="Gut nutzbar", score=0)
-
-    q31 = Question(module="Advanced", text="Zustand bestehender Elektroinstallation?",subtitle="Technische Gebäudeausrüstung (TGA)")
-    a31_1 = Answer(question=q31, text="Komplett erneuerungsbedürftig", score=6)
-    a31_2 = Answer(question=q31, text="Sanierungsbedürftig", score=3)
-    a31_3 = Answer(question=q31, text="Gut", score=0)
-
-    q32 = Question(module="Advanced", text="Gibt es zentrale TGA-Räume?",subtitle="Technische Gebäudeausrüstung (TGA)")
-    a32_1 = Answer(question=q32, text="Ja", score=2)
-    a32_2 = Answer(question=q32, text="Teilweise anpassbar", score=1)
-    a32_3 = Answer(question=q32, text="Nein", score=0)
-
-    q33 = Question(module="Advanced",text="Sind zentrale Flure oder Installationsschächte vorhanden,um Leitungen effizient zu verteilen?",subtitle="Technische Gebäudeausrüstung (TGA)")
-    a33_1 = Answer(question=q33, text="Ja", score=4)
-    a33_2 = Answer(question=q33, text="Teilweise, Anpassungen nötig", score=2)
-    a33_3 = Answer(question=q33, text="Nein", score=0)
-
-    # Energieeffizienz & Förderfähigkeit
-    q34 = Question(module="Advanced",
-                text="Aktuelle Energieeffizienzklasse des Gebäudes "
-                        "(„Worst Performing Building“):",subtitle="Energieeffizienz & Förderfähigkeit")
-    a34_1 = Answer(question=q34, text="Sehr schlecht (vor 1958)", score=6)
-    a34_2 = Answer(question=q34, text="Mittelmäßig (1958–1979)", score=3)
-    a34_3 = Answer(question=q34, text="Bereits saniert (+1980)", score=0)
-
-    q35 = Question(module="Advanced",
-                text="Welcher KfW-Effizienzhausstandard ist in Zukunft evtl. erreichbar?",subtitle="Energieeffizienz & Förderfähigkeit")
-    a35_1 = Answer(question=q35, text="Problemlos EH55/EH40 möglich", score=6)
-    a35_2 = Answer(question=q35, text="Schwierig EH55 knapp möglich", score=3)
-    a35_3 = Answer(question=q35, text="Nicht erreichbar/extrem teuer", score=0)
-    a35_4 = Answer(question=q35, text="Nicht beurteilbar", score=0)
-
-    q36 = Question(module="Advanced", text="Wie würden Sie den aktuellen Energieverbrauch des Gebäudes einschätzen?",subtitle="Energieeffizienz & Förderfähigkeit")
-    a36_1 = Answer(question=q36, text="Niedrig", score=-2, info_popup="Das Gebäude hat einen geschätzten Energieverbrauch von unter 100 kWh/m² pro Jahr (z. B. Effizienzklasse A bis C).")
-    a36_2 = Answer(question=q36, text="Mittel", score=3, info_popup="Der Energieverbrauch liegt zwischen 100 und 200 kWh/m² pro Jahr (z. B. Effizienzklasse D bis F).")
-    a36_3 = Answer(question=q36, text="Hoch", score=6, info_popup="Der Energieverbrauch übersteigt 200 kWh/m² pro Jahr (z. B. Effizienzklasse G oder H).")
-
-    q37 = Question(module="Advanced", text="Gibt es Potential durch zusätzliche Maßnahmen, höhere Förderquoten zu erreichen?",subtitle="Energieeffizienz & Förderfähigkeit" ,info_popup="z.B. Photovoltaikanlagen")
-    a37_1 = Answer(question=q37, text="Ja", score=2)
-    a37_2 = Answer(question=q37, text="Eingeschränkt", score=1)
-    a37_3 = Answer(question=q37, text="Nein", score=0)
-
-    # Wirtschaftlichkeit
-    q38 = Question(module="Advanced", text="Zusätzliche Kosten durch Rückbau alter Maßnahmen erwartet?",subtitle="Wirtschaftlichkeit" ,info_popup="Der Rückbau alter Maßnahmen im Baugewerbe bedeutet das Entfernen oder Demontieren veralteter Bauteile, schadstoffbelasteter Materialien oder Anbauten.")
-    a38_1 = Answer(question=q38, text="Keine Kosten erwartet", score=2)
-    a38_2 = Answer(question=q38, text="Zusatzkosten erwartet", score=0)
-
-    q39 = Question(module="Advanced", text="Ist eine Komplettlösung durch ein Generalunternehmer möglich?",subtitle="Wirtschaftlichkeit" ,info_popup="Ein Generalunternehmer (GU) ist ein Bauunternehmen, das die vollständige Ausführung eines Bauprojekts übernimmt, einschließlich der Koordination von Subunternehmern, und das Bauwerk meist schlüsselfertig an den Auftraggeber übergibt.")
-    a39_1 = Answer(question=q39, text="Ja", score=5)
-    a39_2 = Answer(question=q39, text=("Teilweise möglich," " mit zusätzlicher Koordination"), score=2)
-    a39_3 = Answer(question=q39, text=("Nein"), score=0)
-
-    q40 = Question(module="Advanced", text="Gibt es Wiederholungsfaktoren im Gebäude oder den Gebäuden?",subtitle="Wirtschaftlichkeit")
-    a40_1 = Answer(question=q40, text="Ja, das Objekt/die Objekte sind gleich aufgebaut", score=15)
-    a40_2 = Answer(question=q40, text="Teilweise, die Stockwerke/Wohneinheiten sind ähnlich", score=10)
-    a40_3 = Answer(question=q40, text="Nein, es gibt keine oder nur geringe Wiederholungsfaktoren", score=0)
-
-    # Nachhaltigkeit und Baustoffqualität
-    q41 = Question(module="Advanced", text="Möchten Sie Materialien mit geringen Rückbaukosten einsetzen?",subtitle="Nachhaltigkeit und Baustoffqualität")
-    a41_1 = Answer(question=q41, text="Ja", score=2)
-    a41_2 = Answer(question=q41, text="Teilweise", score=1)
-    a41_3 = Answer(question=q41, text="Nein", score=0)
-
-    q42 = Question(module="Advanced",
-                text="Ist Ihnen eine nachhaltige Bauweise wichtig?",subtitle="Nachhaltigkeit und Baustoffqualität")
-    a42_1 = Answer(question=q42, text="Ja, evtl. auch trotz Mehrkosten", score=2)
-    a42_2 = Answer(question=q42, text="Teilweise", score=1)
-    a42_3 = Answer(question=q42, text="Nein, Hauptsache kostengünstig", score=0)
-
-    q43 = Question (module="Advanced",text="Soll durch die Sanierung eine deutliche Verbesserung der Wohnqualität erreicht werden?",subtitle="Nachhaltigkeit und Baustoffqualität")
-    a43_1 = Answer(question=q43, text="Ja", score=2)
-    a43_2 = Answer(question=q43, text="Teilweise", score=1)
-    a43_3 = Answer(question=q43, text="Nein", score=0)
-
-    # Ziele des Auftraggebers
-    q44 = Question(module="Advanced",
-                text="Ist eine schnelle Umsetzung der Sanierung gewünscht (kurze Bauzeit, geringe Mietausfälle)?", subtitle="Ziele des Auftraggebers")
-    a44_1 = Answer(question=q44, text="Ja, ist gewünscht", score=2)
-    a44_2 = Answer(question=q44, text=("Teilweise," " mit Einschränkungen"), score=1)
-    a44_3 = Answer(question=q44,text=("Nein," " eher nicht nötig"), score=0)
-
-    q45 = Question(module="Advanced",text="Ist es gewünscht," " dass die Mieter während der Sanierung im Objekt wohnen?", subtitle="Ziele des Auftraggebers")
-    a45_1 = Answer(question=q45,text="Teilweise," " soweit wie möglich", score=2)
-    a45_2 = Answer(question=q45,text="Ja," " dauerhaft", score=1)
-    a45_3 = Answer(question=q45,text="Nein", score=0)
-
-    q46 = Question(module="Advanced", text="Verfolgt der Eigentümer langfristige Ziele mit dem Objekt?", subtitle="Ziele des Auftraggebers")
-    a46_1 = Answer(question=q46, text="Ja, langfristige Nutzung", score=15)
-    a46_2 = Answer(question=q46, text="Unklar, keine klare Strategie erkennbar", score=2)
-    a46_3 = Answer(question=q46, text="Kurzfristige Renditeorientierung ",score=-15)
-
-    q47 = Question(module="Advanced",text=("Ist es gewünscht, den Wohnraum zu erweitern?"), subtitle="Ziele des Auftraggebers")
-    a47_1 = Answer(question=q47, text="Ja, durch eine Aufstockung", score=4)
-    a47_2 = Answer(question=q47, text="Teilweise, z.B. durch Integration von Balkonen in den Wohnraum", score=2)
-    a47_3 = Answer(question=q47, text="Nein", score=0)
-
-    # Füge alle Fragen und Antworten zur Datenbank hinzu
-    db.session.add_all([
-        # Basic Modul
-        q1, q2, q3, q4, q5, q6,
-        a3_1, a3_2, a3_3, a3_4, a3_5,
-        a4_1, a4_2, a4_3, a4_4,
-        a5_1, a5_2, a5_3, a5_4,
-        a6_1, a6_2, a6_3,
-
-        # Express Modul
-        q7, q8, q9, q10, q11, q12, q13, q14,
-        a7_1, a7_2, a7_3, a7_4,
-        a8_1, a8_2, a8_3,
-        a9_1, a9_2, a9_3,
-        a10_1, a10_2,
-        a11_1, a11_2, a11_3,
-        a12_1, a12_2, a12_3,
-        a13_1, a13_2, a13_3,
-        a14_1, a14_2, a14_3,
-
-        # Advanced Modul
-        q15, q16, q17, q18, q19, q20, q21, q22, q23, q24, q25, q26, q27, q28, q29, q30, q31, q32, q33, q34, q35, q36, q37, q38, q39, q40, q41, q42, q43, q44, q45, q46, q47,
-        a14_1, a14_2, a14_3,
-        a15_1, a15_2, a15_3,
-        a16_1, a16_2, a16_3,
-        a17_1, a17_2, a17_3,
-        a18_1, a18_2, a18_3,
-        a19_1, a19_2, a19_3,
-        a20_1, a20_2, a20_3, 
-        a21_1, a21_2, a21_3,
-        a22_1, a22_2, a22_3,
-        a23_1, a23_2, a23_3,
-        a24_1, a24_2, a24_3,
-        a25_1, a25_2, a25_3,
-        a26_1, a26_2,
-        a27_1, a27_2, 
-        a28_1, a28_2, a28_3,
-        a29_1, a29_2, a29_3,
-        a30_1, a30_2, a30_3,
-        a31_1, a31_2, a31_3,
-        a32_1, a32_2, a32_3,
-        a33_1, a33_2, a33_3,
-        a34_1, a34_2, a34_3,
-        a35_1, a35_2,
-        a36_1, a36_2, a36_3,
-        a37_1, a37_2,
-        a38_1, a38_2,
-        a39_1, a39_2,a39_3,
-        a40_1, a40_2,a40_3,
-        a41_1, a41_2,a41_3,
-        a42_1, a42_2,a42_3,
-        a43_1, a43_2,a43_3,
-        a44_1, a44_2,a44_3,
-        a45_1, a45_2,a45_3,
-        a46_1, a46_2,a46_3,     
-        a47_1, a47_2,a47_3,
-    
-    ])
-
+def _catalog_rows(data):
+    questions, answers, bands = {}, {}, {}
+    for q in data['questions']:
+        questions[q['id']] = {
+            'id': q['id'],
+            'module': q['module'],
+            'text': q['text'],
+            'subtitle': q.get('subtitle'),
+            'image': q.get('image'),
+            'info_popup': q.get('info_popup'),
+        }
+        for position, a in enumerate(q.get('answers', [])):
+            answers[a['id']] = {
+                'id': a['id'],
+                'question_id': q['id'],
+                'position': position,
+                'text': a.get('text'),
+                'score': a.get('score'),
+                'info_popup': a.get('info_popup'),
+            }
+    for b in data.get('bands', []):
+        bands[b['id']] = {
+            'id': b['id'],
+            'module': b['module'],
+            'label': b['label'],
+            'min_score': b['min_score'],
+            'max_score': b['max_score'],
+            'recommendation': b['recommendation'],
+        }
+    return questions, answers, bands
+
+def _sync_table(model, desired):
+    # Nur Unterschiede schreiben: IDs bleiben stabil, unveränderte Zeilen werden nicht angefasst
+    table = model.__table__
+    existing = {row['id']: dict(row) for row in db.session.execute(select(table)).mappings()}
+    inserts = [row for row_id, row in desired.items() if row_id not in existing]
+    updates = [
+        {**row, '_id': row_id}
+        for row_id, row in desired.items()
+        if row_id in existing and existing[row_id] != row
+    ]
+    deletes = [row_id for row_id in existing if row_id not in desired]
+    return table, inserts, updates, deletes
+
+def _apply_changes(table, inserts, updates):
+    if inserts:
+        db.session.execute(table.insert(), inserts)
+    if updates:
+        columns = {c.name: bindparam(c.name) for c in table.columns if c.name != 'id'}
+        db.session.execute(
+            table.update().where(table.c.id == bindparam('_id')).values(columns), updates
+        )
+
+def populate_database(path=None):
+    path = path or current_app.config['CATALOG_FILE']
+    with open(path, 'rb') as f:
+        raw = f.read()
+    content_hash = hashlib.sha256(raw).hexdigest()
+
+    meta = db.session.get(CatalogMeta, 'content_hash')
+    if meta is not None and meta.value == content_hash:
+        print("Fragenkatalog unverändert.")
+        return False
+
+    questions, answers, bands = _catalog_rows(json.loads(raw))
+    question_table, q_inserts, q_updates, q_deletes = _sync_table(Question, questions)
+    answer_table, a_inserts, a_updates, a_deletes = _sync_table(Answer, answers)
+    band_table, b_inserts, b_updates, b_deletes = _sync_table(EvaluationBand, bands)
+
+    # Reihenfolge wegen Fremdschlüssel: Antworten vor Fragen löschen, Fragen vor Antworten anlegen
+    if a_deletes:
+        db.session.execute(answer_table.delete().where(answer_table.c.id.in_(a_deletes)))
+    if q_deletes:
+        db.session.execute(question_table.delete().where(question_table.c.id.in_(q_deletes)))
+    if b_deletes:
+        db.session.execute(band_table.delete().where(band_table.c.id.in_(b_deletes)))
+    _apply_changes(question_table, q_inserts, q_updates)
+    _apply_changes(answer_table, a_inserts, a_updates)
+    _apply_changes(band_table, b_inserts, b_updates)
+
+    if meta is None:
+        db.session.add(CatalogMeta(key='content_hash', value=content_hash))
+    else:
+        meta.value = content_hash
     db.session.commit()
-    print("Datenbank erfolgreich befüllt!")
+    invalidate_catalog()
+    print(
+        f"Datenbank erfolgreich befüllt! Fragen +{len(q_inserts)} ~{len(q_updates)} -{len(q_deletes)}, "
+        f"Antworten +{len(a_inserts)} ~{len(a_updates)} -{len(a_deletes)}, "
+        f"Bewertungsstufen +{len(b_inserts)} ~{len(b_updates)} -{len(b_deletes)}"
+    )
+    return True
+
+@bp.cli.command('init-db')
+def init_db_command():
+    # Schema migrieren (auch Datenbanken von vor den Migrationen) und Fragenkatalog einspielen
+    upgrade_database()
+    populate_database()
+
+def iter_assessments(batch_size=1000, max_id=None, ids=None):
+    # Zeilen stapelweise vom Cursor lesen statt alle auf einmal zu laden
+    table = Assessment.__table__
+    query = select(table).order_by(table.c.id)
+    if max_id is not None:
+        query = query.where(table.c.id <= max_id)
+    if ids:
+        query = query.where(table.c.id.in_(ids))
+    result = db.session.execute(query.execution_options(yield_per=batch_size))
+    for partition in result.mappings().partitions():
+        yield from partition
+
+def score_distributions(batch_size=10000):
+    catalog = get_catalog()
+    distributions = {}
+    for module in SCORED_MODULES:
+        column = getattr(Assessment, f'{module.lower()}_score')
+        distribution = ScoreDistribution(*score_bounds(catalog, module))
+        result = db.session.execute(
+            select(column).where(column.is_not(None)).execution_options(yield_per=batch_size)
+        )
+        for scores in result.scalars().partitions():
+            distribution.add(scores)
+        distributions[module] = distribution
+    return distributions
+
+def rescored_distributions(batch_size=10000):
+    # Punkte neu aus den gespeicherten Antworten berechnen, z.B. nach geänderten Punkten im Katalog
+    catalog = get_catalog()
+    scoring = get_scoring()
+    distributions = {module: ScoreDistribution(*score_bounds(catalog, module)) for module in SCORED_MODULES}
+    batch = []
+
+    def flush():
+        for module, distribution in distributions.items():
+            answered = [items for items in batch if items.get(module)]
+            if answered:
+                distribution.add(scoring.score_batch(module, answered))
+        batch.clear()
+
+    for row in iter_assessments(batch_size):
+        batch.append(json.loads(row['answers']))
+        if len(batch) == batch_size:
+            flush()
+    flush()
+    return distributions
+
+@bp.cli.command('export-assessments')
+@click.argument('output')
+@click.option('--format', 'fmt', type=click.Choice(['csv', 'columns']), default='csv',
+              help='csv: eine Datei; columns: ein Verzeichnis mit einer Datei je Spalte (.npy/.jsonl)')
+@click.option('--batch-size', default=1000, show_default=True)
+def export_assessments_command(output, fmt, batch_size):
+    catalog = get_catalog()
+    count, max_id = db.session.execute(select(func.count(), func.max(Assessment.id))).one()
+    rows = iter_assessments(batch_size, max_id)
+    if fmt == 'csv':
+        with open(output, 'w', encoding='utf-8', newline='') as f:
+            for chunk in iter_csv(rows, catalog):
+                f.write(chunk)
+    else:
+        write_columns(output, rows, count, catalog)
+    print(f"{count} Auswertungen exportiert: {output}")
+
+def assessment_report_inputs(ids=None, batch_size=200):
+    # (Dateiname, Argumente für build_report_pdf) je gespeichertem Durchlauf
+    catalog = get_catalog()
+    for row in iter_assessments(batch_size, ids=ids):
+        all_answers = expand_answers(json.loads(row['answers']), catalog)
+        module_scores = {'Basic': 0}
+        module_scores.update(
+            (module, row[f'{module.lower()}_score'] or 0) for module in SCORED_MODULES
+        )
+        name = secure_filename(row['project_name'] or '') or 'Steckbrief'
+        yield f"{row['id']:06d}_{name}.pdf", (
+            all_answers, module_scores, report_questions(all_answers, catalog), catalog_bands(catalog)
+        )
+
+@bp.cli.command('export-reports')
+@click.argument('output')
+@click.option('--id', 'ids', type=int, multiple=True, help='nur diese Durchläufe (mehrfach angebbar)')
+@click.option('--workers', type=int, default=None, help='Prozesse (Standard: Anzahl CPUs)')
+@click.option('--window', type=int, default=None, help='max. gleichzeitig offene Dokumente (Standard: 2 x Prozesse)')
+@click.option('--verbose', is_flag=True, help='Zeit je Dokument ausgeben')
+def export_reports_command(output, ids, workers, window, verbose):
+    from bulk_reports import build_reports_zip
+
+    def progress(name, render, turnaround, size):
+        if verbose:
+            print(f"{name}: {render * 1000:.0f} ms Rendern, {turnaround * 1000:.0f} ms gesamt, {size} Bytes")
+
+    result = build_reports_zip(output, assessment_report_inputs(ids), workers, window, on_done=progress)
+    print(f"{output}: " + ', '.join(f"{key}={value}" for key, value in result.items()))
+
+@bp.cli.command('assessment-stats')
+@click.option('--json', 'as_json', is_flag=True, help='Ausgabe als JSON')
+@click.option('--rescore', is_flag=True, help='Punkte mit dem aktuellen Katalog neu berechnen statt gespeicherte lesen')
+def assessment_stats_command(as_json, rescore):
+    scoring = get_scoring()
+    distributions = rescored_distributions() if rescore else score_distributions()
+    summaries = {
+        module: {**d.summary(), 'bands': scoring.band_counts(module, d)} for module, d in distributions.items()
+    }
+    if as_json:
+        print(json.dumps(summaries, indent=2))
+        return
+    for module, summary in summaries.items():
+        print(f"{module}: " + ', '.join(f"{key}={value}" for key, value in summary.items()))
 
 if __name__ == '__main__':
+    # Desktop-Start (auch im PyInstaller-Build). Serverbetrieb: gunicorn -c gunicorn.conf.py
+    import multiprocessing
+    import sys
+    import webbrowser
+    multiprocessing.freeze_support()  # Prozess-Pool im PyInstaller-Build
+    app = create_app()
     with app.app_context():
-        db.create_all()
+        upgrade_database()
         populate_database()
+        # Im PyInstaller-Build liegen Bundles und Bildvarianten schon vor (app.spec)
+        if not getattr(sys, 'frozen', False):
+            build_images()
+            build_assets()
     webbrowser.open('http://127.0.0.1:5000')
-    app.run(debug=True, use_reloader=False)
+    app.run(host='127.0.0.1', port=5000, threaded=True)
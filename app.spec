@@ -0,0 +1,69 @@
+# -*- mode: python ; coding: utf-8 -*-
+# Desktop-Build: pyinstaller app.spec
+#
+# onedir statt onefile: die Anwendung liegt entpackt neben der .exe, statt bei jedem
+# Start PYZ und base_library.zip in ein Temp-Verzeichnis zu entpacken.
+import os
+import sys
+
+sys.path.insert(0, SPECPATH)
+from assets import build_bundles
+from images import build_image_variants
+
+# CSS/JS-Bundles (brotli, zopfli) und Bildvarianten schon beim Paketieren erzeugen: sonst kostet
+# der erste Start einige Sekunden, und im schreibgeschützten Installationsverzeichnis schlägt er fehl
+build_bundles(os.path.join(SPECPATH, 'assets'), os.path.join(SPECPATH, 'static', 'dist', 'assets'))
+build_image_variants(os.path.join(SPECPATH, 'static', 'images'), os.path.join(SPECPATH, 'static', 'dist', 'images'))
+
+a = Analysis(
+    ['app.py'],
+    pathex=[],
+    binaries=[],
+    datas=[
+        ('templates', 'templates'),
+        ('static/images', 'static/images'),
+        ('static/js', 'static/js'),
+        ('static/dist', 'static/dist'),
+        ('assets', 'assets'),
+        ('data', 'data'),
+        ('migrations', 'migrations'),
+    ],
+    hiddenimports=[],
+    hookspath=[],
+    hooksconfig={},
+    runtime_hooks=[],
+    # Nicht benötigte Pakete aus requirements.txt, die sonst mitgezogen würden
+    excludes=[
+        'pdfkit',
+        'weasyprint',
+        'xhtml2pdf',
+        'pyhanko',
+        'tkinter',
+        'setuptools',
+        'pkg_resources',
+    ],
+    noarchive=False,
+    optimize=1,
+)
+pyz = PYZ(a.pure)
+
+exe = EXE(
+    pyz,
+    a.scripts,
+    [],
+    exclude_binaries=True,
+    name='app',
+    debug=False,
+    bootloader_ignore_signals=False,
+    strip=False,
+    upx=False,
+    console=True,
+)
+coll = COLLECT(
+    exe,
+    a.binaries,
+    a.datas,
+    strip=False,
+    upx=False,
+    name='app',
+)
@@ -0,0 +1,250 @@
+import csv
+import io
+import json
+import os
+from datetime import datetime, timezone
+
+# numpy wird erst für Export und Auswertung geladen, nicht beim Start der Anwendung
+
+MODULES = ('Basic', 'Express', 'Advanced')
+SCORED_MODULES = ('Express', 'Advanced')
+# Basic-Fragen mit den Projektdaten (IDs sind in data/catalog.json fest vergeben)
+PROJECT_NAME_QUESTION = '1'
+LOCATION_QUESTION = '2'
+TEXT_LENGTH = 200
+
+FIXED_COLUMNS = (
+    'id', 'created', 'catalog_version', 'project_name', 'location', 'express_score', 'advanced_score'
+)
+
+
+def compact_answers(all_answers, catalog):
+    # Auswahlantworten als Antwort-ID, Freitext als String: {"Express": {"12": 34}, "Basic": {"1": "..."}}
+    compact = {}
+    for module, answers in all_answers.items():
+        items = {}
+        for qid, entry in answers.items():
+            answer = catalog.find_answer(qid, entry.get('text'))
+            items[qid] = answer.id if answer is not None else entry.get('text')
+        if items:
+            compact[module] = items
+    return compact
+
+
+def expand_answers(compact, catalog):
+    # Gegenstück zu compact_answers: wieder im Format der Session
+    all_answers = {module: {} for module in MODULES}
+    for module, items in compact.items():
+        for qid, value in items.items():
+            if isinstance(value, int):
+                answer = catalog.answer(value)
+                entry = {'text': answer.text, 'score': answer.score} if answer else {'text': None, 'score': None}
+            else:
+                entry = {'text': value, 'score': None}
+            all_answers.setdefault(module, {})[qid] = entry
+    return all_answers
+
+
+def assessment_row(all_answers, module_scores, catalog):
+    basic = all_answers.get('Basic', {})
+
+    def text(qid):
+        value = (basic.get(qid) or {}).get('text')
+        return value[:TEXT_LENGTH] if value else None
+
+    return {
+        'created': datetime.now(timezone.utc).replace(tzinfo=None),
+        'catalog_version': catalog.version,
+        'project_name': text(PROJECT_NAME_QUESTION),
+        'location': text(LOCATION_QUESTION),
+        # Nicht bearbeitete Module bleiben leer statt 0, damit sie die Verteilung nicht verfälschen
+        **{
+            f'{module.lower()}_score': module_scores.get(module, 0) if all_answers.get(module) else None
+            for module in SCORED_MODULES
+        },
+        'answers': json.dumps(compact_answers(all_answers, catalog), separators=(',', ':')),
+    }
+
+
+def answer_columns(catalog):
+    # Eine Spalte je Frage, in Katalogreihenfolge
+    return [(module, question) for module in MODULES for question in catalog.questions(module)]
+
+
+def _created(value):
+    return value.isoformat(sep=' ', timespec='seconds') if value else ''
+
+
+def iter_csv(rows, catalog, chunk_rows=500):
+    """Erzeugt die CSV-Datei stückweise; rows darf ein beliebig großer Iterator sein."""
+    columns = answer_columns(catalog)
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(FIXED_COLUMNS + tuple(f'{module.lower()}_{question.id}' for module, question in columns))
+
+    for count, row in enumerate(rows, 1):
+        answers = json.loads(row['answers'])
+        values = [
+            row['id'], _created(row['created']), row['catalog_version'], row['project_name'],
+            row['location'], row['express_score'], row['advanced_score'],
+        ]
+        for module, question in columns:
+            value = answers.get(module, {}).get(str(question.id))
+            if isinstance(value, int):
+                answer = catalog.answer(value)
+                value = answer.text if answer else value
+            values.append(value)
+        writer.writerow(values)
+        if count % chunk_rows == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
+
+
+def write_columns(directory, rows, count, catalog, chunk_rows=1000):
+    """Spaltenweiser Export: Zahlen als .npy (memory-mapped), Texte als .jsonl.
+
+    count muss die Zahl der Zeilen in rows sein; im Speicher liegen höchstens chunk_rows Zeilen.
+    """
+    import numpy as np
+    from numpy.lib.format import open_memmap
+
+    os.makedirs(directory, exist_ok=True)
+    columns = answer_columns(catalog)
+    choice_columns = [(m, q) for m, q in columns if q.answers]
+    free_text_columns = [(m, q) for m, q in columns if not q.answers]
+    text_columns = ['catalog_version', 'project_name', 'location'] + [
+        f'{m.lower()}_{q.id}' for m, q in free_text_columns
+    ]
+    missing_score = int(np.iinfo(np.int32).min)  # Modul nicht bearbeitet
+
+    # Sekunden seit 1970 (UTC) für created; Antwort-ID je Auswahlfrage, -1 = nicht beantwortet
+    dtypes = {'id': np.int64, 'created': np.float64, 'express_score': np.int32, 'advanced_score': np.int32}
+    dtypes.update({f'{m.lower()}_{q.id}': np.int32 for m, q in choice_columns})
+    arrays = {
+        name: open_memmap(os.path.join(directory, f'{name}.npy'), mode='w+', dtype=dtype, shape=(count,))
+        for name, dtype in dtypes.items()
+    }
+    text_files = {
+        name: open(os.path.join(directory, f'{name}.jsonl'), 'w', encoding='utf-8') for name in text_columns
+    }
+
+    def numeric_values(row, answers):
+        created = row['created']
+        values = [
+            row['id'],
+            created.replace(tzinfo=timezone.utc).timestamp() if created else np.nan,
+        ]
+        values.extend(
+            missing_score if row[f'{m.lower()}_score'] is None else row[f'{m.lower()}_score']
+            for m in SCORED_MODULES
+        )
+        for module, question in choice_columns:
+            value = answers.get(module, {}).get(str(question.id))
+            values.append(value if isinstance(value, int) else -1)
+        return values
+
+    def flush(offset, chunk):
+        # Ganze Blöcke zuweisen statt einzelner Elemente
+        block = np.array(chunk, dtype=np.float64)
+        for i, arr in enumerate(arrays.values()):
+            arr[offset:offset + len(chunk)] = block[:, i]
+
+    written = 0
+    chunk = []
+    try:
+        for row in rows:
+            if written + len(chunk) >= count:
+                break
+            answers = json.loads(row['answers'])
+            chunk.append(numeric_values(row, answers))
+            values = [row['catalog_version'], row['project_name'], row['location']] + [
+                answers.get(module, {}).get(str(question.id)) for module, question in free_text_columns
+            ]
+            for name, value in zip(text_columns, values):
+                text_files[name].write(json.dumps(value, ensure_ascii=False) + '\n')
+            if len(chunk) == chunk_rows:
+                flush(written, chunk)
+                written += len(chunk)
+                chunk = []
+        if chunk:
+            flush(written, chunk)
+            written += len(chunk)
+    finally:
+        for f in text_files.values():
+            f.close()
+        for arr in arrays.values():
+            arr.flush()
+
+    schema = {
+        'rows': written,
+        'catalog_version': catalog.version,
+        'numeric': {name: np.dtype(dtype).name for name, dtype in dtypes.items()},
+        'text': text_columns,
+        'missing_score': missing_score,
+        'missing_answer': -1,
+    }
+    with open(os.path.join(directory, 'columns.json'), 'w', encoding='utf-8') as f:
+        json.dump(schema, f, indent=2)
+    return schema
+
+
+class ScoreDistribution:
+    """Häufigkeit jedes ganzzahligen Punktestands; wird stapelweise mit numpy befüllt."""
+
+    def __init__(self, low=0, high=0):
+        import numpy as np
+
+        self.low = low
+        self.counts = np.zeros(high - low + 1, dtype=np.int64)
+
+    def add(self, scores):
+        import numpy as np
+
+        scores = np.asarray(scores, dtype=np.int64)
+        if not scores.size:
+            return
+        low, high = int(scores.min()), int(scores.max())
+        if low < self.low or high >= self.low + len(self.counts):
+            # Bereich erweitern, falls sich der Katalog seit der Erfassung geändert hat
+            new_low = min(low, self.low)
+            new_high = max(high, self.low + len(self.counts) - 1)
+            counts = np.zeros(new_high - new_low + 1, dtype=np.int64)
+            counts[self.low - new_low:self.low - new_low + len(self.counts)] = self.counts
+            self.low, self.counts = new_low, counts
+        self.counts += np.bincount(scores - self.low, minlength=len(self.counts))
+
+    def summary(self, percentiles=(10, 25, 50, 75, 90)):
+        import numpy as np
+
+        n = int(self.counts.sum())
+        if n == 0:
+            return {'count': 0}
+        values = np.arange(self.low, self.low + len(self.counts))
+        mean = float((values * self.counts).sum() / n)
+        std = float(np.sqrt(((values - mean) ** 2 * self.counts).sum() / n))
+        cumulative = np.cumsum(self.counts)
+        nonzero = np.flatnonzero(self.counts)
+        return {
+            'count': n,
+            'min': int(values[nonzero[0]]),
+            'max': int(values[nonzero[-1]]),
+            'mean': round(mean, 2),
+            'std': round(std, 2),
+            **{
+                f'p{p}': int(values[np.searchsorted(cumulative, n * p / 100)])
+                for p in percentiles
+            },
+        }
+
+
+def score_bounds(catalog, module):
+    # Kleinster und größter erreichbarer Punktestand eines Moduls
+    low = high = 0
+    for question in catalog.questions(module):
+        scores = [a.score for a in question.answers if a.score is not None]
+        if scores:
+            low += min(scores)
+            high += max(scores)
+    return low, high
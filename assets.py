@@ -0,0 +1,97 @@
+import gzip
+import hashlib
+import json
+import os
+import re
+import tempfile
+
+# Ein CSS- und ein JS-Bundle aus den Dateien unter assets/ (bereits minifizierte Upstream-Builds),
+# in der Reihenfolge, in der der Browser sie laden muss
+BUNDLES = {
+    'css': ('vendor/bootstrap-4.5.3/bootstrap.min.css',),
+    'js': ('vendor/jquery-3.5.1/jquery.slim.min.js', 'vendor/bootstrap-4.5.3/bootstrap.bundle.min.js'),
+}
+MANIFEST_NAME = 'manifest.json'
+# Vorkomprimierte Varianten in der Reihenfolge der Bevorzugung: (Content-Encoding, Dateiendung)
+ENCODINGS = (('br', '.br'), ('gzip', '.gz'))
+MIMETYPES = {'css': 'text/css', 'js': 'text/javascript'}
+
+# Die .map-Dateien werden nicht mit ausgeliefert
+_SOURCE_MAP = re.compile(rb'\n?/[/*]# sourceMappingURL=\S+(?: \*/)?\s*$')
+
+
+def load_manifest(output_dir):
+    try:
+        with open(os.path.join(output_dir, MANIFEST_NAME), encoding='utf-8') as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return {}
+
+
+def bundle_content(source_dir, files, kind):
+    parts = []
+    for name in files:
+        with open(os.path.join(source_dir, name), 'rb') as f:
+            parts.append(_SOURCE_MAP.sub(b'', f.read()).strip())
+    # ';' trennt Skripte, deren letzte Anweisung ohne Semikolon endet
+    return (b'\n;' if kind == 'js' else b'\n').join(parts) + b'\n'
+
+
+def build_bundles(source_dir, output_dir, bundles=BUNDLES):
+    """Schreibt je Bundle eine Datei mit Inhalts-Hash im Namen plus .br/.gz; unveränderte Bundles werden übersprungen."""
+    os.makedirs(output_dir, exist_ok=True)
+    manifest = {}
+    for kind, files in bundles.items():
+        data = bundle_content(source_dir, files, kind)
+        filename = f'bundle.{hashlib.sha256(data).hexdigest()[:12]}.{kind}'
+        path = os.path.join(output_dir, filename)
+        if not all(os.path.exists(path + suffix) for suffix in ('',) + tuple(s for _, s in ENCODINGS)):
+            _write(path, data)
+            _write(path + '.br', _brotli(data))
+            _write(path + '.gz', _gzip(data))
+        manifest[kind] = filename
+
+    _remove_stale(output_dir, manifest)
+    _write(os.path.join(output_dir, MANIFEST_NAME), json.dumps(manifest, indent=2, sort_keys=True).encode())
+    return manifest
+
+
+def _brotli(data):
+    import brotli
+
+    return brotli.compress(data, quality=11, mode=brotli.MODE_TEXT)
+
+
+def _gzip(data):
+    # zopfli erzeugt gültiges gzip, das ~5-10 % kleiner ist als gzip -9, braucht dafür aber Sekunden
+    try:
+        import zopfli.gzip
+    except ImportError:
+        return gzip.compress(data, compresslevel=9, mtime=0)
+    return zopfli.gzip.compress(data)
+
+
+def _write(path, data):
+    # Erst vollständig schreiben, dann umbenennen: parallele Worker sehen nie halbe Dateien
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+    with os.fdopen(fd, 'wb') as f:
+        f.write(data)
+    os.chmod(tmp_path, 0o644)
+    os.replace(tmp_path, path)
+
+
+def _remove_stale(output_dir, manifest):
+    keep = {MANIFEST_NAME}
+    for filename in manifest.values():
+        keep.update(filename + suffix for suffix in ('',) + tuple(s for _, s in ENCODINGS))
+    for name in os.listdir(output_dir):
+        if name.startswith('bundle.') and name not in keep:
+            os.remove(os.path.join(output_dir, name))
+
+
+def negotiate(filename, accept_encodings, output_dir):
+    # (Dateiname, Content-Encoding) der besten vorhandenen Variante für den Accept-Encoding-Header
+    for encoding, suffix in ENCODINGS:
+        if accept_encodings[encoding] and os.path.exists(os.path.join(output_dir, filename + suffix)):
+            return filename + suffix, encoding
+    return filename, None
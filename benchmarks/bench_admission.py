@@ -0,0 +1,127 @@
+"""Quiz-Latenz während eines PDF-Ansturms: ohne und mit Zulassungssteuerung.
+
+Startet gunicorn, bereitet für jeden PDF-Client einen fertigen Durchlauf vor (eigene Antworten =
+eigener Bericht) und lässt dann alle gleichzeitig download_pdf abrufen. Währenddessen rufen
+Quiz-Clients laufend eine Fragenseite ab. Aufruf aus dem Projektverzeichnis:
+
+    python -m benchmarks.bench_admission --workers 5 --pdf-clients 48 --quiz-clients 4
+"""
+import argparse
+import json
+import random
+import tempfile
+import threading
+import time
+from collections import Counter
+
+from benchmarks.load import HttpTransport, Recorder, percentile, start_gunicorn, walk_module
+
+PROFILES = {
+    'ohne': {},  # keine Begrenzung
+    'mit': None,  # ADMISSION_LIMITS aus der Standardkonfiguration
+}
+
+
+def prepare(base_url, modules, rng):
+    # Durchlauf bis zur Zusammenfassung (modules = Express/Advanced) bzw. bis zur ersten Express-Frage
+    transport = HttpTransport(base_url)
+    recorder = Recorder(lambda method, path: path)
+    recorder.call(transport, 'GET', '/info')
+    recorder.call(transport, 'POST', '/info')
+    walk_module(recorder, transport, '/basic_quiz/', rng)
+    for module in modules:
+        recorder.call(transport, 'POST', '/choose_module/', {'module': module})
+        walk_module(recorder, transport, f'/quiz/{module}', rng)
+    if not modules:
+        recorder.call(transport, 'POST', '/choose_module/', {'module': 'Express'})
+    return transport
+
+
+def timed(transport, path):
+    start = time.perf_counter()
+    status, _, _ = transport.request('GET', path)
+    return status, time.perf_counter() - start
+
+
+def run_profile(name, limits, args):
+    from benchmarks.common import config_env, isolated_config
+
+    with tempfile.TemporaryDirectory() as tmp:
+        env = config_env(isolated_config(tmp))
+        if limits is not None:
+            env['FLASK_ADMISSION_LIMITS'] = json.dumps(limits)
+        process, base_url = start_gunicorn(args.workers, env, admission=True)
+        try:
+            rng = random.Random(0)
+            pdf_clients = [prepare(base_url, ('Express', 'Advanced'), rng) for _ in range(args.pdf_clients)]
+            quiz_clients = [prepare(base_url, (), rng) for _ in range(args.quiz_clients)]
+
+            idle = [timed(quiz_clients[0], '/quiz/Express')[1] for _ in range(50)]
+            start = threading.Barrier(args.pdf_clients + args.quiz_clients)
+            burst_over = threading.Event()
+            statuses, pdf_times, quiz_times = Counter(), [], []
+            lock = threading.Lock()
+
+            def download(transport):
+                start.wait()
+                status, elapsed = timed(transport, '/download_pdf')
+                with lock:
+                    statuses[status] += 1
+                    pdf_times.append(elapsed)
+
+            def navigate(transport):
+                start.wait()
+                while not burst_over.is_set():
+                    status, elapsed = timed(transport, '/quiz/Express')
+                    with lock:
+                        quiz_times.append(elapsed)
+
+            downloads = [threading.Thread(target=download, args=(t,)) for t in pdf_clients]
+            navigators = [threading.Thread(target=navigate, args=(t,)) for t in quiz_clients]
+            for thread in downloads + navigators:
+                thread.start()
+            began = time.perf_counter()
+            for thread in downloads:
+                thread.join()
+            wall = time.perf_counter() - began
+            burst_over.set()
+            for thread in navigators:
+                thread.join()
+        finally:
+            process.terminate()
+            process.wait()
+
+    return {
+        'idle_p50': percentile(idle, 0.5), 'p50': percentile(quiz_times, 0.5),
+        'p95': percentile(quiz_times, 0.95), 'max': max(quiz_times), 'quiz': len(quiz_times),
+        'ok': statuses[200], 'shed': statuses[503], 'other': sum(statuses.values()) - statuses[200] - statuses[503],
+        'pdf_p95': percentile(pdf_times, 0.95), 'wall': wall,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--workers', type=int, default=5, help='gunicorn-Worker')
+    parser.add_argument('--pdf-clients', type=int, default=48, help='gleichzeitige PDF-Downloads')
+    parser.add_argument('--quiz-clients', type=int, default=4, help='Clients auf den Quiz-Seiten')
+    parser.add_argument('--limits', default=None,
+                        help='ADMISSION_LIMITS für "mit" als JSON, z.B. {"main.download_pdf": [2, 2]}')
+    args = parser.parse_args()
+
+    from benchmarks.common import ensure_database
+    ensure_database()
+    PROFILES['mit'] = json.loads(args.limits) if args.limits else None
+    results = {name: run_profile(name, limits, args) for name, limits in PROFILES.items()}
+
+    print(f"\n{'Begrenzung':<11} {'Quiz p50 ms':>12} {'p95 ms':>8} {'max ms':>8} {'(leer p50)':>11} "
+          f"{'PDF 200':>8} {'503':>5} {'sonst':>6} {'PDF p95 ms':>11} {'s':>6}")
+    for name, r in results.items():
+        print(
+            f"{name:<11} {r['p50'] * 1000:>12.1f} {r['p95'] * 1000:>8.1f} {r['max'] * 1000:>8.1f} "
+            f"{r['idle_p50'] * 1000:>11.1f} {r['ok']:>8} {r['shed']:>5} {r['other']:>6} "
+            f"{r['pdf_p95'] * 1000:>11.1f} {r['wall']:>6.2f}"
+        )
+
+
+if __name__ == '__main__':
+    main()
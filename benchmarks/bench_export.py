@@ -0,0 +1,70 @@
+"""Export und Auswertung gespeicherter Durchläufe: Laufzeit und Spitzen-Speicher.
+
+Legt N zufällige Durchläufe in einer Transaktion an, die am Ende zurückgerollt wird.
+Aufruf aus dem Projektverzeichnis:
+
+    python -m benchmarks.bench_export --rows 20000
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+import tracemalloc
+
+from app import Assessment, db, iter_assessments, score_distributions
+from assessments import assessment_row, iter_csv, write_columns
+from benchmarks.common import app, ensure_database, sample_answers
+
+
+def measure(label, fn):
+    # Zeit ohne tracemalloc messen (bremst stark), Spitzen-Speicher in einem zweiten Lauf
+    start = time.perf_counter()
+    result = fn()
+    elapsed = time.perf_counter() - start
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{label:<28} {elapsed * 1000:9.0f} ms   Spitze {peak / 1024 / 1024:7.1f} MiB")
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=20000)
+    parser.add_argument('--batch-size', type=int, default=1000)
+    args = parser.parse_args()
+
+    catalog = ensure_database()
+    rng = random.Random(0)
+    with app.app_context(), tempfile.TemporaryDirectory() as tmp:
+        table = Assessment.__table__
+        start = time.perf_counter()
+        for offset in range(0, args.rows, args.batch_size):
+            rows = []
+            for _ in range(min(args.batch_size, args.rows - offset)):
+                all_answers, module_scores = sample_answers(catalog, rng)
+                rows.append(assessment_row(all_answers, module_scores, catalog))
+            db.session.execute(table.insert(), rows)
+        print(f"{args.rows} Durchläufe angelegt in {time.perf_counter() - start:.1f} s\n")
+        count = db.session.query(Assessment).count()
+
+        def export_csv():
+            with open(os.path.join(tmp, 'export.csv'), 'w', encoding='utf-8', newline='') as f:
+                for chunk in iter_csv(iter_assessments(args.batch_size), catalog):
+                    f.write(chunk)
+
+        measure('CSV-Export', export_csv)
+        measure('Spalten-Export (.npy)', lambda: write_columns(
+            os.path.join(tmp, 'columns'), iter_assessments(args.batch_size), count, catalog
+        ))
+        distributions = measure('Punkteverteilung (numpy)', score_distributions)
+        print()
+        for module, distribution in distributions.items():
+            print(f"{module}: {distribution.summary()}")
+        db.session.rollback()
+
+
+if __name__ == '__main__':
+    main()
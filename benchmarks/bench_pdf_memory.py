@@ -0,0 +1,212 @@
+"""Spitzen-RSS des Servers bei vielen gleichzeitigen Downloads langer Advanced-Berichte.
+
+Der Server läuft als eigener Prozess (Werkzeug, ein Thread pro Anfrage); gemessen wird dessen
+RSS, während alle Clients gleichzeitig und bewusst langsam herunterladen. Verglichen werden:
+
+    legacy  PDF je Anfrage in einen BytesIO-Puffer, getvalue() kopiert ihn in die Antwort
+    memory  download_pdf, alle Berichte in der Speicher-Stufe des Caches
+    stream  download_pdf mit REPORT_SPOOL_BYTES: große Berichte nur als Datei, in Blöcken
+
+Jeder Nutzer hat einen eigenen Bericht unter eigenem Fingerabdruck im Cache; gerendert wird
+einmal, die übrigen Berichte sind Kopien davon. Aufruf aus dem Projektverzeichnis:
+
+    python -m benchmarks.bench_pdf_memory --users 32 --repeat 300
+"""
+import argparse
+import http.cookiejar
+import os
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.request
+
+MODES = ('legacy', 'memory', 'stream')
+
+
+def long_report(catalog, repeat):
+    # Alle Advanced-Fragen repeat-mal hintereinander: (Antworten, Scores, Fragen für den Bericht)
+    answers, questions = {}, {}
+    for round_ in range(repeat):
+        for question in catalog.questions('Advanced'):
+            if question.answers:
+                key = f'{question.id}.{round_}'
+                answer = question.answers[round_ % len(question.answers)]
+                answers[key] = {'text': answer.text, 'score': answer.score}
+                questions[key] = question
+    return {'Advanced': answers}, {'Advanced': sum(a['score'] or 0 for a in answers.values())}, questions
+
+
+def serve(mode, port, directory, repeat):
+    from io import BytesIO
+
+    from flask import make_response, session
+
+    from app import catalog_bands, create_app, get_catalog, get_report_cache
+    from report import write_report_pdf
+    from report_cache import report_fingerprint
+
+    config = {'SESSION_STORE': 'memory', 'REPORT_CACHE_DIR': directory, 'REPORT_EXECUTOR': 'thread'}
+    if mode == 'legacy':
+        config['REPORT_SPOOL_BYTES'] = 32 * 1024 * 1024  # wie früher: keine Obergrenze je Bericht
+    elif mode == 'memory':
+        config['REPORT_CACHE_MEMORY_BYTES'] = config['REPORT_SPOOL_BYTES'] = 1 << 30
+    app = create_app(config)
+    rendered = {}
+    lock = threading.Lock()
+
+    def fingerprint():
+        return report_fingerprint(session['all_answers'], session['module_scores'], get_catalog().version)
+
+    @app.route('/bench/seed/<int:user>')
+    def seed(user):
+        catalog = get_catalog()
+        all_answers, module_scores, questions = long_report(catalog, repeat)
+        cache = get_report_cache()
+        with lock:
+            if 'path' not in rendered:
+                path, size = write_report_pdf(cache.directory, all_answers, module_scores, questions,
+                                              catalog_bands(catalog))
+                rendered.update(path=path, size=size)
+        # Kleine Session, nur für einen eigenen Fingerabdruck: gemessen wird das Ausliefern, nicht
+        # das Laden einer riesigen Session
+        session['all_answers'] = {'Basic': {'1': {'text': f'Nutzer {user}', 'score': None}}}
+        session['module_scores'] = {}
+        fd, tmp_path = tempfile.mkstemp(dir=cache.directory, suffix='.tmp')
+        with os.fdopen(fd, 'wb') as f, open(rendered['path'], 'rb') as source:
+            shutil.copyfileobj(source, f)
+        cache.put_file(fingerprint(), tmp_path, rendered['size'])
+        return str(rendered['size'])
+
+    @app.route('/bench/legacy_pdf')
+    def legacy_pdf():
+        # Wie früher: fertige PDF komplett in einen Puffer, dann als Ganzes in die Antwort
+        pdf_buffer = BytesIO()
+        with open(get_report_cache().get_path(fingerprint()), 'rb') as f:
+            pdf_buffer.write(f.read())
+        response = make_response(pdf_buffer.getvalue())
+        response.mimetype = 'application/pdf'
+        return response
+
+    from werkzeug.serving import make_server
+    make_server('127.0.0.1', port, app, threaded=True).serve_forever()
+
+
+def rss(pid):
+    with open(f'/proc/{pid}/status') as f:
+        for line in f:
+            if line.startswith('VmRSS:'):
+                return int(line.split()[1]) * 1024
+    return 0
+
+
+def run_mode(mode, args):
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        port = sock.getsockname()[1]
+    with tempfile.TemporaryDirectory() as tmp:
+        process = subprocess.Popen([
+            sys.executable, '-m', 'benchmarks.bench_pdf_memory', '--serve', mode, '--port', str(port),
+            '--directory', tmp, '--repeat', str(args.repeat),
+        ])
+        base_url = f'http://127.0.0.1:{port}'
+        try:
+            for _ in range(100):
+                try:
+                    urllib.request.urlopen(base_url + '/info', timeout=1).close()
+                    break
+                except OSError:
+                    time.sleep(0.1)
+            else:
+                raise RuntimeError('Server ist nicht gestartet')
+            jars = [http.cookiejar.CookieJar() for _ in range(args.users)]
+            size = 0
+            for user, jar in enumerate(jars):
+                opener = urllib.request.build_opener(urllib.request.HTTPCookieProcessor(jar))
+                with opener.open(f'{base_url}/bench/seed/{user}', timeout=300) as response:
+                    size = int(response.read())
+
+            path = '/bench/legacy_pdf' if mode == 'legacy' else '/download_pdf'
+            start = threading.Barrier(args.users + 1)
+            received, errors = [0] * args.users, []
+
+            def download(index):
+                cookie = '; '.join(f'{c.name}={c.value}' for c in jars[index])
+                # Kleiner Empfangspuffer + Pausen = langsamer Client; sonst nähme der Kernel die
+                # ganze Antwort sofort in seine Socket-Puffer auf und die Downloads überlappten nicht
+                with socket.socket() as conn:
+                    conn.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, args.chunk)
+                    conn.connect(('127.0.0.1', port))
+                    start.wait()
+                    conn.sendall(
+                        f'GET {path} HTTP/1.1\r\nHost: 127.0.0.1\r\nCookie: {cookie}\r\n'
+                        f'Connection: close\r\n\r\n'.encode()
+                    )
+                    response = b''
+                    while b'\r\n\r\n' not in response:
+                        response += conn.recv(args.chunk)
+                    head, body = response.split(b'\r\n\r\n', 1)
+                    if not head.startswith(b'HTTP/1.1 200'):
+                        errors.append(head.split(b'\r\n', 1)[0])
+                    received[index] = len(body)
+                    while chunk := conn.recv(args.chunk):
+                        received[index] += len(chunk)
+                        time.sleep(args.delay)
+
+            threads = [threading.Thread(target=download, args=(i,)) for i in range(args.users)]
+            for thread in threads:
+                thread.start()
+            time.sleep(0.5)
+            baseline = peak = rss(process.pid)
+            start.wait()
+            began = time.perf_counter()
+            while any(thread.is_alive() for thread in threads):
+                peak = max(peak, rss(process.pid))
+                time.sleep(0.002)
+            wall = time.perf_counter() - began
+        finally:
+            process.terminate()
+            process.wait()
+
+    complete = sum(1 for r in received if r == size)
+    return {
+        'size': size, 'baseline': baseline, 'peak': peak, 'wall': wall,
+        'complete': complete, 'errors': len(errors),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--users', type=int, default=32, help='gleichzeitige Downloads')
+    parser.add_argument('--repeat', type=int, default=300, help='Advanced-Fragen je Bericht x repeat')
+    parser.add_argument('--chunk', type=int, default=16 * 1024, help='Client liest Blöcke dieser Größe')
+    parser.add_argument('--delay', type=float, default=0.01, help='Pause des Clients je Block (s)')
+    parser.add_argument('--mode', choices=MODES, action='append', help='nur diese Varianten messen')
+    parser.add_argument('--serve', choices=MODES, help=argparse.SUPPRESS)
+    parser.add_argument('--port', type=int, help=argparse.SUPPRESS)
+    parser.add_argument('--directory', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve:
+        serve(args.serve, args.port, args.directory, args.repeat)
+        return
+
+    from benchmarks.common import ensure_database
+    ensure_database()
+    results = {mode: run_mode(mode, args) for mode in args.mode or MODES}
+    size = next(iter(results.values()))['size']
+    mib = 1024 * 1024
+    print(f"\n{args.users} gleichzeitige Downloads je {size / mib:.2f} MiB")
+    print(f"{'Variante':<9} {'RSS vorher MiB':>15} {'Spitze MiB':>11} {'Zuwachs MiB':>12} {'vollständig':>12} {'s':>6}")
+    for mode, r in results.items():
+        print(
+            f"{mode:<9} {r['baseline'] / mib:>15.1f} {r['peak'] / mib:>11.1f} "
+            f"{(r['peak'] - r['baseline']) / mib:>12.1f} {r['complete']:>8}/{args.users:<3} {r['wall']:>6.2f}"
+        )
+
+
+if __name__ == '__main__':
+    main()
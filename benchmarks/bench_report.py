@@ -0,0 +1,115 @@
+"""CPU-Zeit pro PDF-Bericht: Aufbau aller Layout-Objekte pro Aufruf vs. vorkompilierte Vorlagen.
+
+Aufruf aus dem Projektverzeichnis:
+
+    python -m benchmarks.bench_report --iterations 200
+"""
+import argparse
+import time
+from io import BytesIO
+
+from reportlab.lib import colors
+from reportlab.lib.pagesizes import letter
+from reportlab.lib.styles import getSampleStyleSheet
+from reportlab.platypus import Paragraph, SimpleDocTemplate, Spacer, Table, TableStyle
+
+from benchmarks.common import ensure_database, sample_answers
+from report import build_report_pdf
+
+
+def legacy_build_report_pdf(all_answers, module_scores, questions):
+    # Stand vor den vorkompilierten Vorlagen: alles wird pro Bericht neu erzeugt
+    pdf_buffer = BytesIO()
+    pdf = SimpleDocTemplate(pdf_buffer, pagesize=letter)
+    elements = []
+    styles = getSampleStyleSheet()
+    elements.append(Paragraph("Sanierungsbewertung - Zusammenfassung", styles['Title']))
+    elements.append(Spacer(1, 20))
+    for module in ['Basic', 'Express', 'Advanced']:
+        if module in all_answers and all_answers[module]:
+            elements.append(Paragraph(f"{module} Modul", styles['Heading2']))
+            if module != 'Basic':
+                score = module_scores.get(module, 0)
+                elements.append(Paragraph(f"<b>Modul-Score: {score} Punkte</b>", styles['Normal']))
+                elements.append(Spacer(1, 12))
+                if module == 'Express':
+                    eval_data = [
+                        ["Eignung", "Punkte", "Empfehlung"],
+                        ["Gering", "-50 – 18", "Wirtschaftlich nicht darstellbar\nIndividuallösung erforderlich"],
+                        ["Mittel", "19 – 35", "Eingeschränkt möglich\n(Bitte suchen Sie einen Experten auf)"],
+                        ["Hoch", "36 – 60", "Gute Voraussetzungen für eine serielle Sanierung"]
+                    ]
+                else:
+                    eval_data = [
+                        ["Kategorie", "Punktebereich", "Bewertung"],
+                        ["Niedrig", "-100 – 50", "Wirtschaftlich nicht darstellbar\nIndividuallösung erforderlich"],
+                        ["Mittel", "51 – 120", "Eingeschränkt möglich\n(Bitte suchen Sie einen Experten auf)"],
+                        ["Hoch", "121 – 180", "Sehr gute Voraussetzungen für eine serielle Sanierung"]
+                    ]
+                eval_table = Table(eval_data, colWidths=[150, 100, 250])
+                eval_table.setStyle(TableStyle([
+                    ('BACKGROUND', (0,0), (-1,0), colors.lightgrey),
+                    ('TEXTCOLOR', (0,0), (-1,-1), colors.black),
+                    ('ALIGN', (0,0), (-1,-1), 'CENTER'),
+                    ('FONTNAME', (0,0), (-1,-1), 'Helvetica'),
+                    ('FONTSIZE', (0,0), (-1,-1), 10),
+                    ('BOTTOMPADDING', (0,0), (-1,-1), 8),
+                    ('GRID', (0,0), (-1,-1), 1, colors.black)
+                ]))
+                elements.append(eval_table)
+                elements.append(Spacer(1, 20))
+            data = [["Frage", "Antwort"]] if module == 'Basic' else [["Frage", "Antwort", "Punkte"]]
+            for qid, answer in all_answers[module].items():
+                question_text = questions.get(qid).text if qid in questions else "Unbekannte Frage"
+                answer_text = answer.get('text', '')
+                if module == 'Basic':
+                    data.append([Paragraph(question_text, styles['Normal']), Paragraph(answer_text, styles['Normal'])])
+                else:
+                    data.append([Paragraph(question_text, styles['Normal']), Paragraph(answer_text, styles['Normal']),
+                                 str(answer.get('score', '-'))])
+            table = Table(data, colWidths=[250, 250] if module == 'Basic' else [200, 200, 100])
+            table.setStyle(TableStyle([
+                ('BACKGROUND', (0,0), (-1,0), colors.lightgrey),
+                ('TEXTCOLOR', (0,0), (-1,-1), colors.black),
+                ('ALIGN', (0,0), (-1,-1), 'LEFT'),
+                ('FONTNAME', (0,0), (-1,-1), 'Helvetica'),
+                ('FONTSIZE', (0,0), (-1,-1), 10),
+                ('BOTTOMPADDING', (0,0), (-1,-1), 8),
+                ('GRID', (0,0), (-1,-1), 1, colors.black)
+            ]))
+            elements.append(table)
+            elements.append(Spacer(1, 36))
+    pdf.build(elements)
+    return pdf_buffer.getvalue()
+
+
+def measure(builder, all_answers, module_scores, questions, iterations):
+    builder(all_answers, module_scores, questions)  # Aufwärmen
+    start = time.process_time()
+    for _ in range(iterations):
+        builder(all_answers, module_scores, questions)
+    return (time.process_time() - start) / iterations * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--iterations', type=int, default=100)
+    args = parser.parse_args()
+
+    catalog = ensure_database()
+    all_answers, module_scores = sample_answers(catalog)
+    questions = catalog.question_map
+
+    before = measure(legacy_build_report_pdf, all_answers, module_scores, questions, args.iterations)
+    bands = {module: catalog.bands(module) for module in ('Express', 'Advanced')}
+    after = measure(
+        lambda *report_args: build_report_pdf(*report_args, bands), all_answers, module_scores, questions,
+        args.iterations,
+    )
+    print(f"vorher:  {before:7.2f} ms CPU pro Bericht")
+    print(f"nachher: {after:7.2f} ms CPU pro Bericht")
+    print(f"Faktor:  {before / after:7.2f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,61 @@
+"""Punkteberechnung: Python-Schleife je Durchlauf vs. numpy-Punktematrix für ganze Stapel.
+
+Aufruf aus dem Projektverzeichnis:
+
+    python -m benchmarks.bench_scoring --rows 20000
+"""
+import argparse
+import random
+import time
+
+from app import answer_score, get_scoring
+from assessments import SCORED_MODULES, compact_answers
+from benchmarks.common import app, ensure_database, sample_answers
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=20000, help='Anzahl zufälliger Durchläufe')
+    parser.add_argument('--repeat', type=int, default=200, help='Wiederholungen für analyse()')
+    args = parser.parse_args()
+
+    catalog = ensure_database()
+    rng = random.Random(0)
+    runs = [sample_answers(catalog, rng)[0] for _ in range(args.rows)]
+    rows = [compact_answers(all_answers, catalog) for all_answers in runs]
+
+    with app.app_context():
+        scoring = get_scoring()
+        print(f"{'Modul':<10} {'Schleife ms':>12} {'numpy ms':>9} {'Faktor':>7}")
+        for module in SCORED_MODULES:
+            # Bisheriger Weg: gespeicherte Antworten einzeln auflösen und aufsummieren
+            def loop():
+                scores = []
+                for items in rows:
+                    all_answers = {module: {}}
+                    for qid, value in items.get(module, {}).items():
+                        answer = catalog.answer(value) if isinstance(value, int) else None
+                        all_answers[module][qid] = {'score': answer.score if answer else None}
+                    scores.append(sum(answer_score(a) for a in all_answers[module].values()))
+                return scores
+
+            expected, before = timed(loop)
+            scores, after = timed(lambda: scoring.score_batch(module, rows))
+            assert list(scores) == expected, module
+            print(f"{module:<10} {before * 1000:>12.1f} {after * 1000:>9.1f} {before / after:>6.1f}x")
+
+        print(f"\n{'Modul':<10} {'analyse() µs':>13}")
+        for module in SCORED_MODULES:
+            answers = runs[0][module]
+            _, elapsed = timed(lambda: [scoring.analyse(module, answers) for _ in range(args.repeat)])
+            print(f"{module:<10} {elapsed / args.repeat * 1e6:>13.0f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,126 @@
+"""SQLite-Profile im Vergleich: Durchsatz mehrerer gunicorn-Worker bei gleichzeitigem Quiz-Verkehr.
+
+Jedes Profil läuft auf einer eigenen Kopie von quiz.db/sessions.db in einem temporären
+Verzeichnis (journal_mode=wal bleibt in der Datei gespeichert). Zusätzliche Schreiber legen
+währenddessen laufend Durchläufe in quiz.db an. Aufruf aus dem Projektverzeichnis:
+
+    python -m benchmarks.bench_sqlite --workers 3 --users 12 --writers 2
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import shutil
+import sqlite3
+import tempfile
+import threading
+import time
+
+from benchmarks.load import print_report, run_over_http, start_gunicorn, summarize
+from sqlite_profile import CONCURRENT_PRAGMAS, pragma_statements
+
+PROFILES = {
+    'standard': {},  # SQLite-Standard: Rollback-Journal, synchronous=FULL, kein mmap
+    'concurrent': CONCURRENT_PRAGMAS,
+}
+
+
+def prepare(directory, pragmas):
+    from app import Question, create_app, populate_database, upgrade_database
+
+    shutil.copy(os.path.join('instance', 'quiz.db'), os.path.join(directory, 'quiz.db'))
+    app = create_app({
+        'SQLALCHEMY_DATABASE_URI': f"sqlite:///{os.path.join(directory, 'quiz.db')}",
+        'SESSION_STORE': 'memory',
+        'SQLITE_PRAGMAS': pragmas,
+    })
+    with app.app_context():
+        upgrade_database()
+        if Question.query.count() == 0:
+            populate_database()
+
+
+def writer(path, pragmas, stop, counts):
+    # Speichert fortlaufend Durchläufe, jeder in einer eigenen Transaktion
+    conn = sqlite3.connect(path, timeout=5)
+    for statement in pragma_statements(pragmas):
+        conn.execute(statement)
+    while not stop.is_set():
+        try:
+            with conn:
+                conn.execute(
+                    'INSERT INTO assessment (created, catalog_version, answers) '
+                    "VALUES (datetime('now'), 'bench', '{}')"
+                )
+            counts['writes'] += 1
+        except sqlite3.OperationalError:
+            counts['locked'] += 1
+        time.sleep(0.005)
+    conn.close()
+
+
+def run_profile(name, pragmas, args):
+    with tempfile.TemporaryDirectory() as tmp:
+        prepare(tmp, pragmas)
+        env = {
+            'FLASK_SQLALCHEMY_DATABASE_URI': f"sqlite:///{os.path.join(tmp, 'quiz.db')}",
+            'FLASK_SESSION_STORE_PATH': os.path.join(tmp, 'sessions.db'),
+            'FLASK_REPORT_CACHE_DIR': os.path.join(tmp, 'report_cache'),
+            'FLASK_SQLITE_PRAGMAS': json.dumps(pragmas),
+        }
+        process, base_url = start_gunicorn(args.workers, env)
+        stop = threading.Event()
+        counts = {'writes': 0, 'locked': 0}
+        threads = [
+            threading.Thread(target=writer, args=(os.path.join(tmp, 'quiz.db'), pragmas, stop, counts))
+            for _ in range(args.writers)
+        ]
+        try:
+            for thread in threads:
+                thread.start()
+            timings, errors, wall = run_over_http(base_url, args.users, args.runs, args.processes, 'both')
+        finally:
+            stop.set()
+            for thread in threads:
+                thread.join()
+            process.terminate()
+            process.wait()
+
+    stats = summarize(timings, errors, wall)
+    print(f"\n== Profil {name}: {json.dumps(pragmas)}")
+    print_report(stats, wall)
+    print(f"Schreiber: {counts['writes'] / wall:.1f} Inserts/s, {counts['locked']} x gesperrt")
+    requests = sum(s['count'] for s in stats.values())
+    return {
+        'rps': requests / wall,
+        'errors': sum(s['errors'] for s in stats.values()),
+        'p95_ms': max(s['p95_ms'] for s in stats.values()),
+        'writes_per_second': counts['writes'] / wall,
+        'locked': counts['locked'],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--workers', type=int, default=3, help='gunicorn-Worker')
+    parser.add_argument('--users', type=int, default=12, help='gleichzeitige Nutzer')
+    parser.add_argument('--runs', type=int, default=1, help='Durchläufe pro Nutzer')
+    parser.add_argument('--writers', type=int, default=2, help='zusätzliche Schreib-Threads auf quiz.db')
+    parser.add_argument('--processes', type=int, default=multiprocessing.cpu_count(),
+                        help='Client-Prozesse')
+    parser.add_argument('--profile', choices=sorted(PROFILES), action='append',
+                        help='nur diese Profile messen (mehrfach möglich)')
+    args = parser.parse_args()
+
+    results = {name: run_profile(name, PROFILES[name], args) for name in args.profile or PROFILES}
+
+    print(f"\n{'Profil':<12} {'req/s':>8} {'Fehler':>7} {'max p95 ms':>11} {'Inserts/s':>10} {'gesperrt':>9}")
+    for name, r in results.items():
+        print(
+            f"{name:<12} {r['rps']:>8.1f} {r['errors']:>7} {r['p95_ms']:>11.1f} "
+            f"{r['writes_per_second']:>10.1f} {r['locked']:>9}"
+        )
+
+
+if __name__ == '__main__':
+    main()
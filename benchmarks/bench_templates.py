@@ -0,0 +1,76 @@
+"""Renderzeit pro Vorlage: ohne und mit Fragment-Cache, Übersetzen ohne und mit Bytecode-Cache.
+
+Aufruf aus dem Projektverzeichnis:
+
+    python -m benchmarks.bench_templates --repeat 200
+"""
+import argparse
+import os
+import statistics
+import tempfile
+import time
+
+from flask import render_template
+
+from app import create_app, invalidate_catalog
+from benchmarks.common import ensure_database
+
+QUIZ_TEMPLATES = {'Basic': 'basic_quiz.html', 'Express': 'express_quiz.html', 'Advanced': 'advanced_quiz.html'}
+
+
+def render_times(app, catalog, repeat):
+    # Mittlere Renderzeit je Vorlage über alle Fragen des Moduls
+    results = {}
+    with app.test_request_context():
+        for module, template in QUIZ_TEMPLATES.items():
+            questions = catalog.questions(module)
+            times = []
+            for _ in range(repeat):
+                for index, question in enumerate(questions):
+                    start = time.perf_counter()
+                    render_template(
+                        template, module=module, question=question, question_index=index,
+                        total_questions=len(questions), answers={}, running_score=0,
+                    )
+                    times.append(time.perf_counter() - start)
+            results[template] = statistics.mean(times)
+    return results
+
+
+def compile_time(cache_dir):
+    # Frische Anwendung = leerer Template-Cache im Speicher; alle Vorlagen laden
+    app = create_app({'SESSION_STORE': 'memory', 'JINJA_CACHE_DIR': cache_dir})
+    names = app.jinja_env.list_templates()
+    start = time.perf_counter()
+    for name in names:
+        app.jinja_env.get_template(name)
+    return time.perf_counter() - start, len(names)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=200, help='Wiederholungen je Frage')
+    args = parser.parse_args()
+
+    catalog = ensure_database()
+    print(f"{'Vorlage':<22} {'ohne Cache µs':>14} {'mit Cache µs':>13} {'Faktor':>7}")
+    timings = {}
+    for enabled in (False, True):
+        app = create_app({'SESSION_STORE': 'memory', 'FRAGMENT_CACHE': enabled})
+        with app.app_context():
+            invalidate_catalog()
+            render_times(app, catalog, 1)  # Aufwärmen: Übersetzen, Fragmente befüllen
+            timings[enabled] = render_times(app, catalog, args.repeat)
+    for template in QUIZ_TEMPLATES.values():
+        before, after = timings[False][template], timings[True][template]
+        print(f"{template:<22} {before * 1e6:>14.0f} {after * 1e6:>13.0f} {before / after:>6.1f}x")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        cold, count = compile_time(False)
+        compile_time(os.path.join(tmp, 'jinja'))  # füllt den Bytecode-Cache
+        warm, _ = compile_time(os.path.join(tmp, 'jinja'))
+    print(f"\n{count} Vorlagen laden: übersetzen {cold * 1000:.1f} ms, aus Bytecode-Cache {warm * 1000:.1f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,60 @@
+import os
+import random
+import shutil
+
+from app import Question, create_app, get_catalog, get_scoring, populate_database, upgrade_database
+
+MODULES = ['Basic', 'Express', 'Advanced']
+
+# Ohne Zulassungssteuerung: der Lasttest misst Antwortzeiten, nicht 503-Abweisungen
+app = create_app({'ADMISSION_LIMITS': {}})
+
+
+def ensure_database():
+    # Benchmarks brauchen einen befüllten Katalog
+    with app.app_context():
+        upgrade_database()
+        if Question.query.count() == 0:
+            populate_database()
+        return get_catalog()
+
+
+def isolated_config(directory):
+    """Eigene Datenbank (Kopie von instance/quiz.db), Sitzungen, Caches und Uploads in directory.
+
+    Simulierte Durchläufe landen so nicht in der versionierten instance/quiz.db.
+    """
+    path = os.path.join(directory, 'quiz.db')
+    shutil.copy(os.path.join(app.instance_path, 'quiz.db'), path)
+    return {
+        'SQLALCHEMY_DATABASE_URI': f'sqlite:///{path}',
+        'SESSION_STORE_PATH': os.path.join(directory, 'sessions.db'),
+        'REPORT_CACHE_DIR': os.path.join(directory, 'report_cache'),
+        'JOB_STATUS_DIR': os.path.join(directory, 'jobs'),
+        'ADMISSION_LOCK_DIR': os.path.join(directory, 'admission'),
+        'UPLOAD_FOLDER': os.path.join(directory, 'uploads'),
+    }
+
+
+def config_env(config):
+    # Dieselben Einstellungen für einen gunicorn-Prozess (app.config.from_prefixed_env)
+    return {f'FLASK_{key}': value for key, value in config.items()}
+
+
+def sample_answers(catalog, rng=None):
+    # Ein vollständiger Durchlauf aller Module, wie ihn die Session am Ende enthält
+    rng = rng or random.Random(0)
+    all_answers = {}
+    for module in MODULES:
+        answers = {}
+        for question in catalog.questions(module):
+            if question.answers:
+                answer = rng.choice(question.answers)
+                answers[str(question.id)] = {'text': answer.text, 'score': answer.score}
+            else:
+                answers[str(question.id)] = {'text': f'Freitext {rng.randint(1, 10**6)}', 'score': None}
+        all_answers[module] = answers
+    with app.app_context():
+        scoring = get_scoring()
+    module_scores = {module: scoring.score(module, all_answers[module]) for module in MODULES}
+    return all_answers, module_scores
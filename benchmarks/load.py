@@ -0,0 +1,323 @@
+"""Lasttest: N gleichzeitige Nutzer durchlaufen info -> Basic -> Modul -> Zusammenfassung -> PDF.
+
+Aufruf aus dem Projektverzeichnis:
+
+    # In-Process über den Flask-Testclient (ein Thread pro Nutzer)
+    python -m benchmarks.load --users 20 --runs 2
+
+    # Über HTTP gegen einen lokal gestarteten gunicorn (mehrere Client-Prozesse)
+    python -m benchmarks.load --gunicorn 4 --processes 4 --users 40
+
+    # Gegen einen bereits laufenden Server
+    python -m benchmarks.load --url http://127.0.0.1:8000 --processes 4 --users 40
+
+    # Regressionsmodus: Basislinie speichern, später vergleichen (Exit-Code 1 bei Verschlechterung)
+    python -m benchmarks.load --save-baseline bench_baseline.json
+    python -m benchmarks.load --baseline bench_baseline.json --tolerance 0.25
+"""
+import argparse
+import http.cookiejar
+import json
+import multiprocessing
+import os
+import random
+import re
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from collections import defaultdict
+
+ANSWER_RE = re.compile(r'name="answer" value="(\d+)"')
+MODULES = ('Express', 'Advanced')
+
+
+class TestClientTransport:
+    def __init__(self, app):
+        self.client = app.test_client()
+
+    def request(self, method, path, data=None):
+        response = self.client.open(path, method=method, data=data)
+        body = response.get_data()
+        return response.status_code, response.headers.get('Location'), body
+
+
+class _NoRedirect(urllib.request.HTTPRedirectHandler):
+    def redirect_request(self, *args, **kwargs):
+        return None
+
+
+class HttpTransport:
+    def __init__(self, base_url):
+        self.base_url = base_url.rstrip('/')
+        self.opener = urllib.request.build_opener(
+            urllib.request.HTTPCookieProcessor(http.cookiejar.CookieJar()), _NoRedirect
+        )
+
+    def request(self, method, path, data=None):
+        body = urllib.parse.urlencode(data).encode() if data is not None else None
+        req = urllib.request.Request(self.base_url + path, data=body, method=method)
+        try:
+            with self.opener.open(req, timeout=120) as response:
+                return response.status, response.headers.get('Location'), response.read()
+        except urllib.error.HTTPError as exc:
+            return exc.code, exc.headers.get('Location'), exc.read()
+
+
+class Recorder:
+    def __init__(self, route_label):
+        self.route_label = route_label
+        self.timings = defaultdict(list)
+        self.errors = defaultdict(int)
+        self._lock = threading.Lock()
+
+    def call(self, transport, method, path, data=None):
+        start = time.perf_counter()
+        status, location, body = transport.request(method, path, data)
+        elapsed = time.perf_counter() - start
+        label = self.route_label(method, path)
+        with self._lock:
+            self.timings[label].append(elapsed)
+            if status >= 400:
+                self.errors[label] += 1
+        return status, location, body
+
+
+def _path(location):
+    # Location kann absolut (HTTP) oder relativ (Testclient) sein
+    return urllib.parse.urlsplit(location).path if location else None
+
+
+def walk_module(recorder, transport, path, rng):
+    # Beantwortet alle Fragen eines Moduls, bis auf eine andere Seite weitergeleitet wird
+    for _ in range(200):
+        status, location, body = recorder.call(transport, 'GET', path)
+        if status in (301, 302, 303):
+            return _path(location)
+        ids = ANSWER_RE.findall(body.decode('utf-8', 'replace'))
+        data = {'next': '1'}
+        if ids:
+            data['answer'] = rng.choice(ids)
+        else:
+            data['free_text'] = f'Antwort {rng.randint(1, 10**6)}'
+        status, location, _ = recorder.call(transport, 'POST', path, data)
+        target = _path(location)
+        if status not in (301, 302, 303) or target.rstrip('/') != path.rstrip('/'):
+            return target
+    raise RuntimeError(f'Modul {path} endet nicht')
+
+
+def run_user(recorder, transport, rng, modules):
+    recorder.call(transport, 'GET', '/info')
+    recorder.call(transport, 'POST', '/info')
+    walk_module(recorder, transport, '/basic_quiz/', rng)
+    for module in modules:
+        recorder.call(transport, 'POST', '/choose_module/', {'module': module})
+        walk_module(recorder, transport, f'/quiz/{module}', rng)
+    recorder.call(transport, 'GET', '/summary/')
+    recorder.call(transport, 'GET', '/download_pdf')
+
+
+def route_labeler():
+    from benchmarks.common import app
+
+    adapter = app.url_map.bind('localhost')
+    rules = {rule.endpoint: rule.rule for rule in app.url_map.iter_rules()}
+
+    def label(method, path):
+        try:
+            endpoint, _ = adapter.match(path, method=method)
+        except Exception:
+            return f'{method} {path}'
+        return f'{method} {rules[endpoint]}'
+
+    return label
+
+
+def _user_modules(index, module_mix):
+    return (MODULES[index % 2],) if module_mix == 'alternate' else MODULES
+
+
+def run_in_process(users, runs, module_mix, config):
+    from app import create_app, populate_database, upgrade_database
+
+    app = create_app({'ADMISSION_LIMITS': {}, **config})
+    with app.app_context():
+        upgrade_database()
+        populate_database()
+    recorder = Recorder(route_labeler())
+
+    def user(index):
+        rng = random.Random(index)
+        for _ in range(runs):
+            run_user(recorder, TestClientTransport(app), rng, _user_modules(index, module_mix))
+
+    threads = [threading.Thread(target=user, args=(i,)) for i in range(users)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return recorder.timings, recorder.errors, time.perf_counter() - start
+
+
+def _http_worker(args):
+    base_url, user_indexes, runs, module_mix = args
+    recorder = Recorder(route_labeler())
+
+    def user(index):
+        rng = random.Random(index)
+        for _ in range(runs):
+            run_user(recorder, HttpTransport(base_url), rng, _user_modules(index, module_mix))
+
+    threads = [threading.Thread(target=user, args=(i,)) for i in user_indexes]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return dict(recorder.timings), dict(recorder.errors)
+
+
+def run_over_http(base_url, users, runs, processes, module_mix):
+    chunks = [list(range(users))[i::processes] for i in range(processes)]
+    timings, errors = defaultdict(list), defaultdict(int)
+    start = time.perf_counter()
+    with multiprocessing.Pool(processes) as pool:
+        for worker_timings, worker_errors in pool.map(
+            _http_worker, [(base_url, chunk, runs, module_mix) for chunk in chunks if chunk]
+        ):
+            for label, values in worker_timings.items():
+                timings[label].extend(values)
+            for label, count in worker_errors.items():
+                errors[label] += count
+    return timings, errors, time.perf_counter() - start
+
+
+def start_gunicorn(workers, env=None, admission=False):
+    # env: zusätzliche Umgebungsvariablen, z.B. FLASK_SQLITE_PRAGMAS für andere Profile.
+    # Ohne admission keine Zulassungssteuerung: gemessen werden Antwortzeiten, nicht 503-Abweisungen
+    if not admission:
+        env = {'FLASK_ADMISSION_LIMITS': '{}', **(env or {})}
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        port = sock.getsockname()[1]
+    process = subprocess.Popen(
+        [sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py', '-w', str(workers),
+         '-b', f'127.0.0.1:{port}'],
+        env={**os.environ, **(env or {})},
+    )
+    base_url = f'http://127.0.0.1:{port}'
+    for _ in range(100):
+        try:
+            urllib.request.urlopen(base_url + '/info', timeout=1).close()
+            return process, base_url
+        except OSError:
+            time.sleep(0.1)
+    process.terminate()
+    raise RuntimeError('gunicorn ist nicht gestartet')
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(fraction * (len(ordered) - 1)))))
+    return ordered[index]
+
+
+def summarize(timings, errors, wall):
+    stats = {}
+    for label, values in sorted(timings.items()):
+        stats[label] = {
+            'count': len(values),
+            'errors': errors.get(label, 0),
+            'p50_ms': percentile(values, 0.50) * 1000,
+            'p95_ms': percentile(values, 0.95) * 1000,
+            'p99_ms': percentile(values, 0.99) * 1000,
+            'rps': len(values) / wall,
+        }
+    return stats
+
+
+def print_report(stats, wall):
+    total = sum(s['count'] for s in stats.values())
+    print(f"{'Route':<34} {'n':>6} {'err':>4} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'req/s':>8}")
+    for label, s in stats.items():
+        print(
+            f"{label:<34} {s['count']:>6} {s['errors']:>4} {s['p50_ms']:>8.1f} "
+            f"{s['p95_ms']:>8.1f} {s['p99_ms']:>8.1f} {s['rps']:>8.1f}"
+        )
+    print(f"\nGesamt: {total} Requests in {wall:.2f} s = {total / wall:.1f} req/s")
+
+
+def compare(stats, baseline, tolerance, metric='p95_ms'):
+    # Liefert die Routen, die gegenüber der Basislinie um mehr als die Toleranz langsamer sind
+    regressions = []
+    for label, s in stats.items():
+        reference = baseline.get(label)
+        if reference and s[metric] > reference[metric] * (1 + tolerance):
+            regressions.append((label, reference[metric], s[metric]))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--users', type=int, default=10, help='gleichzeitige Nutzer')
+    parser.add_argument('--runs', type=int, default=1, help='Durchläufe pro Nutzer')
+    parser.add_argument('--modules', choices=['both', 'alternate'], default='both',
+                        help='jeder Nutzer macht Express und Advanced, oder abwechselnd eines davon')
+    parser.add_argument('--url', help='gegen einen laufenden Server messen statt In-Process')
+    parser.add_argument('--gunicorn', type=int, metavar='WORKERS',
+                        help='lokalen gunicorn mit WORKERS Prozessen starten und per HTTP messen')
+    parser.add_argument('--processes', type=int, default=multiprocessing.cpu_count(),
+                        help='Client-Prozesse im HTTP-Modus')
+    parser.add_argument('--json', metavar='FILE', help='Ergebnisse als JSON schreiben')
+    parser.add_argument('--save-baseline', metavar='FILE')
+    parser.add_argument('--baseline', metavar='FILE')
+    parser.add_argument('--tolerance', type=float, default=0.2,
+                        help='erlaubte Verschlechterung von p95 gegenüber der Basislinie (0.2 = 20%%)')
+    args = parser.parse_args()
+
+    from benchmarks.common import config_env, isolated_config
+
+    server = None
+    with tempfile.TemporaryDirectory() as tmp:
+        # Eigene Datenbank und Sitzungen: die simulierten Durchläufe nicht in instance/quiz.db speichern
+        config = isolated_config(tmp)
+        try:
+            if args.gunicorn:
+                server, args.url = start_gunicorn(args.gunicorn, config_env(config))
+            if args.url:
+                timings, errors, wall = run_over_http(
+                    args.url, args.users, args.runs, args.processes, args.modules
+                )
+            else:
+                timings, errors, wall = run_in_process(args.users, args.runs, args.modules, config)
+        finally:
+            if server is not None:
+                server.terminate()
+                server.wait()
+
+    stats = summarize(timings, errors, wall)
+    print_report(stats, wall)
+
+    for path in filter(None, (args.json, args.save_baseline)):
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(stats, f, indent=2, sort_keys=True)
+
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)
+        regressions = compare(stats, baseline, args.tolerance)
+        for label, before, after in regressions:
+            print(f"LANGSAMER: {label}: p95 {before:.1f} ms -> {after:.1f} ms")
+        if regressions or any(errors.values()):
+            sys.exit(1)
+        print(f"Keine Route mehr als {args.tolerance:.0%} langsamer als die Basislinie.")
+
+
+if __name__ == '__main__':
+    main()
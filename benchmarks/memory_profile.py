@@ -0,0 +1,300 @@
+"""Speicherprofil: Allokationen pro Anfrage, teure Bausteine und RSS im Dauerbetrieb (tracemalloc).
+
+Simuliert nacheinander vollständige Durchläufe (Info -> Basic -> Module -> Zusammenfassung ->
+PDF, dazu ein Bild-Upload) wie ein einzelner gunicorn-Sync-Worker. Gemessen werden:
+
+- je Route die größte Allokationsspitze einer Anfrage und die ORM-Objekte (MEMORY_PROFILE)
+- PDF-Bericht, Bildverkleinerung und Katalog-Laden einzeln; Pillow-Puffer liegen außerhalb
+  von tracemalloc, die Verkleinerung wird daher zusätzlich als RSS-Spitze in einem frischen
+  Prozess gemessen
+- Zuwachs des verfolgten Speichers über die Messläufe nach dem Aufwärmen (Lecks, mit Fundstellen)
+- Zuwachs der RSS in einem zweiten Durchgang ohne tracemalloc (dessen Verwaltung kostet selbst)
+
+Mit --check ist der Exit-Code 1, sobald eine Obergrenze überschritten ist (vor dem Deployment
+laufen lassen). Aufruf aus dem Projektverzeichnis:
+
+    python -m benchmarks.memory_profile --runs 40
+    python -m benchmarks.memory_profile --check
+"""
+import argparse
+import gc
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+from collections import defaultdict
+from io import BytesIO
+
+from benchmarks.load import MODULES, TestClientTransport, route_labeler, run_user
+from metrics import rss_bytes
+
+KIB = 1024
+MIB = 1024 * 1024
+
+# Obergrenzen (etwa das Doppelte der gemessenen Werte, mindestens 256 KiB): Allokationsspitze je Anfrage
+REQUEST_CEILINGS = {
+    'GET /info': 256 * KIB,
+    'POST /info': 256 * KIB,
+    'GET /basic_quiz/': 256 * KIB,
+    'POST /basic_quiz/': 256 * KIB,
+    'POST /choose_module/': 256 * KIB,
+    'GET /quiz/<module>': 256 * KIB,
+    'POST /quiz/<module>': 256 * KIB,
+    'GET /summary/': 512 * KIB,
+    'GET /download_pdf': 1 * MIB,
+    'POST /upload_image': 1 * MIB,  # Werkzeug hält Uploads bis 500 KiB im Speicher
+}
+REQUEST_DEFAULT_CEILING = 256 * KIB
+ORM_OBJECT_CEILING = 0  # Katalog kommt aus dem Cache: keine ORM-Objekte in Anfragen
+COMPONENT_CEILINGS = {
+    'build_report_pdf': 1 * MIB,
+    'process_upload': 512 * KIB,
+    'process_upload (RSS)': 16 * MIB,  # JPEG wird per draft() schon beim Dekodieren verkleinert
+    'get_catalog': 1 * MIB,
+}
+# Dauerbetrieb: Zuwachs je Durchlauf nach dem Aufwärmen. Übrig bleibt u.a. der re-Cache (max.
+# 512 Einträge): Werkzeug übersetzt für jede Multipart-Grenze eines Uploads einen eigenen Ausdruck
+TRACED_GROWTH_PER_RUN = 16 * KIB
+RSS_GROWTH_PER_RUN = 256 * KIB
+
+
+def sample_image(width=2400, height=1600):
+    # Foto-ähnliches JPEG: Verlauf plus Rauschen, damit der Encoder echte Arbeit hat
+    from PIL import Image
+
+    noise = Image.effect_noise((width, height), 40).convert('RGB')
+    gradient = Image.linear_gradient('L').resize((width, height)).convert('RGB')
+    buffer = BytesIO()
+    Image.blend(noise, gradient, 0.5).save(buffer, 'JPEG', quality=90)
+    return buffer.getvalue()
+
+
+class ProfilingTransport(TestClientTransport):
+    """Testclient, der X-Alloc-Peak und X-ORM-Objects je Route festhält."""
+
+    def __init__(self, app, label, samples):
+        super().__init__(app)
+        self.label = label
+        self.samples = samples
+
+    def request(self, method, path, data=None):
+        response = self.client.open(path, method=method, data=data)
+        body = response.get_data()
+        if 'X-Alloc-Peak' in response.headers:
+            self.samples[self.label(method, path)].append(
+                (int(response.headers['X-Alloc-Peak']), int(response.headers['X-ORM-Objects']))
+            )
+        return response.status_code, response.headers.get('Location'), body
+
+
+def upload(transport, image, timeout=30):
+    status, _, body = transport.request('POST', '/upload_image', {'image': (BytesIO(image), 'profil.jpg')})
+    if status != 202:
+        raise RuntimeError(f'Upload: HTTP {status}')
+    status_url = json.loads(body)['status_url']
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        _, _, body = transport.request('GET', status_url)
+        if json.loads(body)['status'] in ('done', 'failed'):
+            return
+        time.sleep(0.01)
+    raise RuntimeError('Upload-Job wird nicht fertig')
+
+
+def wizard_run(app, label, samples, rng, image):
+    transport = ProfilingTransport(app, label, samples)
+    run_user(_NullRecorder(), transport, rng, MODULES)
+    upload(transport, image)
+
+
+class _NullRecorder:
+    # run_user erwartet einen Recorder; gemessen wird hier über die Response-Header
+    def call(self, transport, method, path, data=None):
+        return transport.request(method, path, data)
+
+
+def _peak_rss():
+    # Höchststand der RSS dieses Prozesses (Linux)
+    with open('/proc/self/status') as f:
+        for line in f:
+            if line.startswith('VmHWM:'):
+                return int(line.split()[1]) * KIB
+    raise OSError('VmHWM nicht verfügbar')
+
+
+def _resize_native(image, size, directory):
+    # Läuft in einem frischen Prozess: Zuwachs der RSS-Spitze durch eine Verkleinerung
+    from PIL import Image  # noqa: F401 - Bibliothek vorher laden, gezählt werden nur die Puffer
+
+    from images import process_upload
+
+    path = os.path.join(directory, 'native.upload')
+    with open(path, 'wb') as f:
+        f.write(image)
+    before = _peak_rss()
+    process_upload(path, os.path.join(directory, 'native.jpg'), size)
+    return _peak_rss() - before
+
+
+def native_peak(fn, *args):
+    import multiprocessing
+    from concurrent.futures import ProcessPoolExecutor
+
+    try:
+        with ProcessPoolExecutor(1, mp_context=multiprocessing.get_context('spawn')) as executor:
+            return executor.submit(fn, *args).result()
+    except OSError:
+        return None
+
+
+def measure_component(fn):
+    # Allokationsspitze eines einzelnen Aufrufs über dem Stand davor
+    gc.collect()
+    tracemalloc.reset_peak()
+    before = tracemalloc.get_traced_memory()[0]
+    fn()
+    return tracemalloc.get_traced_memory()[1] - before
+
+
+def components(app, image, directory):
+    from app import catalog_bands, get_catalog, invalidate_catalog
+    from benchmarks.common import sample_answers
+    from images import process_upload
+    from report import build_report_pdf
+
+    results = {}
+    with app.app_context():
+        catalog = get_catalog()
+        all_answers, module_scores = sample_answers(catalog)
+        args = (all_answers, module_scores, catalog.question_map, catalog_bands(catalog))
+        build_report_pdf(*args)  # Aufwärmen: Schriften, Stile
+        results['build_report_pdf'] = measure_component(lambda: build_report_pdf(*args))
+
+        def resize():
+            path = os.path.join(directory, 'profil.upload')
+            with open(path, 'wb') as f:
+                f.write(image)
+            process_upload(path, os.path.join(directory, 'profil.jpg'), app.config['UPLOAD_IMAGE_SIZE'])
+
+        results['process_upload'] = measure_component(resize)
+        native = native_peak(_resize_native, image, app.config['UPLOAD_IMAGE_SIZE'], directory)
+        if native is not None:
+            results['process_upload (RSS)'] = native
+
+        def load_catalog():
+            invalidate_catalog()
+            get_catalog()
+
+        results['get_catalog'] = measure_component(load_catalog)
+    return results
+
+
+def check(label, value, ceiling, unit=KIB):
+    ok = value <= ceiling
+    print(f"{label:<34} {value / unit:>10.1f} {ceiling / unit:>10.1f}  {'ok' if ok else 'ÜBERSCHRITTEN'}")
+    return ok
+
+
+def profile_app(tmp, **config):
+    from app import create_app
+    from benchmarks.common import isolated_config
+
+    os.makedirs(tmp)
+    # Begrenzte Caches klein halten, damit verbleibender Zuwachs auf ein Leck hinweist
+    return create_app({
+        **isolated_config(tmp),
+        'REPORT_CACHE_MEMORY_BYTES': 0,
+        'REPORT_EXECUTOR': 'thread',
+        'IMAGE_EXECUTOR': 'thread',
+        'JOB_HISTORY': 4,
+        'UPLOAD_FOLDER': tmp,
+        'ADMISSION_LIMITS': {},
+        **config,
+    })
+
+
+def traced_growth(before, after):
+    # Zuwachs ohne die Messdaten dieses Skripts
+    ignore = (tracemalloc.Filter(False, __file__), tracemalloc.Filter(False, tracemalloc.__file__))
+    stats = after.filter_traces(ignore).compare_to(before.filter_traces(ignore), 'lineno')
+    return sum(stat.size_diff for stat in stats), stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--warmup', type=int, default=5, help='Durchläufe vor der Messung')
+    parser.add_argument('--runs', type=int, default=40, help='gemessene Durchläufe')
+    parser.add_argument('--frames', type=int, default=1, help='Stack-Tiefe für tracemalloc')
+    parser.add_argument('--top', type=int, default=10, help='größte Zuwächse zeigen')
+    parser.add_argument('--check', action='store_true', help='Exit-Code 1 bei überschrittener Obergrenze')
+    args = parser.parse_args()
+
+    from benchmarks.common import ensure_database
+
+    ensure_database()
+    image = sample_image()
+    label = route_labeler()
+    tmp = tempfile.mkdtemp()
+    try:
+        # 1. Durchgang mit tracemalloc: Spitzen je Anfrage und Zuwachs mit Fundstellen
+        app = profile_app(os.path.join(tmp, 'traced'), MEMORY_PROFILE=True, MEMORY_PROFILE_FRAMES=args.frames)
+        rng = random.Random(0)
+        ignored = defaultdict(list)
+        for _ in range(args.warmup):
+            wizard_run(app, label, ignored, rng, image)
+        samples = defaultdict(list)
+        gc.collect()
+        start = tracemalloc.take_snapshot()
+        for _ in range(args.runs):
+            wizard_run(app, label, samples, rng, image)
+        gc.collect()
+        growth, growth_stats = traced_growth(start, tracemalloc.take_snapshot())
+        parts = components(app, image, tmp)
+        del start
+        tracemalloc.stop()
+
+        # 2. Durchgang ohne tracemalloc: RSS eines Workers im Dauerbetrieb
+        app = profile_app(os.path.join(tmp, 'rss'))
+        for _ in range(args.warmup):
+            wizard_run(app, label, ignored, rng, image)
+        gc.collect()
+        start_rss = rss_bytes()
+        for _ in range(args.runs):
+            wizard_run(app, label, ignored, rng, image)
+        gc.collect()
+        end_rss = rss_bytes()
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+    ok = True
+    print(f"\n{'Anfrage (Spitze je Anfrage)':<34} {'KiB':>10} {'Grenze':>10}")
+    for route, values in sorted(samples.items()):
+        ok &= check(route, max(v[0] for v in values), REQUEST_CEILINGS.get(route, REQUEST_DEFAULT_CEILING))
+    objects = max((v[1] for values in samples.values() for v in values), default=0)
+    ok &= check('ORM-Objekte je Anfrage (max)', objects, ORM_OBJECT_CEILING, unit=1)
+
+    print(f"\n{'Baustein':<34} {'KiB':>10} {'Grenze':>10}")
+    for name, value in parts.items():
+        ok &= check(name, value, COMPONENT_CEILINGS[name])
+
+    print(f"\n{'Dauerbetrieb (Zuwachs je Lauf)':<34} {'KiB':>10} {'Grenze':>10}")
+    ok &= check('tracemalloc', growth / args.runs, TRACED_GROWTH_PER_RUN)
+    if start_rss is not None:
+        ok &= check('RSS', (end_rss - start_rss) / args.runs, RSS_GROWTH_PER_RUN)
+        print(f"RSS nach {args.warmup + args.runs} Läufen: {end_rss / MIB:.1f} MiB")
+
+    if args.top:
+        print(f"\nGrößte Zuwächse über {args.runs} Läufe:")
+        for stat in growth_stats[:args.top]:
+            print(f"  {stat}")
+
+    if args.check:
+        sys.exit(0 if ok else 1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,74 @@
+"""Startzeit der Anwendung: Importzeiten pro Paket und Zeit bis zur ersten Seite.
+
+Aufruf aus dem Projektverzeichnis:
+
+    python -m benchmarks.startup --runs 5 --top 15
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+from collections import defaultdict
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+FIRST_PAGE = (
+    "import app\n"
+    "client = app.create_app().test_client()\n"
+    "response = client.get('/info')\n"
+    "assert response.status_code == 200, response.status_code\n"
+)
+
+
+def import_times():
+    # python -X importtime schreibt je Modul: "import time: self [us] | cumulative | name"
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', 'import app'],
+        cwd=ROOT, capture_output=True, text=True, check=True,
+    )
+    per_package = defaultdict(int)
+    total = 0
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        name = name.strip()
+        per_package[name.split('.')[0]] += int(self_us)
+        if name == 'app':
+            total = int(cumulative_us)
+    return total, per_package
+
+
+def time_to_first_page(runs):
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, '-c', FIRST_PAGE], cwd=ROOT, check=True, capture_output=True)
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--top', type=int, default=15)
+    args = parser.parse_args()
+
+    import_times()  # .pyc-Dateien anlegen, damit nicht das Kompilieren gemessen wird
+    total, per_package = import_times()
+    print(f"import app: {total / 1000:8.1f} ms (kumuliert)")
+    print(f"{'Paket':<30} {'ms':>8}")
+    for package, self_us in sorted(per_package.items(), key=lambda item: -item[1])[:args.top]:
+        print(f"{package:<30} {self_us / 1000:8.1f}")
+
+    timings = time_to_first_page(args.runs)
+    print(
+        f"\nProzessstart bis erste Seite (/info): Median {statistics.median(timings) * 1000:.0f} ms, "
+        f"min {min(timings) * 1000:.0f} ms, max {max(timings) * 1000:.0f} ms ({args.runs} Läufe)"
+    )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,77 @@
+import csv
+import io
+import os
+import statistics
+import time
+import zipfile
+
+from metrics import timed_call
+
+
+def build_reports_zip(output, jobs, workers=None, window=None, on_done=None):
+    """Erzeugt viele PDF-Berichte parallel und schreibt sie direkt in ein ZIP-Archiv.
+
+    jobs liefert (Dateiname, (all_answers, module_scores, questions, bands)), also die
+    Argumente für report.build_report_pdf. Es sind höchstens window Dokumente gleichzeitig
+    in Arbeit, fertige PDFs werden sofort geschrieben und freigegeben - der Speicherbedarf
+    hängt nicht von der Anzahl der Berichte ab.
+    """
+    from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+    import report  # ReportLab vor dem Fork laden, damit die Worker es erben
+    workers = workers or os.cpu_count() or 1
+    window = window or 2 * workers
+
+    timings = []
+    start = time.perf_counter()
+    jobs = iter(jobs)
+    pending = {}
+    # PDFs sind bereits komprimiert: ZIP_STORED spart die doppelte Arbeit
+    with zipfile.ZipFile(output, 'w', compression=zipfile.ZIP_STORED) as archive, \
+            ProcessPoolExecutor(max_workers=workers) as executor:
+
+        def fill():
+            for name, args in jobs:
+                pending[executor.submit(timed_call, report.build_report_pdf, *args)] = (name, time.perf_counter())
+                if len(pending) >= window:
+                    return
+
+        fill()
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                name, submitted = pending.pop(future)
+                seconds, pdf_bytes = future.result()
+                archive.writestr(name, pdf_bytes)
+                timing = (name, seconds, time.perf_counter() - submitted, len(pdf_bytes))
+                timings.append(timing)
+                if on_done:
+                    on_done(*timing)
+            fill()
+
+        archive.writestr('timings.csv', _timings_csv(timings))
+
+    return summarize(timings, time.perf_counter() - start)
+
+
+def _timings_csv(timings):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(['file', 'render_seconds', 'turnaround_seconds', 'bytes'])
+    writer.writerows((name, f'{render:.4f}', f'{turnaround:.4f}', size) for name, render, turnaround, size in timings)
+    return buffer.getvalue()
+
+
+def summarize(timings, wall):
+    if not timings:
+        return {'documents': 0, 'seconds': round(wall, 2)}
+    render = sorted(t[1] for t in timings)
+    return {
+        'documents': len(timings),
+        'seconds': round(wall, 2),
+        'documents_per_second': round(len(timings) / wall, 1),
+        'render_p50_ms': round(statistics.median(render) * 1000, 1),
+        'render_p95_ms': round(render[min(len(render) - 1, int(0.95 * len(render)))] * 1000, 1),
+        'render_max_ms': round(render[-1] * 1000, 1),
+        'bytes': sum(t[3] for t in timings),
+    }
@@ -0,0 +1,105 @@
+import hashlib
+import json
+from collections import namedtuple
+from types import MappingProxyType
+
+# Schreibgeschützte Abbilder der Datenbankzeilen - werden einmal pro Worker
+# aufgebaut und danach nur noch gelesen (keine ORM-Objekte, keine Lazy-Loads).
+CatalogAnswer = namedtuple('CatalogAnswer', 'id question_id text score info_popup')
+CatalogQuestion = namedtuple(
+    'CatalogQuestion', 'id module text subtitle image info_popup answers'
+)
+CatalogBand = namedtuple('CatalogBand', 'id module label min_score max_score recommendation')
+# Überschrift und Spaltenköpfe der Bewertungstabelle je Modul (Zusammenfassung und PDF)
+BAND_TABLES = {
+    'Express': ('Express-Bewertung', ('Eignung', 'Punkte', 'Empfehlung')),
+    'Advanced': ('Experten-Bewertung', ('Kategorie', 'Punktebereich', 'Bewertung')),
+}
+
+
+class Catalog:
+    """Unveränderlicher Fragenkatalog (Fragen, Antworten, Punkte, Popups, Bilder, Bewertungsstufen)."""
+
+    def __init__(self, questions, bands=()):
+        questions = tuple(sorted(questions, key=lambda q: q.id))
+        bands = tuple(sorted(bands, key=lambda b: (b.module, b.min_score)))
+        modules = {}
+        for question in questions:
+            modules.setdefault(question.module, []).append(question)
+
+        self._modules = {module: tuple(items) for module, items in modules.items()}
+        # Schlüssel als String, wie sie in der Session abgelegt werden
+        self.question_map = MappingProxyType({str(q.id): q for q in questions})
+        # Antwort-ID -> Antwort (Text, Punkte, Frage) für die POST-Verarbeitung
+        self._answers = {a.id: a for q in questions for a in q.answers}
+        # (Frage-ID, Antworttext) -> Antwort, um Session-Einträge wieder Antwort-IDs zuzuordnen
+        self._answers_by_text = {(a.question_id, a.text): a for q in questions for a in q.answers}
+        # Bewertungsstufen je Modul, aufsteigend nach Punkten
+        by_module = {}
+        for band in bands:
+            by_module.setdefault(band.module, []).append(band)
+        self._bands = {module: tuple(items) for module, items in by_module.items()}
+        self.version = _content_hash((questions, bands))
+
+    @classmethod
+    def from_models(cls, questions, bands=()):
+        questions = [
+            CatalogQuestion(
+                id=q.id,
+                module=q.module,
+                text=q.text,
+                subtitle=q.subtitle,
+                image=q.image,
+                info_popup=q.info_popup,
+                answers=tuple(
+                    CatalogAnswer(
+                        id=a.id,
+                        question_id=q.id,
+                        text=a.text,
+                        score=a.score,
+                        info_popup=a.info_popup,
+                    )
+                    for a in sorted(q.answers, key=lambda a: (a.position, a.id))
+                ),
+            )
+            for q in questions
+        ]
+        bands = [
+            CatalogBand(
+                id=b.id,
+                module=b.module,
+                label=b.label,
+                min_score=b.min_score,
+                max_score=b.max_score,
+                recommendation=b.recommendation,
+            )
+            for b in bands
+        ]
+        return cls(questions, bands)
+
+    def questions(self, module):
+        return self._modules.get(module, ())
+
+    def bands(self, module):
+        return self._bands.get(module, ())
+
+    def question(self, question_id):
+        return self.question_map.get(str(question_id))
+
+    def find_answer(self, question_id, text):
+        try:
+            return self._answers_by_text.get((int(question_id), text))
+        except (TypeError, ValueError):
+            return None
+
+    def answer(self, answer_id):
+        try:
+            return self._answers.get(int(answer_id))
+        except (TypeError, ValueError):
+            return None
+
+
+def _content_hash(questions):
+    # Inhaltsbasierte Version: identisch in allen Workern, ändert sich bei jedem Reseed
+    payload = json.dumps(questions, ensure_ascii=False, separators=(',', ':'))
+    return hashlib.sha1(payload.encode('utf-8')).hexdigest()[:12]
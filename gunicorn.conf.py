@@ -0,0 +1,30 @@
+# gunicorn -c gunicorn.conf.py
+# Werte lassen sich per Umgebung überschreiben, z.B. WEB_CONCURRENCY=8 BIND=0.0.0.0:8000
+import gc
+import multiprocessing
+import os
+
+wsgi_app = 'wsgi:app'
+bind = os.environ.get('BIND', '127.0.0.1:8000')
+workers = int(os.environ.get('WEB_CONCURRENCY', multiprocessing.cpu_count() * 2 + 1))
+# PDF-Berichte: jeder Worker hat einen eigenen Render-Pool (FLASK_REPORT_WORKERS), gleichzeitig
+# rendern auf dem Host aber höchstens FLASK_REPORT_HOST_WORKERS (Standard CPU / 2), egal wie viele Worker
+
+# App einmal im Master laden (Migrationen, Katalog, Bild-Manifest, ReportLab), danach forken:
+# die Worker teilen sich diese Speicherseiten per Copy-on-Write
+preload_app = True
+
+# Worker nach einer zufällig gestreuten Anzahl Anfragen ersetzen, damit nicht alle gleichzeitig neu starten
+max_requests = int(os.environ.get('MAX_REQUESTS', 1000))
+max_requests_jitter = int(os.environ.get('MAX_REQUESTS_JITTER', 100))
+# download_pdf wartet bis zu REPORT_JOB_TIMEOUT (60 s) auf den Bericht
+timeout = 90
+# Laufende Anfragen beim Neustart/Recycling noch zu Ende bearbeiten
+graceful_timeout = 30
+keepalive = 5
+
+
+def when_ready(server):
+    # Nach dem Preload, vor dem ersten Fork: geladene Objekte von der Garbage Collection
+    # ausnehmen, damit sie die geteilten Seiten in den Workern nicht anfasst und kopiert
+    gc.freeze()
@@ -0,0 +1,162 @@
+import hashlib
+import json
+import os
+import tempfile
+from io import BytesIO
+
+from markupsafe import Markup, escape
+
+# Pillow wird erst in den Funktionen importiert, die Pixel verarbeiten: das Rendern
+# der <picture>-Tags braucht nur das Manifest.
+
+# Quadratische Zuschnitte wie im Template (250x250, object-fit: cover) für 1x, 2x, 3x
+VARIANT_WIDTHS = (250, 500, 750)
+SOURCE_EXTENSIONS = ('.jpg', '.jpeg', '.png')
+MANIFEST_NAME = 'manifest.json'
+
+
+def _variant_formats():
+    from PIL import Image
+
+    # (Dateiendung, MIME-Typ, Pillow-Format, Speicheroptionen) - bevorzugtes Format zuerst
+    formats = []
+    if '.avif' in Image.registered_extensions():
+        formats.append(('avif', 'image/avif', 'AVIF', {'quality': 60}))
+    formats.append(('webp', 'image/webp', 'WEBP', {'quality': 80, 'method': 6}))
+    formats.append(('jpg', 'image/jpeg', 'JPEG', {'quality': 82, 'optimize': True, 'progressive': True}))
+    return formats
+
+
+def load_manifest(output_dir):
+    try:
+        with open(os.path.join(output_dir, MANIFEST_NAME), encoding='utf-8') as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return {'sources': {}, 'images': {}}
+
+
+def build_image_variants(source_dir, output_dir, widths=VARIANT_WIDTHS):
+    """Erzeugt verkleinerte Varianten mit Inhalts-Hash im Dateinamen; unveränderte Quellen werden übersprungen."""
+    os.makedirs(output_dir, exist_ok=True)
+    manifest = load_manifest(output_dir)
+    sources, images = {}, {}
+
+    for name in sorted(os.listdir(source_dir)):
+        path = os.path.join(source_dir, name)
+        if not name.lower().endswith(SOURCE_EXTENSIONS) or not os.path.isfile(path):
+            continue
+        with open(path, 'rb') as f:
+            digest = hashlib.sha256(f.read()).hexdigest()
+        sources[name] = digest
+
+        previous = manifest['images'].get(name)
+        if (manifest['sources'].get(name) == digest and previous
+                and all(os.path.exists(os.path.join(output_dir, v['file']))
+                        for variants in previous['formats'].values() for v in variants)):
+            images[name] = previous
+            continue
+        images[name] = _build_variants(path, output_dir, widths)
+
+    manifest = {'sources': sources, 'images': images}
+    _remove_stale(output_dir, manifest)
+    fd, tmp_path = tempfile.mkstemp(dir=output_dir, suffix='.tmp')
+    with os.fdopen(fd, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    os.chmod(tmp_path, 0o644)
+    os.replace(tmp_path, os.path.join(output_dir, MANIFEST_NAME))
+    return manifest
+
+
+def _build_variants(path, output_dir, widths):
+    from PIL import Image, ImageOps
+
+    stem = os.path.splitext(os.path.basename(path))[0]
+    formats = {}
+    with Image.open(path) as original:
+        original = ImageOps.exif_transpose(original).convert('RGB')
+        for width in widths:
+            if width > min(original.size):
+                continue
+            img = ImageOps.fit(original, (width, width), Image.LANCZOS)
+            for ext, mimetype, pil_format, options in _variant_formats():
+                buffer = BytesIO()
+                img.save(buffer, pil_format, **options)
+                data = buffer.getvalue()
+                filename = f'{stem}-{width}.{hashlib.sha256(data).hexdigest()[:10]}.{ext}'
+                with open(os.path.join(output_dir, filename), 'wb') as f:
+                    f.write(data)
+                formats.setdefault(mimetype, []).append({'width': width, 'file': filename})
+    return {'formats': formats}
+
+
+def _remove_stale(output_dir, manifest):
+    referenced = {
+        v['file']
+        for image in manifest['images'].values()
+        for variants in image['formats'].values()
+        for v in variants
+    }
+    for entry in os.scandir(output_dir):
+        if entry.is_file() and entry.name != MANIFEST_NAME and entry.name not in referenced:
+            os.remove(entry.path)
+
+
+def render_picture(variants, url_for_file, fallback_url, alt, sizes):
+    # <picture> mit einer <source> je Format; JPEG (oder das Original) als <img>-Fallback
+    if variants is None:
+        return Markup('<picture><img src="{}" alt="{}" title="{}"></picture>').format(fallback_url, alt, alt)
+
+    parts = ['<picture>']
+    fallback = None
+    for mimetype, items in variants['formats'].items():
+        srcset = ', '.join(f"{url_for_file(v['file'])} {v['width']}w" for v in items)
+        if mimetype == 'image/jpeg':
+            fallback = (url_for_file(items[0]['file']), srcset)
+            continue
+        parts.append(f'<source type="{mimetype}" srcset="{escape(srcset)}" sizes="{escape(sizes)}">')
+    src, srcset = fallback or (fallback_url, '')
+    parts.append(
+        f'<img src="{escape(src)}" srcset="{escape(srcset)}" sizes="{escape(sizes)}" '
+        f'alt="{escape(alt)}" title="{escape(alt)}" decoding="async">'
+    )
+    parts.append('</picture>')
+    return Markup(''.join(parts))
+
+
+UPLOAD_FORMATS = {'JPEG': '.jpg', 'PNG': '.png', 'WEBP': '.webp'}
+
+
+def sniff_image(path, max_pixels):
+    from PIL import Image
+
+    # Image.open liest nur den Header - kein Dekodieren der Pixeldaten
+    try:
+        with Image.open(path) as img:
+            image_format, size = img.format, img.size
+    except (OSError, Image.DecompressionBombError):
+        return None
+    if image_format not in UPLOAD_FORMATS or size[0] * size[1] > max_pixels:
+        return None
+    return image_format
+
+
+def process_upload(tmp_path, dest_path, size):
+    """Verkleinert ein hochgeladenes Bild (läuft im Worker-Pool) und ersetzt das Ziel atomar."""
+    from PIL import Image
+
+    try:
+        with Image.open(tmp_path) as img:
+            if img.format == 'JPEG':
+                # JPEG direkt beim Dekodieren um 1/2, 1/4 oder 1/8 verkleinern
+                img.draft('RGB', size)
+            img.thumbnail(size, Image.LANCZOS, reducing_gap=2.0)
+            fd, out_path = tempfile.mkstemp(
+                dir=os.path.dirname(dest_path), suffix=os.path.splitext(dest_path)[1]
+            )
+            with os.fdopen(fd, 'wb') as out:
+                img.save(out, img.format, quality=95, optimize=True)
+        os.chmod(out_path, 0o644)
+        os.replace(out_path, dest_path)
+    finally:
+        os.remove(tmp_path)
+    return os.path.basename(dest_path)
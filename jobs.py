@@ -0,0 +1,213 @@
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import BrokenExecutor
+
+logger = logging.getLogger(__name__)
+
+
+class QueueFull(Exception):
+    """Die Warteschlange hat schon max_pending unerledigte Jobs."""
+
+
+class Job:
+    def __init__(self, job_id):
+        self.id = job_id
+        self.state = 'pending'  # pending -> running -> done | failed
+        self.result = None
+        self.error = None
+        self.created = time.time()
+        self.finished = None
+        self.future = None
+        self._done = threading.Event()
+
+    @property
+    def status(self):
+        if self.state == 'pending' and self.future is not None and self.future.running():
+            return 'running'
+        return self.state
+
+    def wait(self, timeout=None):
+        return self._done.wait(timeout)
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'status': self.status,
+            'error': self.error,
+            'seconds': round((self.finished or time.time()) - self.created, 3),
+        }
+
+    def _record(self):
+        # Für die Statusdatei: was andere Worker-Prozesse zur Abfrage brauchen
+        return {
+            'id': self.id,
+            'status': self.state,
+            'error': self.error,
+            'created': self.created,
+            'finished': self.finished,
+            'result': self.result if isinstance(self.result, (str, int, float)) else None,
+        }
+
+
+class JobQueue:
+    """Hintergrund-Jobs in einem Prozess- oder Thread-Pool, abfragbar über ihre ID.
+
+    Mit status_dir schreibt die Warteschlange den Stand jedes Jobs zusätzlich als Datei dorthin:
+    unter gunicorn landet die Status-Abfrage meist bei einem anderen Worker als der Job.
+    """
+
+    def __init__(self, name, max_workers, kind='process', max_finished=1000, status_dir=None, max_pending=None,
+                 status_ttl=24 * 60 * 60):
+        self.name = name
+        self.max_workers = max_workers
+        self.kind = kind
+        self.max_finished = max_finished
+        self.max_pending = max_pending  # None = unbegrenzt; sonst wirft submit() QueueFull
+        self.status_dir = status_dir
+        # Statusdateien älter als status_ttl löschen: Worker werden recycelt und räumen ihre eigenen
+        # Dateien dann nicht mehr auf. Geprüft wird höchstens alle status_ttl / 24 Sekunden
+        self.status_ttl = status_ttl
+        self._swept = 0.0
+        if status_dir:
+            os.makedirs(status_dir, exist_ok=True)
+        self._jobs = OrderedDict()
+        self._lock = threading.Lock()
+        self._executor = None
+        self._executor_pid = None
+
+    def _get_executor(self):
+        # Pool erst im Worker-Prozess anlegen (nach dem Fork von gunicorn)
+        if self._executor is None or self._executor_pid != os.getpid():
+            # Import erst hier: concurrent.futures.process zieht multiprocessing nach
+            if self.kind == 'process':
+                from concurrent.futures import ProcessPoolExecutor
+                self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+            else:
+                from concurrent.futures import ThreadPoolExecutor
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers, thread_name_prefix=self.name
+                )
+            self._executor_pid = os.getpid()
+        return self._executor
+
+    def submit(self, job_id, fn, *args, on_success=None):
+        with self._lock:
+            job = self._jobs.get(job_id)
+            # Laufende oder fertige Jobs mit gleicher ID nicht doppelt starten
+            if job is not None and job.state != 'failed':
+                return job
+            if self._full():
+                raise QueueFull(self.name)
+            job = Job(job_id)
+            job.future = self._submit(fn, *args)
+            # Erst nach erfolgreichem submit eintragen: sonst bliebe der Job für immer pending
+            self._jobs[job_id] = job
+            self._trim()
+        self._write_status(job)
+        self._sweep_status()
+
+        def finish(future):
+            try:
+                result = future.result()
+                job.result = on_success(result) if on_success else result
+                job.state = 'done'
+            except Exception as exc:
+                logger.exception("Job %s/%s fehlgeschlagen", self.name, job_id)
+                job.error = str(exc)
+                job.state = 'failed'
+            job.finished = time.time()
+            job.future = None
+            self._write_status(job)
+            job._done.set()
+
+        job.future.add_done_callback(finish)
+        return job
+
+    def _submit(self, fn, *args):
+        try:
+            return self._get_executor().submit(fn, *args)
+        except BrokenExecutor:
+            # Ein Kindprozess ist gestorben (OOM-Kill, Absturz in Pillow/ReportLab): der Pool nimmt
+            # keine Jobs mehr an, also verwerfen und einmal mit einem neuen Pool versuchen
+            logger.warning("Pool %s defekt, wird neu gestartet", self.name)
+            self._executor.shutdown(wait=False)
+            self._executor = None
+            return self._get_executor().submit(fn, *args)
+
+    def get(self, job_id):
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def full(self):
+        # Vorab-Prüfung, damit Anfragen abgewiesen werden, bevor sie Arbeit verursachen
+        with self._lock:
+            return self._full()
+
+    def _full(self):
+        if self.max_pending is None:
+            return False
+        pending = sum(1 for job in self._jobs.values() if not job._done.is_set())
+        return pending >= self.max_pending
+
+    def status(self, job_id):
+        """Stand eines Jobs als dict (wie Job.to_dict() plus result), auch aus anderen Prozessen.
+
+        None, wenn der Job weder hier noch in der Statusdatei bekannt ist.
+        """
+        job = self.get(job_id)
+        if job is not None:
+            return dict(job.to_dict(), result=job.result)
+        # IDs kommen aus der URL: nur Hex-IDs (uuid4, Fingerabdruck) sind gültige Dateinamen
+        if not self.status_dir or not (job_id.isascii() and job_id.isalnum()):
+            return None
+        try:
+            with open(self._status_path(job_id), encoding='utf-8') as f:
+                record = json.load(f)
+        except (FileNotFoundError, ValueError):
+            return None
+        return {
+            'id': record['id'],
+            'status': record['status'],
+            'error': record['error'],
+            'seconds': round((record['finished'] or time.time()) - record['created'], 3),
+            'result': record['result'],
+        }
+
+    def _write_status(self, job):
+        if not self.status_dir:
+            return
+        # Atomar ersetzen, damit Leser nie eine halbe Datei sehen
+        fd, tmp_path = tempfile.mkstemp(dir=self.status_dir, suffix='.tmp')
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(job._record(), f)
+        os.replace(tmp_path, self._status_path(job.id))
+
+    def _sweep_status(self):
+        if not self.status_dir or time.time() - self._swept < self.status_ttl / 24:
+            return
+        self._swept = time.time()
+        expired = self._swept - self.status_ttl
+        for entry in os.scandir(self.status_dir):
+            try:
+                if entry.stat().st_mtime < expired:
+                    os.remove(entry.path)
+            except FileNotFoundError:
+                pass
+
+    def _status_path(self, job_id):
+        return os.path.join(self.status_dir, f'{job_id}.json')
+
+    def _trim(self):
+        finished = [job_id for job_id, job in self._jobs.items() if job._done.is_set()]
+        for job_id in finished[:max(0, len(self._jobs) - self.max_finished)]:
+            del self._jobs[job_id]
+            if self.status_dir:
+                try:
+                    os.remove(self._status_path(job_id))
+                except FileNotFoundError:
+                    pass
@@ -0,0 +1,365 @@
+import json
+import math
+import os
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+from flask import Response, abort, g, has_request_context, request, session
+
+# Kennzahlen werden pro Prozess gesammelt; bei mehreren gunicorn-Workern liefert
+# /metrics nur die Werte des Workers, der die Anfrage beantwortet.
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100)
+SIZE_BUCKETS = (64, 128, 256, 512, 1024, 2048, 4096, 8192)
+ALLOC_BUCKETS = tuple(2 ** n * 1024 for n in range(4, 17, 2))  # 16 KiB .. 64 MiB
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(labelnames, values, extra=()):
+    pairs = list(zip(labelnames, values)) + list(extra)
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in pairs) + '}'
+
+
+class Counter:
+    type = 'counter'
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1, **labels):
+        key = tuple(labels[name] for name in self.labelnames)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def samples(self):
+        with self._lock:
+            items = sorted(self._values.items())
+        for key, value in items:
+            yield self.name, _format_labels(self.labelnames, key), value
+
+
+class Gauge(Counter):
+    type = 'gauge'
+
+    def set(self, value, **labels):
+        key = tuple(labels[name] for name in self.labelnames)
+        with self._lock:
+            self._values[key] = value
+
+
+class Histogram:
+    type = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        self._values = {}  # Labels -> [Zähler je Bucket..., Anzahl, Summe]
+        self._lock = threading.Lock()
+
+    def observe(self, value, **labels):
+        key = tuple(labels[name] for name in self.labelnames)
+        with self._lock:
+            entry = self._values.get(key)
+            if entry is None:
+                entry = self._values[key] = [0] * (len(self.buckets) + 2)
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    entry[i] += 1
+            entry[-2] += 1
+            entry[-1] += value
+
+    def samples(self):
+        with self._lock:
+            items = sorted((key, list(entry)) for key, entry in self._values.items())
+        for key, entry in items:
+            for bound, count in zip(self.buckets, entry):
+                yield f'{self.name}_bucket', _format_labels(self.labelnames, key, [('le', bound)]), count
+            yield f'{self.name}_bucket', _format_labels(self.labelnames, key, [('le', '+Inf')]), entry[-2]
+            yield f'{self.name}_count', _format_labels(self.labelnames, key), entry[-2]
+            yield f'{self.name}_sum', _format_labels(self.labelnames, key), entry[-1]
+
+
+class Registry:
+    def __init__(self):
+        self._metrics = {}
+
+    def register(self, metric):
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name, documentation, labelnames=()):
+        return self.register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name, documentation, labelnames=()):
+        return self.register(Gauge(name, documentation, labelnames))
+
+    def histogram(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+
+    def render(self):
+        # Prometheus-Textformat 0.0.4
+        lines = []
+        for metric in self._metrics.values():
+            lines.append(f'# HELP {metric.name} {metric.documentation}')
+            lines.append(f'# TYPE {metric.name} {metric.type}')
+            for name, labels, value in metric.samples():
+                lines.append(f'{name}{labels} {_format_value(value)}')
+        return '\n'.join(lines) + '\n'
+
+
+def _format_value(value):
+    # Volle Genauigkeit: mit :g (6 Stellen) gingen kleine Zuwächse großer _sum-Werte verloren
+    if isinstance(value, float):
+        if math.isinf(value):
+            return '+Inf' if value > 0 else '-Inf'
+        return 'NaN' if math.isnan(value) else repr(value)
+    return str(value)
+
+
+registry = Registry()
+
+request_seconds = registry.histogram(
+    'quiz_request_duration_seconds', 'Bearbeitungszeit pro Route', ('method', 'route', 'status')
+)
+phase_seconds = registry.histogram(
+    'quiz_phase_duration_seconds', 'Dauer einzelner Abschnitte innerhalb einer Anfrage', ('phase',)
+)
+request_queries = registry.histogram(
+    'quiz_request_sql_queries', 'SQL-Abfragen pro Anfrage', ('route',), buckets=QUERY_BUCKETS
+)
+sql_seconds = registry.histogram(
+    'quiz_sql_query_duration_seconds', 'Dauer einzelner SQL-Abfragen'
+)
+session_cookie_bytes = registry.histogram(
+    'quiz_session_cookie_bytes', 'Größe des gesetzten Session-Cookies', buckets=SIZE_BUCKETS
+)
+session_data_bytes = registry.histogram(
+    'quiz_session_data_bytes', 'Größe der serverseitig gespeicherten Sitzungsdaten',
+    buckets=SIZE_BUCKETS + (16384, 32768, 65536),
+)
+pdf_render_seconds = registry.histogram(
+    'quiz_pdf_render_duration_seconds', 'Dauer der PDF-Erzeugung', ('where',)
+)
+template_seconds = registry.histogram(
+    'quiz_template_render_duration_seconds', 'Renderzeit pro Vorlage', ('template',)
+)
+fragment_cache = registry.counter(
+    'quiz_fragment_cache_total', 'Zugriffe auf den Fragment-Cache der Fragenblöcke', ('result',)
+)
+admission_requests = registry.counter(
+    'quiz_admission_requests_total',
+    'Zulassung teurer Endpunkte: admitted, queued, rejected (Warteschlange voll), timeout',
+    ('endpoint', 'result'),
+)
+request_alloc_bytes = registry.histogram(
+    'quiz_request_alloc_peak_bytes', 'Spitze der Python-Allokationen pro Anfrage (MEMORY_PROFILE)',
+    ('route',), buckets=ALLOC_BUCKETS,
+)
+request_orm_objects = registry.histogram(
+    'quiz_request_orm_objects', 'Objekte in der ORM-Identity-Map am Ende der Anfrage (MEMORY_PROFILE)',
+    ('route',), buckets=QUERY_BUCKETS,
+)
+process_rss_bytes = registry.gauge('quiz_process_rss_bytes', 'Resident Set Size dieses Prozesses')
+traced_bytes = registry.gauge('quiz_tracemalloc_bytes', 'Von tracemalloc verfolgter Speicher', ('kind',))
+admission_wait_seconds = registry.histogram(
+    'quiz_admission_wait_seconds', 'Wartezeit bis zur Zulassung', ('endpoint',)
+)
+
+
+@contextmanager
+def phase(name):
+    """Misst einen Abschnitt; innerhalb einer Anfrage erscheint er auch im Server-Timing-Header."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        phase_seconds.observe(elapsed, phase=name)
+        if has_request_context() and 'metrics_phases' in g:
+            g.metrics_phases[name] = g.metrics_phases.get(name, 0.0) + elapsed
+
+
+def rss_bytes():
+    # Aktuelle RSS aus /proc (Linux); anderswo None
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+def orm_objects(app):
+    # Größe der Identity-Map der Request-Session (Flask-SQLAlchemy)
+    db = app.extensions.get('sqlalchemy')
+    return len(db.session.identity_map) if db is not None else 0
+
+
+def top_allocations(limit=25, group_by='lineno'):
+    """Größte Allokationsstellen laut tracemalloc als Text (nur mit MEMORY_PROFILE)."""
+    snapshot = tracemalloc.take_snapshot().filter_traces((
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, '<frozen importlib._bootstrap*>'),
+    ))
+    stats = snapshot.statistics(group_by)
+    current, peak = tracemalloc.get_traced_memory()
+    lines = [f'# verfolgt {current / 1024:.0f} KiB, Spitze {peak / 1024:.0f} KiB, {len(stats)} Stellen']
+    for stat in stats[:limit]:
+        frame = stat.traceback[0]
+        lines.append(f'{stat.size / 1024:10.1f} KiB {stat.count:8d}x  {frame.filename}:{frame.lineno}')
+    return '\n'.join(lines) + '\n'
+
+
+def timed_call(fn, *args):
+    # Läuft im Worker-Prozess: Ergebnis samt Dauer zurückgeben, gezählt wird im Webprozess
+    start = time.perf_counter()
+    result = fn(*args)
+    return time.perf_counter() - start, result
+
+
+def _route():
+    rule = request.url_rule
+    return rule.rule if rule is not None else 'unmatched'
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault('metrics_query_start', []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info['metrics_query_start'].pop()
+    sql_seconds.observe(elapsed)
+    if has_request_context() and 'metrics_queries' in g:
+        g.metrics_queries += 1
+        g.metrics_sql_seconds += elapsed
+
+
+def _before_render_template(sender, template, context, **extra):
+    g.metrics_render_start = time.perf_counter()
+
+
+def _template_rendered(sender, template, context, **extra):
+    start = g.pop('metrics_render_start', None)
+    if start is not None:
+        elapsed = time.perf_counter() - start
+        phase_seconds.observe(elapsed, phase='render')
+        template_seconds.observe(elapsed, template=template.name)
+        if 'metrics_phases' in g:
+            g.metrics_phases['render'] = g.metrics_phases.get('render', 0.0) + elapsed
+
+
+def _request_finished(sender, response, **extra):
+    # Erst nach save_session steht das Session-Cookie in der Antwort
+    cookie_name = sender.config['SESSION_COOKIE_NAME']
+    for header in response.headers.getlist('Set-Cookie'):
+        if header.startswith(cookie_name + '='):
+            session_cookie_bytes.observe(len(header.encode()))
+    if session.modified:
+        session_data_bytes.observe(len(json.dumps(dict(session), separators=(',', ':')).encode()))
+
+
+def init_app(app):
+    """Hängt Zeitmessung, SQL-Zähler und den /metrics-Endpunkt an die Anwendung."""
+    from flask import before_render_template, request_finished, template_rendered
+    from sqlalchemy import event
+    from sqlalchemy.engine import Engine
+
+    app.config.setdefault('METRICS_ENABLED', True)
+    app.config.setdefault('METRICS_ALLOW_REMOTE', False)
+    app.config.setdefault('SERVER_TIMING', False)
+    app.config.setdefault('MEMORY_PROFILE', False)
+    app.config.setdefault('MEMORY_PROFILE_FRAMES', 1)
+    if not app.config['METRICS_ENABLED']:
+        return
+
+    # Auf der Engine-Klasse, damit auch später erzeugte Engines mitgezählt werden
+    if not event.contains(Engine, 'before_cursor_execute', _before_cursor_execute):
+        event.listen(Engine, 'before_cursor_execute', _before_cursor_execute)
+        event.listen(Engine, 'after_cursor_execute', _after_cursor_execute)
+    before_render_template.connect(_before_render_template, app, weak=False)
+    template_rendered.connect(_template_rendered, app, weak=False)
+    request_finished.connect(_request_finished, app, weak=False)
+
+    @app.before_request
+    def start_request_metrics():
+        g.metrics_start = time.perf_counter()
+        g.metrics_queries = 0
+        g.metrics_sql_seconds = 0.0
+        g.metrics_phases = {}
+
+    @app.after_request
+    def record_request_metrics(response):
+        start = g.get('metrics_start')
+        if start is None:
+            return response
+        elapsed = time.perf_counter() - start
+        route = _route()
+        request_seconds.observe(elapsed, method=request.method, route=route, status=response.status_code)
+        request_queries.observe(g.metrics_queries, route=route)
+
+        if 'metrics_alloc_start' in g:
+            # Spitze über dem Stand bei Anfragebeginn; tracemalloc zählt prozessweit, genau ist der
+            # Wert daher nur bei einer Anfrage zur Zeit (gunicorn-Sync-Worker)
+            current, peak = tracemalloc.get_traced_memory()
+            allocated = max(0, peak - g.metrics_alloc_start)
+            objects = orm_objects(app)
+            request_alloc_bytes.observe(allocated, route=route)
+            request_orm_objects.observe(objects, route=route)
+            response.headers['X-Alloc-Peak'] = str(allocated)
+            response.headers['X-ORM-Objects'] = str(objects)
+
+        if app.config['SERVER_TIMING']:
+            timings = [f'app;dur={elapsed * 1000:.1f}']
+            timings.append(f'db;dur={g.metrics_sql_seconds * 1000:.1f};desc="{g.metrics_queries} queries"')
+            timings.extend(f'{name};dur={seconds * 1000:.1f}' for name, seconds in g.metrics_phases.items())
+            response.headers['Server-Timing'] = ', '.join(timings)
+        return response
+
+    def require_local():
+        # Nur lokal abrufbar, außer METRICS_ALLOW_REMOTE ist gesetzt
+        if not app.config['METRICS_ALLOW_REMOTE'] and request.remote_addr not in ('127.0.0.1', '::1'):
+            abort(404)
+
+    @app.route('/metrics')
+    def metrics():
+        require_local()
+        rss = rss_bytes()
+        if rss is not None:
+            process_rss_bytes.set(rss)
+        if tracemalloc.is_tracing():
+            current, peak = tracemalloc.get_traced_memory()
+            traced_bytes.set(current, kind='current')
+            traced_bytes.set(peak, kind='peak')
+        return Response(registry.render(), mimetype='text/plain; version=0.0.4; charset=utf-8')
+
+    if app.config['MEMORY_PROFILE']:
+        # Profiling-Modus: kostet Laufzeit und Speicher, nicht für den Normalbetrieb
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(app.config['MEMORY_PROFILE_FRAMES'])
+
+        @app.before_request
+        def start_memory_profile():
+            tracemalloc.reset_peak()
+            g.metrics_alloc_start = tracemalloc.get_traced_memory()[0]
+
+        @app.route('/metrics/memory')
+        def memory_profile():
+            require_local()
+            limit = request.args.get('limit', 25, type=int)
+            group_by = request.args.get('group', 'lineno')
+            if group_by not in ('lineno', 'filename', 'traceback'):
+                abort(400)
+            return Response(top_allocations(limit, group_by), mimetype='text/plain; charset=utf-8')
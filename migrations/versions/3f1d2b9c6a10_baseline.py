@@ -0,0 +1,42 @@
+"""baseline: question and answer tables
+
+Revision ID: 3f1d2b9c6a10
+Revises: 
+Create Date: 2026-10-18 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3f1d2b9c6a10'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('question',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('module', sa.String(length=20), nullable=False),
+    sa.Column('text', sa.String(length=200), nullable=False),
+    sa.Column('subtitle', sa.String(length=200), nullable=True),
+    sa.Column('image', sa.String(length=200), nullable=True),
+    sa.Column('info_popup', sa.String(length=500), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table('answer',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('question_id', sa.Integer(), nullable=False),
+    sa.Column('text', sa.String(length=200), nullable=True),
+    sa.Column('score', sa.Integer(), nullable=True),
+    sa.Column('info_popup', sa.String(length=500), nullable=True),
+    sa.ForeignKeyConstraint(['question_id'], ['question.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+
+
+def downgrade():
+    op.drop_table('answer')
+    op.drop_table('question')
@@ -0,0 +1,51 @@
+"""answer position, indexes on question.module and answer.question_id, catalog_meta
+
+Revision ID: 8b7e4c2d1f35
+Revises: 3f1d2b9c6a10
+Create Date: 2026-10-18 10:05:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8b7e4c2d1f35'
+down_revision = '3f1d2b9c6a10'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # catalog_meta wurde bisher per create_all angelegt und kann schon existieren
+    if not sa.inspect(op.get_bind()).has_table('catalog_meta'):
+        op.create_table('catalog_meta',
+        sa.Column('key', sa.String(length=50), nullable=False),
+        sa.Column('value', sa.String(length=200), nullable=False),
+        sa.PrimaryKeyConstraint('key')
+        )
+
+    with op.batch_alter_table('answer', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('position', sa.Integer(), server_default='0', nullable=False))
+        batch_op.create_index(batch_op.f('ix_answer_question_id'), ['question_id'], unique=False)
+
+    # Bisherige Reihenfolge (nach ID) als Position übernehmen
+    op.execute(
+        'UPDATE answer SET position = ('
+        'SELECT COUNT(*) FROM answer AS earlier '
+        'WHERE earlier.question_id = answer.question_id AND earlier.id < answer.id)'
+    )
+
+    with op.batch_alter_table('question', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_question_module'), ['module'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('question', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_question_module'))
+
+    with op.batch_alter_table('answer', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_answer_question_id'))
+        batch_op.drop_column('position')
+
+    op.drop_table('catalog_meta')
@@ -0,0 +1,131 @@
+from functools import lru_cache
+from io import BytesIO
+import os
+import tempfile
+
+from reportlab.lib.pagesizes import letter
+from reportlab.lib import colors
+from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
+from reportlab.lib.enums import TA_CENTER
+from reportlab.lib.styles import ParagraphStyle, getSampleStyleSheet
+
+from catalog import BAND_TABLES
+
+# Layout-Objekte, die für jeden Bericht gleich sind: einmal beim Import aufbauen
+STYLES = getSampleStyleSheet()
+CENTERED = ParagraphStyle('Centered', parent=STYLES['Normal'], alignment=TA_CENTER)
+
+_BASE_TABLE_STYLE = [
+    ('BACKGROUND', (0,0), (-1,0), colors.lightgrey),
+    ('TEXTCOLOR', (0,0), (-1,-1), colors.black),
+    ('FONTNAME', (0,0), (-1,-1), 'Helvetica'),
+    ('FONTSIZE', (0,0), (-1,-1), 10),
+    ('BOTTOMPADDING', (0,0), (-1,-1), 8),
+    ('GRID', (0,0), (-1,-1), 1, colors.black)
+]
+EVAL_TABLE_STYLE = TableStyle(_BASE_TABLE_STYLE + [('ALIGN', (0,0), (-1,-1), 'CENTER')])
+ANSWER_TABLE_STYLE = TableStyle(_BASE_TABLE_STYLE + [('ALIGN', (0,0), (-1,-1), 'LEFT')])
+
+# Flowables (Paragraph, Table) merken sich beim Aufbau Zustand (canv, Umbruch) und werden daher
+# für jeden Bericht neu erzeugt; geteilt werden nur Stile und Tabellendaten
+TITLE = "Sanierungsbewertung - Zusammenfassung"
+ANSWER_HEADERS = {
+    'Basic': ["Frage", "Antwort"],
+    'Express': ["Frage", "Antwort", "Punkte"],
+    'Advanced': ["Frage", "Antwort", "Punkte"],
+}
+# Einheitliche Tabellenbreite für alle Module
+ANSWER_COL_WIDTHS = {
+    'Basic': [250, 250],
+    'Express': [200, 200, 100],
+    'Advanced': [200, 200, 100],
+}
+
+
+class CellParagraph(Paragraph):
+    # Table ruft wrap() für jede Zelle mehrfach mit derselben Breite auf (Höhe,
+    # Seitenumbruch, Zeichnen). Der Zeilenumbruch hängt nur von der Breite ab.
+    _wrap_width = None
+
+    def wrap(self, availWidth, availHeight):
+        if availWidth != self._wrap_width:
+            self._wrap_size = Paragraph.wrap(self, availWidth, availHeight)
+            self._wrap_width = availWidth
+        return self._wrap_size
+
+
+@lru_cache(maxsize=16)
+def _eval_rows(module, bands):
+    # Bewertungstabellen enthalten keine Nutzerdaten: Zeilen einmal je Katalogstand aufbereiten
+    header = tuple(BAND_TABLES[module][1])
+    return (header,) + tuple(
+        (band.label, f"{band.min_score} – {band.max_score}", band.recommendation) for band in bands
+    )
+
+
+def _eval_table(module, bands):
+    rows = _eval_rows(module, bands)
+    data = [list(rows[0])] + [[label, points, CellParagraph(text, CENTERED)] for label, points, text in rows[1:]]
+    table = Table(data, colWidths=[150, 100, 250])  # Einheitliche Spaltenbreiten
+    table.setStyle(EVAL_TABLE_STYLE)
+    return table
+
+
+def build_report_pdf(all_answers, module_scores, questions, bands, output=None):
+    # bands: {Modul: Bewertungsstufen aus dem Katalog}
+    # output: Dateiobjekt, in das geschrieben wird; ohne output werden die PDF-Bytes zurückgegeben
+    # PDF-Konfiguration
+    pdf_buffer = BytesIO() if output is None else output
+    pdf = SimpleDocTemplate(pdf_buffer, pagesize=letter)
+    elements = [Paragraph(TITLE, STYLES['Title']), Spacer(1, 20)]
+    normal = STYLES['Normal']
+
+    # Module verarbeiten
+    for module in ['Basic', 'Express', 'Advanced']:
+        if module in all_answers and all_answers[module]:
+            # Modul-Titel
+            elements.append(Paragraph(f"{module} Modul", STYLES['Heading2']))
+
+            # Modul-Score hervorheben (außer Basic)
+            if module != 'Basic':
+                score = module_scores.get(module, 0)  # Korrekte Modul-Scores aus der Session abrufen
+                elements.append(Paragraph(f"<b>Modul-Score: {score} Punkte</b>", normal))
+                elements.append(Spacer(1, 12))
+
+                # Bewertungstabelle hinzufügen
+                if bands.get(module):
+                    elements.append(_eval_table(module, tuple(bands[module])))
+                    elements.append(Spacer(1, 20))
+
+            # Fragen/Antworten-Tabelle: nur diese Zeilen sind nutzerspezifisch
+            data = [ANSWER_HEADERS[module]]
+            for qid, answer in all_answers[module].items():
+                question_text = questions.get(qid).text if qid in questions else "Unbekannte Frage"
+                row = [CellParagraph(question_text, normal), CellParagraph(answer.get('text', ''), normal)]
+                if module != 'Basic':
+                    row.append(str(answer.get('score', '-')))
+                data.append(row)
+
+            table = Table(data, colWidths=ANSWER_COL_WIDTHS[module])
+            table.setStyle(ANSWER_TABLE_STYLE)
+            elements.append(table)
+            elements.append(Spacer(1, 36))
+
+    # PDF generieren
+    pdf.build(elements)
+    return pdf_buffer.getvalue() if output is None else output
+
+
+def write_report_pdf(directory, *args):
+    """PDF als temporäre Datei in directory schreiben; gibt (Pfad, Größe) zurück.
+
+    Für Hintergrund-Jobs: nur der Pfad geht zurück an den Webprozess, nicht die PDF-Bytes.
+    """
+    fd, path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            build_report_pdf(*args, output=f)
+    except BaseException:
+        os.remove(path)
+        raise
+    return path, os.path.getsize(path)
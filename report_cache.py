@@ -0,0 +1,105 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+
+
+def report_fingerprint(all_answers, module_scores, catalog_version):
+    # Kanonische Darstellung: gleiche Antworten ergeben immer denselben Schlüssel
+    payload = json.dumps(
+        {
+            'answers': all_answers,
+            'scores': module_scores,
+            'catalog': catalog_version,
+        },
+        sort_keys=True,
+        ensure_ascii=False,
+        separators=(',', ':'),
+    )
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class ReportCache:
+    """LRU-Cache für fertige PDF-Berichte: Speicher-Stufe plus Datei-Stufe.
+
+    Berichte über spool_bytes liegen nur als Datei vor und werden von dort gestreamt.
+    """
+
+    def __init__(self, directory, max_memory_bytes, max_disk_bytes, spool_bytes=None, stale_tmp_seconds=3600):
+        self.directory = directory
+        # Temporäre Dateien, die so lange nicht fertig wurden, stammen von abgebrochenen Render-Prozessen
+        self.stale_tmp_seconds = stale_tmp_seconds
+        self.max_memory_bytes = max_memory_bytes
+        self.max_disk_bytes = max_disk_bytes
+        self.spool_bytes = max_memory_bytes if spool_bytes is None else min(spool_bytes, max_memory_bytes)
+        self._entries = OrderedDict()
+        self._memory_bytes = 0
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+    def get_memory(self, key):
+        with self._lock:
+            data = self._entries.get(key)
+            if data is not None:
+                self._entries.move_to_end(key)
+            return data
+
+    def get_path(self, key):
+        # Pfad der fertigen Datei, zum Streamen ohne sie in den Speicher zu laden
+        path = self._path(key)
+        try:
+            os.utime(path)  # Zugriffszeit für die LRU-Verdrängung auf der Platte
+        except FileNotFoundError:
+            return None
+        return path
+
+    def put_file(self, key, tmp_path, size):
+        # Fertig geschriebene temporäre Datei (im Cache-Verzeichnis) übernehmen
+        if size <= self.spool_bytes:
+            with open(tmp_path, 'rb') as f:
+                self._remember(key, f.read())
+        os.replace(tmp_path, self._path(key))
+        self._evict_disk()
+
+    def _remember(self, key, data):
+        if len(data) > self.spool_bytes:
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._memory_bytes -= len(old)
+            self._entries[key] = data
+            self._memory_bytes += len(data)
+            while self._memory_bytes > self.max_memory_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._memory_bytes -= len(evicted)
+
+    def _evict_disk(self):
+        files = []
+        total = 0
+        stale = time.time() - self.stale_tmp_seconds
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith('.pdf'):
+                stat = entry.stat()
+                files.append((stat.st_mtime, stat.st_size, entry.path))
+                total += stat.st_size
+            elif entry.name.endswith('.tmp'):
+                try:
+                    if entry.stat().st_mtime < stale:
+                        os.remove(entry.path)
+                except FileNotFoundError:
+                    pass
+        files.sort()
+        for _, size, path in files:
+            if total <= self.max_disk_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+
+    def _path(self, key):
+        return os.path.join(self.directory, f'{key}.pdf')
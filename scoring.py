@@ -0,0 +1,170 @@
+"""Punkteberechnung mit numpy: je Modul eine dichte Punktematrix Frage x Antwort.
+
+Wird erst bei Bedarf importiert (Zusammenfassung, Auswertungen), damit numpy den Start
+der Anwendung nicht verlangsamt.
+"""
+from collections import namedtuple
+
+import numpy as np
+
+from assessments import SCORED_MODULES
+
+# Eine einzelne Antwortänderung und ihre Wirkung auf Score und Einstufung
+Change = namedtuple('Change', 'question current answer delta score band')
+# Ergebnis von analyse(): Einstufung, Abstand zur nächsten Stufe und mögliche Einzeländerungen
+Analysis = namedtuple('Analysis', 'score band next_band missing gains losses')
+
+
+class ModuleScorer:
+    """Punktematrix eines Moduls: Zeile = Frage, Spalte = Position der Antwort.
+
+    Die letzte Spalte ist immer 0 und steht für "nicht beantwortet" (Index -1). So wird
+    ein ganzer Stapel von Antwortsätzen mit einem einzigen Index-Zugriff bewertet.
+    """
+
+    def __init__(self, questions, bands):
+        self.questions = tuple(q for q in questions if q.answers)
+        self.bands = tuple(bands)
+        width = max((len(q.answers) for q in self.questions), default=0)
+        self.matrix = np.zeros((len(self.questions), width + 1), dtype=np.int64)
+        self.valid = np.zeros(self.matrix.shape, dtype=bool)
+        self._rows = {}  # Frage-ID (String, wie in der Session) -> Zeile
+        self._columns = {}  # (Zeile, Antworttext) -> Spalte
+        self._answer_ids = {}  # Antwort-ID -> (Zeile, Spalte)
+        for row, question in enumerate(self.questions):
+            self._rows[str(question.id)] = row
+            for column, answer in enumerate(question.answers):
+                self.matrix[row, column] = answer.score or 0
+                self.valid[row, column] = True
+                self._columns[row, answer.text] = column
+                self._answer_ids[answer.id] = (row, column)
+        self._row_index = np.arange(len(self.questions))
+        # Nachschlagetabelle Antwort-ID -> Zeile/Spalte für ganze Stapel (-1 = gehört nicht zum Modul)
+        size = max(self._answer_ids, default=-1) + 1
+        self._id_rows = np.full(size, -1, dtype=np.int64)
+        self._id_columns = np.full(size, -1, dtype=np.int64)
+        for answer_id, (row, column) in self._answer_ids.items():
+            self._id_rows[answer_id] = row
+            self._id_columns[answer_id] = column
+        # Untergrenzen ab der zweiten Stufe; die äußeren Stufen sind nach unten/oben offen
+        self._band_edges = np.array([band.min_score for band in self.bands[1:]], dtype=np.int64)
+
+    def encode(self, answers):
+        # Session-Antworten {Frage-ID: {'text': ..., 'score': ...}} -> Spalte je Frage, -1 = offen
+        choices = np.full(len(self.questions), -1, dtype=np.int64)
+        for qid, entry in answers.items():
+            row = self._rows.get(qid)
+            if row is not None and entry:
+                choices[row] = self._columns.get((row, entry.get('text')), -1)
+        return choices
+
+    def encode_compact_batch(self, rows):
+        # Gespeicherte Form (assessments.compact_answers) vieler Durchläufe: Antwort-ID oder Freitext
+        # je Frage; nur das Einsammeln der IDs läuft in Python
+        runs, ids = [], []
+        for index, items in enumerate(rows):
+            for value in items.values():
+                if isinstance(value, int):
+                    runs.append(index)
+                    ids.append(value)
+        choices = np.full((len(rows), len(self.questions)), -1, dtype=np.int64)
+        runs = np.array(runs, dtype=np.int64)
+        ids = np.array(ids, dtype=np.int64)
+        known = (ids >= 0) & (ids < len(self._id_rows))
+        runs, ids = runs[known], ids[known]
+        question_rows = self._id_rows[ids]
+        known = question_rows >= 0
+        choices[runs[known], question_rows[known]] = self._id_columns[ids[known]]
+        return choices
+
+    def scores(self, choices):
+        # choices: (Fragen,) für einen Antwortsatz oder (n, Fragen) für einen Stapel
+        return self.matrix[self._row_index, choices].sum(axis=-1)
+
+    def classify(self, scores):
+        # Index der Bewertungsstufe je Score; -1, wenn das Modul keine Stufen hat
+        if not self.bands:
+            return np.full(np.shape(scores), -1, dtype=np.int64)
+        return np.searchsorted(self._band_edges, scores, side='right')
+
+    def band(self, score):
+        index = int(self.classify(score))
+        return self.bands[index] if index >= 0 else None
+
+    def analyse(self, choices):
+        """Wirkung jeder einzelnen Antwortänderung: welche hebt oder senkt die Einstufung?
+
+        Bewertet alle Alternativen aller Fragen auf einmal (Matrix minus aktuelle Punkte).
+        """
+        current = self.matrix[self._row_index, choices]
+        score = int(current.sum())
+        deltas = self.matrix - current[:, None]
+        bands_after = self.classify(score + deltas)
+        band_index = int(self.classify(score))
+
+        # Je Frage die beste und die schlechteste andere Antwort
+        best = np.where(self.valid, deltas, np.iinfo(np.int64).min).argmax(axis=1)
+        worst = np.where(self.valid, deltas, np.iinfo(np.int64).max).argmin(axis=1)
+
+        def change(row, column):
+            question = self.questions[row]
+            index = int(bands_after[row, column])
+            return Change(
+                question=question,
+                current=question.answers[choices[row]] if choices[row] >= 0 else None,
+                answer=question.answers[column],
+                delta=int(deltas[row, column]),
+                score=score + int(deltas[row, column]),
+                band=self.bands[index] if index >= 0 else None,
+            )
+
+        gains = [change(row, column) for row, column in enumerate(best) if deltas[row, column] > 0]
+        losses = [change(row, column) for row, column in enumerate(worst) if deltas[row, column] < 0]
+        gains.sort(key=lambda c: -c.delta)
+        losses.sort(key=lambda c: c.delta)
+
+        band = self.bands[band_index] if band_index >= 0 else None
+        next_band = self.bands[band_index + 1] if 0 <= band_index < len(self.bands) - 1 else None
+        return Analysis(
+            score=score,
+            band=band,
+            next_band=next_band,
+            missing=next_band.min_score - score if next_band else None,
+            gains=gains,
+            losses=losses,
+        )
+
+
+class ScoringEngine:
+    """Punktematrizen aller bewerteten Module eines Katalogstands."""
+
+    def __init__(self, catalog, modules=SCORED_MODULES):
+        self.version = catalog.version
+        self.modules = {module: ModuleScorer(catalog.questions(module), catalog.bands(module)) for module in modules}
+
+    def score(self, module, answers):
+        # Nicht bewertete Module (Basic) ergeben immer 0
+        scorer = self.modules.get(module)
+        return int(scorer.scores(scorer.encode(answers))) if scorer and answers else 0
+
+    def score_batch(self, module, compact_rows):
+        """Punkte für viele gespeicherte Durchläufe in einem numpy-Schritt."""
+        scorer = self.modules[module]
+        return scorer.scores(scorer.encode_compact_batch([items.get(module, {}) for items in compact_rows]))
+
+    def band_counts(self, module, distribution):
+        # Anzahl Durchläufe je Bewertungsstufe aus einer assessments.ScoreDistribution
+        scorer = self.modules[module]
+        if not scorer.bands:
+            return {}
+        values = np.arange(distribution.low, distribution.low + len(distribution.counts))
+        counts = np.bincount(scorer.classify(values), weights=distribution.counts, minlength=len(scorer.bands))
+        return {band.label: int(count) for band, count in zip(scorer.bands, counts)}
+
+    def band(self, module, score):
+        scorer = self.modules.get(module)
+        return scorer.band(score) if scorer else None
+
+    def analyse(self, module, answers):
+        scorer = self.modules[module]
+        return scorer.analyse(scorer.encode(answers))
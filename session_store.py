@@ -0,0 +1,193 @@
+import json
+import os
+import secrets
+import sqlite3
+import threading
+import time
+
+from flask.sessions import SessionInterface, SessionMixin
+from itsdangerous import BadSignature, Signer
+from werkzeug.datastructures import CallbackDict
+
+from sqlite_profile import pragma_statements
+
+
+class MemorySessionStore:
+    """Sitzungsdaten im Prozessspeicher (nur für Tests/Einzelprozess)."""
+
+    def __init__(self):
+        self._data = {}
+        self._lock = threading.Lock()
+
+    def get(self, sid):
+        with self._lock:
+            entry = self._data.get(sid)
+        if entry is None or entry[1] < time.time():
+            return None
+        return json.loads(entry[0])
+
+    def set(self, sid, data, ttl):
+        payload = json.dumps(data, separators=(',', ':'))
+        with self._lock:
+            self._data[sid] = (payload, time.time() + ttl)
+
+    def delete(self, sid):
+        with self._lock:
+            self._data.pop(sid, None)
+
+    def sweep(self):
+        now = time.time()
+        with self._lock:
+            expired = [sid for sid, (_, expires) in self._data.items() if expires < now]
+            for sid in expired:
+                del self._data[sid]
+        return len(expired)
+
+
+class SQLiteSessionStore:
+    """Sitzungsdaten in einer eigenen SQLite-Datei, von allen Workern gemeinsam nutzbar."""
+
+    def __init__(self, path, pragmas=()):
+        self.path = path
+        self.pragmas = list(pragmas)
+        self._local = threading.local()
+        with self._connect() as conn:
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS session_data ('
+                'sid TEXT PRIMARY KEY, data TEXT NOT NULL, expires REAL NOT NULL)'
+            )
+            conn.execute(
+                'CREATE INDEX IF NOT EXISTS ix_session_data_expires ON session_data (expires)'
+            )
+
+    def _connect(self):
+        # Nach einem Fork (gunicorn preload_app) nicht die Verbindung des Master-Prozesses weiterverwenden
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=10)
+            for statement in self.pragmas:
+                conn.execute(statement)
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def get(self, sid):
+        row = self._connect().execute(
+            'SELECT data FROM session_data WHERE sid = ? AND expires >= ?',
+            (sid, time.time()),
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def set(self, sid, data, ttl):
+        payload = json.dumps(data, separators=(',', ':'))
+        with self._connect() as conn:
+            conn.execute(
+                'INSERT OR REPLACE INTO session_data (sid, data, expires) VALUES (?, ?, ?)',
+                (sid, payload, time.time() + ttl),
+            )
+
+    def delete(self, sid):
+        with self._connect() as conn:
+            conn.execute('DELETE FROM session_data WHERE sid = ?', (sid,))
+
+    def sweep(self):
+        with self._connect() as conn:
+            return conn.execute(
+                'DELETE FROM session_data WHERE expires < ?', (time.time(),)
+            ).rowcount
+
+
+class ServerSideSession(CallbackDict, SessionMixin):
+    def __init__(self, initial=None, sid=None, new=False):
+        def on_update(self):
+            self.modified = True
+
+        super().__init__(initial, on_update)
+        self.sid = sid
+        self.new = new
+        self.modified = False
+
+
+class ServerSideSessionInterface(SessionInterface):
+    """Im Cookie steht nur noch eine kurze, signierte Sitzungs-ID."""
+
+    def __init__(self, store, ttl, sweep_interval):
+        self.store = store
+        self.ttl = ttl
+        self.sweep_interval = sweep_interval
+        self._sweeper = None
+        self._sweeper_lock = threading.Lock()
+
+    def _signer(self, app):
+        return Signer(app.secret_key, salt='server-side-session')
+
+    def open_session(self, app, request):
+        self._ensure_sweeper()
+        cookie = request.cookies.get(self.get_cookie_name(app))
+        if cookie:
+            try:
+                sid = self._signer(app).unsign(cookie).decode('ascii')
+            except BadSignature:
+                sid = None
+            if sid:
+                data = self.store.get(sid)
+                if data is not None:
+                    return ServerSideSession(data, sid=sid)
+        return ServerSideSession(sid=secrets.token_urlsafe(16), new=True)
+
+    def save_session(self, app, session, response):
+        name = self.get_cookie_name(app)
+        domain = self.get_cookie_domain(app)
+        path = self.get_cookie_path(app)
+
+        if not session:
+            if session.modified and not session.new:
+                self.store.delete(session.sid)
+                response.delete_cookie(name, domain=domain, path=path)
+            return
+
+        if session.modified:
+            self.store.set(session.sid, dict(session), self.ttl)
+
+        # Cookie nur beim Anlegen der Sitzung setzen - danach bleibt er unverändert
+        if session.new and session.modified:
+            response.set_cookie(
+                name,
+                self._signer(app).sign(session.sid.encode('ascii')).decode('ascii'),
+                max_age=self.ttl,
+                httponly=self.get_cookie_httponly(app),
+                domain=domain,
+                path=path,
+                secure=self.get_cookie_secure(app),
+                samesite=self.get_cookie_samesite(app),
+            )
+
+    def _ensure_sweeper(self):
+        # Erst im Worker starten, nicht schon beim Import
+        if self._sweeper is not None and self._sweeper[0] == os.getpid():
+            return
+        with self._sweeper_lock:
+            if self._sweeper is not None and self._sweeper[0] == os.getpid():
+                return
+            thread = threading.Thread(target=self._sweep_loop, name='session-sweeper', daemon=True)
+            thread.start()
+            self._sweeper = (os.getpid(), thread)
+
+    def _sweep_loop(self):
+        while True:
+            time.sleep(self.sweep_interval)
+            try:
+                self.store.sweep()
+            except sqlite3.Error:
+                pass
+
+
+def create_session_store(app):
+    backend = app.config['SESSION_STORE']
+    if backend == 'memory':
+        return MemorySessionStore()
+    if backend == 'sqlite':
+        os.makedirs(app.instance_path, exist_ok=True)
+        path = app.config['SESSION_STORE_PATH'] or os.path.join(app.instance_path, 'sessions.db')
+        return SQLiteSessionStore(path, pragma_statements(app.config.get('SQLITE_PRAGMAS') or {}))
+    raise ValueError(f"Unbekannter Session-Store: {backend}")
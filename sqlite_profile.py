@@ -0,0 +1,60 @@
+import os
+import pathlib
+import re
+
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+
+# Standardprofil für mehrere Worker-Prozesse auf einer SQLite-Datei
+CONCURRENT_PRAGMAS = {
+    'journal_mode': 'wal',  # Leser und Schreiber blockieren sich nicht gegenseitig
+    'synchronous': 'normal',  # mit WAL absturzsicher; fsync nur noch beim Checkpoint
+    'mmap_size': 256 * 1024 * 1024,  # Bytes; Lesen direkt aus dem Page-Cache des Systems
+    'busy_timeout': 5000,  # ms warten statt sofort "database is locked"
+}
+
+# Diese Pragmas verändern die Datei und sind auf Nur-Lese-Verbindungen nicht erlaubt
+_WRITE_PRAGMAS = {'journal_mode'}
+_SAFE = re.compile(r'^[A-Za-z0-9_]+$')
+
+
+def pragma_statements(pragmas, read_only=False):
+    statements = []
+    for name, value in pragmas.items():
+        if read_only and name in _WRITE_PRAGMAS:
+            continue
+        if not _SAFE.match(str(name)) or not _SAFE.match(str(value)):
+            raise ValueError(f"Ungültiges SQLite-Pragma: {name}={value}")
+        statements.append(f'PRAGMA {name} = {value}')
+    if read_only:
+        statements.append('PRAGMA query_only = 1')
+    return statements
+
+
+def apply_pragmas(dbapi_connection, statements):
+    cursor = dbapi_connection.cursor()
+    try:
+        for statement in statements:
+            cursor.execute(statement)
+    finally:
+        cursor.close()
+
+
+def install_pragmas(engine, pragmas, read_only=False):
+    # Bei jeder neuen Verbindung im Pool ausführen
+    statements = pragma_statements(pragmas, read_only)
+    if statements:
+        event.listen(engine, 'connect', lambda dbapi_connection, record: apply_pragmas(dbapi_connection, statements))
+
+
+def database_path(uri, instance_path):
+    # Flask-SQLAlchemy legt relative SQLite-Pfade in instance/ ab
+    url = make_url(uri)
+    if url.get_backend_name() != 'sqlite' or url.database in (None, '', ':memory:'):
+        return None
+    return url.database if os.path.isabs(url.database) else os.path.join(instance_path, url.database)
+
+
+def read_only_uri(path):
+    # Als file:-URI prozentkodiert: #, ? und % im Pfad (z.B. Installationsordner) sind URI-Syntax
+    return f'sqlite:///{pathlib.Path(path).absolute().as_uri()}?mode=ro&uri=true'
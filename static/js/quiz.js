@@ -0,0 +1,189 @@
+// Fragen werden im Browser gewechselt, Antworten gesammelt an /api/answers übertragen.
+// Ohne JavaScript (oder wenn die API nicht erreichbar ist) funktioniert das Formular wie bisher.
+(function () {
+    'use strict';
+
+    const BATCH_SIZE = 5;
+    const IMAGE_QUESTION = 'Welcher Form oder Kontur gleicht dein Gebäude am ehesten?';
+
+    const form = document.getElementById('quiz-form');
+    if (!form || !window.fetch) {
+        return;
+    }
+
+    const module = form.dataset.module;
+    const body = document.getElementById('question-body');
+    const number = document.getElementById('question-number');
+    const score = document.getElementById('running-score');
+    const imageUrl = form.dataset.imageUrl || '/static/images/';
+
+    let questions = null;
+    let index = parseInt(form.dataset.questionIndex, 10) || 0;
+    let runningScore = parseInt(form.dataset.runningScore, 10) || 0;
+    let answers = JSON.parse(form.dataset.answers || '{}');
+    let pending = [];
+    let sending = Promise.resolve();
+
+    function escape(text) {
+        const div = document.createElement('div');
+        div.textContent = text == null ? '' : String(text);
+        return div.innerHTML;
+    }
+
+    function tooltip(text) {
+        if (!text) {
+            return '';
+        }
+        return '<div class="question-tooltip ml-2"><span class="tooltip-icon">?</span>' +
+            '<span class="tooltip-text">' + escape(text) + '</span></div>';
+    }
+
+    function answerImage(answer) {
+        // Gleiche Zuordnung wie im Template: letztes Wort der Antwort = Dateiname
+        return imageUrl + answer.text.split(/\s+/).pop() + '.jpg';
+    }
+
+    function renderAnswers(question, previous) {
+        if (!question.answers.length) {
+            const text = previous && previous.score == null ? previous.text : '';
+            return '<div class="form-group"><textarea name="free_text" placeholder="Ihre Antwort hier..." ' +
+                'required class="form-control">' + escape(text) + '</textarea></div>';
+        }
+        const checked = function (answer) {
+            return previous && previous.text === answer.text ? ' checked' : '';
+        };
+        if (question.text === IMAGE_QUESTION) {
+            return '<div class="row justify-content-center">' + question.answers.map(function (answer) {
+                return '<div class="col-md-3 mb-3 text-center image-option"><label>' +
+                    '<input type="radio" name="answer" value="' + answer.id + '" required' + checked(answer) + '>' +
+                    (answer.picture || '<img src="' + escape(answerImage(answer)) + '" alt="' + escape(answer.text) + '" title="' + escape(answer.text) + '">') +
+                    '<span>' + escape(answer.text) + '</span>' + tooltip(answer.info_popup) +
+                    '</label></div>';
+            }).join('') + '</div>';
+        }
+        return '<div class="form-group">' + question.answers.map(function (answer) {
+            return '<div class="form-check">' +
+                '<input type="radio" id="answer_' + answer.id + '" name="answer" value="' + answer.id + '" required class="form-check-input"' + checked(answer) + '>' +
+                '<label for="answer_' + answer.id + '" class="form-check-label">' + escape(answer.text) + '</label>' +
+                tooltip(answer.info_popup) + '</div>';
+        }).join('') + '</div>';
+    }
+
+    function render() {
+        const question = questions[index];
+        body.innerHTML =
+            (question.subtitle ? '<h5 class="card-title">' + escape(question.subtitle) + '</h5>' : '') +
+            '<div class="d-flex align-items-center"><p class="mb-0">' + escape(question.text) + '</p>' +
+            tooltip(question.info_popup) + '</div>' +
+            renderAnswers(question, answers[question.id]);
+        number.textContent = index + 1;
+        if (score) {
+            score.textContent = runningScore;
+        }
+    }
+
+    function flush() {
+        const batch = pending;
+        const questionIndex = index;
+        pending = [];
+        sending = sending.then(function () {
+            return fetch(form.dataset.answersUrl, {
+                method: 'POST',
+                credentials: 'same-origin',
+                headers: {'Content-Type': 'application/json'},
+                body: JSON.stringify({answers: batch, question_index: questionIndex})
+            }).then(function (response) {
+                if (!response.ok) {
+                    throw new Error(response.status);
+                }
+                return response.json();
+            }).then(function (result) {
+                runningScore = result.running_score;
+                if (score) {
+                    score.textContent = runningScore;
+                }
+                if (result.next_url) {
+                    window.location.href = result.next_url;
+                }
+            });
+        }).catch(function () {
+            // Server-Stand neu laden; das Formular arbeitet dann wieder klassisch
+            window.location.reload();
+        });
+    }
+
+    function onSubmit(event) {
+        event.preventDefault();
+        if (event.submitter && event.submitter.name === 'back') {
+            if (index > 0) {
+                index -= 1;
+                render();
+            }
+            return;
+        }
+        if (!form.reportValidity()) {
+            return;
+        }
+
+        const question = questions[index];
+        const data = new FormData(form);
+        const answerId = data.get('answer');
+        const freeText = data.get('free_text');
+        const item = {question_id: question.id};
+        let entry;
+        if (answerId) {
+            const answer = question.answers.find(function (a) { return a.id === Number(answerId); });
+            item.answer_id = answer.id;
+            entry = {text: answer.text, score: answer.score};
+        } else {
+            item.free_text = freeText;
+            entry = {text: freeText, score: null};
+        }
+
+        // Punktestand lokal fortschreiben, der Server bestätigt ihn mit jeder Übertragung
+        const previous = answers[question.id];
+        if (module !== 'Basic') {
+            runningScore += (entry.score || 0) - ((previous && previous.score) || 0);
+        }
+        answers[question.id] = entry;
+        pending = pending.filter(function (p) { return p.question_id !== question.id; });
+        pending.push(item);
+        index += 1;
+
+        if (index >= questions.length) {
+            form.querySelectorAll('button').forEach(function (button) { button.disabled = true; });
+            flush();
+            return;
+        }
+        if (pending.length >= BATCH_SIZE) {
+            flush();
+        }
+        render();
+    }
+
+    // Beim Verlassen der Seite noch nicht übertragene Antworten mitschicken
+    window.addEventListener('pagehide', function () {
+        if (pending.length && navigator.sendBeacon) {
+            const payload = JSON.stringify({answers: pending, question_index: index});
+            navigator.sendBeacon(form.dataset.answersUrl, new Blob([payload], {type: 'application/json'}));
+            pending = [];
+        }
+    });
+
+    fetch(form.dataset.catalogUrl, {credentials: 'same-origin'})
+        .then(function (response) {
+            if (!response.ok) {
+                throw new Error(response.status);
+            }
+            return response.json();
+        })
+        .then(function (catalog) {
+            questions = catalog.questions;
+            if (index < questions.length) {
+                form.addEventListener('submit', onSubmit);
+            }
+        })
+        .catch(function () {
+            // Katalog nicht verfügbar: klassischer Formularversand
+        });
+})();
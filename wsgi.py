@@ -0,0 +1,6 @@
+# Einstiegspunkt für WSGI-Server: gunicorn -c gunicorn.conf.py
+from app import create_app, warm_up
+
+app = create_app()
+# Mit preload_app läuft dies einmal im Master, die Worker erben die geladenen Daten
+warm_up(app)